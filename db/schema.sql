@@ -1,8 +1,28 @@
 USE smart_fridge;
 
+-- 0) Owners and their fridges (one user can have several fridges)
+CREATE TABLE IF NOT EXISTS users (
+    user_id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL UNIQUE
+) ENGINE=InnoDB;
+
+CREATE TABLE IF NOT EXISTS fridges (
+    fridge_id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    name VARCHAR(100) NOT NULL DEFAULT 'fridge',
+    CONSTRAINT fk_fridges_user
+      FOREIGN KEY (user_id) REFERENCES users(user_id)
+      ON DELETE CASCADE ON UPDATE CASCADE,
+    INDEX idx_fridges_user (user_id)
+) ENGINE=InnoDB;
+
+INSERT IGNORE INTO users (user_id, name) VALUES (1, 'default');
+INSERT IGNORE INTO fridges (fridge_id, user_id, name) VALUES (1, 1, 'default');
+
 -- 1) Add storage column to items
 CREATE TABLE IF NOT EXISTS food_items (
     item_id INT AUTO_INCREMENT PRIMARY KEY,
+    fridge_id INT NOT NULL DEFAULT 1,
     food_type_id INT NOT NULL,
     quantity DECIMAL(8,2) DEFAULT 1.00,
     unit VARCHAR(20) DEFAULT 'pcs',
@@ -14,17 +34,77 @@ CREATE TABLE IF NOT EXISTS food_items (
     location_slot VARCHAR(50),
     added_by ENUM('user','camera','barcode') DEFAULT 'user',
     storage ENUM('fridge','freezer') NOT NULL DEFAULT 'fridge',          -- ← NEW
+    frozen_remaining_days INT DEFAULT NULL,   -- shelf life left when frozen (clock paused)
     CONSTRAINT fk_food_items_type
       FOREIGN KEY (food_type_id) REFERENCES food_types(food_type_id)
       ON DELETE CASCADE ON UPDATE CASCADE,
-    INDEX idx_expiration_date (expiration_date),
-    INDEX idx_storage (storage)
+    CONSTRAINT fk_food_items_fridge
+      FOREIGN KEY (fridge_id) REFERENCES fridges(fridge_id)
+      ON DELETE CASCADE ON UPDATE CASCADE,
+    -- every hot query filters by fridge first
+    INDEX idx_fridge_expiration (fridge_id, expiration_date),
+    INDEX idx_fridge_storage (fridge_id, storage),
+    INDEX idx_fridge_type (fridge_id, food_type_id)
+) ENGINE=InnoDB;
+
+-- 1b) Append-only event log + weekly rollup (written by event_log.py)
+CREATE TABLE IF NOT EXISTS inventory_events (
+    event_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    fridge_id INT NOT NULL DEFAULT 1,
+    event_type ENUM('add','consume','expire','delete','discard','move') NOT NULL,
+    item_id INT NOT NULL,
+    food_name VARCHAR(100) NOT NULL,
+    quantity DECIMAL(8,2) DEFAULT NULL,
+    remaining_quantity DECIMAL(8,2) DEFAULT NULL,
+    unit VARCHAR(20) DEFAULT NULL,
+    storage ENUM('fridge','freezer') DEFAULT NULL,
+    event_time DATETIME NOT NULL,
+    expire_item_id INT AS (IF(event_type = 'expire', item_id, NULL)) STORED,
+    INDEX idx_events_item (item_id),
+    INDEX idx_events_fridge_time (fridge_id, event_time),
+    INDEX idx_events_food_time (food_name, event_time),
+    UNIQUE INDEX uq_events_expire (expire_item_id)
+) ENGINE=InnoDB;
+
+CREATE TABLE IF NOT EXISTS inventory_weekly_rollup (
+    fridge_id INT NOT NULL DEFAULT 1,
+    week_start DATE NOT NULL,
+    food_name VARCHAR(100) NOT NULL,
+    event_type ENUM('add','consume','expire','delete','discard') NOT NULL,
+    event_count INT NOT NULL DEFAULT 0,
+    total_quantity DECIMAL(12,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (fridge_id, week_start, food_name, event_type),
+    INDEX idx_rollup_fridge_type_week (fridge_id, event_type, week_start)
+) ENGINE=InnoDB;
+
+-- 1c) Recipe corpus (saved Gemini recipes, recipe_store.py)
+CREATE TABLE IF NOT EXISTS recipes (
+    recipe_id INT AUTO_INCREMENT PRIMARY KEY,
+    title VARCHAR(255) NOT NULL,
+    title_key VARCHAR(255) NOT NULL,          -- normalized title
+    ingredient_key CHAR(40) NOT NULL,         -- sha1 of the sorted normalized ingredient set
+    steps JSON NOT NULL,
+    source VARCHAR(20) NOT NULL DEFAULT 'gemini',
+    created_at DATETIME NOT NULL,
+    UNIQUE KEY uq_recipes_title_ingredients (title_key, ingredient_key)
+) ENGINE=InnoDB;
+
+CREATE TABLE IF NOT EXISTS recipe_ingredients (
+    recipe_id INT NOT NULL,
+    position SMALLINT NOT NULL,
+    ingredient VARCHAR(100) NOT NULL,         -- normalize_ingredient() output
+    PRIMARY KEY (recipe_id, position),
+    CONSTRAINT fk_recipe_ingredients_recipe
+      FOREIGN KEY (recipe_id) REFERENCES recipes(recipe_id)
+      ON DELETE CASCADE ON UPDATE CASCADE,
+    INDEX idx_recipe_ingredients_ingredient (ingredient, recipe_id)
 ) ENGINE=InnoDB;
 
 -- 2) Recreate the status view to account for freezer
 CREATE OR REPLACE VIEW item_status_view AS
 SELECT 
     i.item_id,
+    i.fridge_id,
     t.food_type_id,
     t.name       AS food_name,
     t.category   AS food_category,
@@ -40,6 +120,7 @@ SELECT
         ELSE 'fresh'
     END AS status,
     i.storage,                                                  -- ← include storage in the view
+    i.frozen_remaining_days,
     i.location_slot,
     i.added_by,
     i.detection_label,
@@ -57,13 +138,17 @@ FOR EACH ROW
 BEGIN
     DECLARE shelf_life INT;
 
-    -- If frozen, we keep expiration_date as NULL (treated as 'frozen')
+    SELECT average_shelf_life_days INTO shelf_life
+    FROM food_types WHERE food_type_id = NEW.food_type_id;
+
+    -- If frozen, we keep expiration_date as NULL (treated as 'frozen') and
+    -- bank the full shelf life for when the item is moved to the fridge
     IF NEW.storage = 'freezer' THEN
         SET NEW.expiration_date = NULL;
+        IF NEW.frozen_remaining_days IS NULL THEN
+            SET NEW.frozen_remaining_days = shelf_life;
+        END IF;
     ELSE
-        SELECT average_shelf_life_days INTO shelf_life
-        FROM food_types WHERE food_type_id = NEW.food_type_id;
-
         IF NEW.expiration_date IS NULL AND shelf_life IS NOT NULL THEN
             SET NEW.expiration_date = DATE_ADD(NEW.date_added, INTERVAL shelf_life DAY);
         END IF;
@@ -0,0 +1,272 @@
+# classifier_eval.py
+"""
+Offline evaluation harness for classifier checkpoints.
+
+A labeled image directory (one sub-directory per class, ImageFolder style:
+data/pizza/*.jpg, data/sushi/*.jpg, ...) is decoded and resized ONCE into a
+memory-mapped tensor file; every later evaluation of any checkpoint reads
+that file directly, with no JPEG decoding:
+
+    python src/classifier_eval.py build data/ --cache eval_cache
+    python src/classifier_eval.py eval --cache eval_cache --model model.pth
+    python src/classifier_eval.py eval --cache eval_cache --model model.onnx --backend onnx
+
+Cache files (<cache> is a path prefix):
+    <cache>.npy          N x S x S x 3 uint8 resized pixels  (--dtype uint8, default)
+                         N x 3 x S x S float16 normalized     (--dtype float16)
+    <cache>.labels.npy   N int16 class indexes
+    <cache>.json         class names, files, img_size, dtype, source fingerprint
+
+uint8 is 4x smaller and bit-exact with what classify_food feeds the model
+(after the same normalization); float16 skips normalization at eval time.
+The cache is rebuilt only when the directory's files change.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+from PIL import Image
+
+from food_classifier import (
+    DEFAULT_CLASS_NAMES,
+    build_model,
+    normalize_pixels,
+    resize_pixels,
+    _softmax,
+)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+# ---------- cache ----------
+
+def _class_key(name):
+    return " ".join(name.lower().replace("_", " ").replace("-", " ").split())
+
+
+def _scan(data_dir, class_names):
+    """[(path, class_index)] for every image under data_dir/<class>/."""
+    by_key = {_class_key(name): i for i, name in enumerate(class_names)}
+    samples = []
+    for folder in sorted(os.listdir(data_dir)):
+        folder_path = os.path.join(data_dir, folder)
+        if not os.path.isdir(folder_path):
+            continue
+        label = by_key.get(_class_key(folder))
+        if label is None:
+            print(f"⚠️ Skipping folder {folder!r}: not one of the classifier's classes")
+            continue
+        for name in sorted(os.listdir(folder_path)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                samples.append((os.path.join(folder_path, name), label))
+    return samples
+
+
+def _fingerprint(samples, img_size, dtype):
+    h = hashlib.sha256(f"{img_size}:{dtype}".encode())
+    for path, label in samples:
+        st = os.stat(path)
+        h.update(f"{path}:{label}:{st.st_size}:{st.st_mtime_ns}".encode())
+    return h.hexdigest()
+
+
+def build_cache(data_dir, cache, img_size=256, dtype="uint8", class_names=None, force=False):
+    """
+    Decode + resize every labeled image once into <cache>.npy (memmap).
+    Returns the metadata dict; a cache that matches the directory is reused.
+    """
+    if dtype not in ("uint8", "float16"):
+        raise ValueError("dtype must be 'uint8' or 'float16'")
+    class_names = list(class_names or DEFAULT_CLASS_NAMES)
+    samples = _scan(data_dir, class_names)
+    if not samples:
+        raise ValueError(f"No labeled images found under {data_dir}")
+
+    fingerprint = _fingerprint(samples, img_size, dtype)
+    meta_path = cache + ".json"
+    if not force and os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("fingerprint") == fingerprint:
+            print(f"♻️ Cache {cache} is up to date ({meta['count']} images)")
+            return meta
+
+    n = len(samples)
+    shape = (n, img_size, img_size, 3) if dtype == "uint8" else (n, 3, img_size, img_size)
+    t0 = time.perf_counter()
+    data = np.lib.format.open_memmap(cache + ".npy", mode="w+", dtype=dtype, shape=shape)
+    labels = np.empty(n, dtype=np.int16)
+    for i, (path, label) in enumerate(samples):
+        with Image.open(path) as img:
+            pixels = resize_pixels(img, img_size)
+        data[i] = pixels if dtype == "uint8" else normalize_pixels(pixels).astype(np.float16)
+        labels[i] = label
+    data.flush()
+    del data
+    np.save(cache + ".labels.npy", labels)
+
+    meta = {
+        "count": n,
+        "img_size": img_size,
+        "dtype": dtype,
+        "class_names": class_names,
+        "files": [path for path, _ in samples],
+        "fingerprint": fingerprint,
+    }
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=1)
+    print(f"✅ Cached {n} images in {time.perf_counter() - t0:.1f}s -> {cache}.npy")
+    return meta
+
+
+def load_cache(cache):
+    """(memmapped data, labels, meta) — no image decoding."""
+    with open(cache + ".json", encoding="utf-8") as f:
+        meta = json.load(f)
+    data = np.load(cache + ".npy", mmap_mode="r")
+    labels = np.load(cache + ".labels.npy")
+    return data, labels, meta
+
+
+# ---------- model runners (any checkpoint, independent of classify_food's cache) ----------
+
+def _torch_runner(model_path, num_classes, threads=None):
+    import torch
+
+    if threads:
+        torch.set_num_threads(threads)
+    model = build_model(num_classes)
+    model.load_state_dict(torch.load(model_path, map_location="cpu"))
+    model.eval()
+
+    def run(batch):
+        with torch.no_grad():
+            return model(torch.from_numpy(batch)).numpy()
+    return run
+
+
+def _onnx_runner(model_path, threads=None):
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if threads:
+        options.intra_op_num_threads = threads
+    session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+    input_name = session.get_inputs()[0].name
+
+    def run(batch):
+        return session.run(None, {input_name: batch})[0]
+    return run
+
+
+# ---------- evaluation ----------
+
+def evaluate(cache, model_path, backend="torch", batch_size=32, threshold=None, threads=None):
+    """
+    Run a checkpoint over the cached set. Returns a dict with accuracy,
+    per-class accuracy, the confusion matrix (rows = true class), latency
+    (ms per image and per batch) and, with threshold (percent), the
+    accuracy/coverage of predictions at or above that confidence.
+    """
+    data, labels, meta = load_cache(cache)
+    class_names = meta["class_names"]
+    num_classes = len(class_names)
+    run = _onnx_runner(model_path, threads) if backend == "onnx" else _torch_runner(model_path, num_classes, threads)
+
+    preds = np.empty(len(labels), dtype=np.int64)
+    confs = np.empty(len(labels), dtype=np.float32)
+    batch_ms = []
+    for start in range(0, len(labels), batch_size):
+        chunk = data[start:start + batch_size]
+        if meta["dtype"] == "uint8":
+            batch = normalize_pixels(chunk)
+        else:
+            batch = chunk.astype(np.float32)
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+
+        t0 = time.perf_counter()
+        logits = run(batch)
+        batch_ms.append((time.perf_counter() - t0) * 1000)
+
+        probs = _softmax(logits)
+        preds[start:start + len(batch)] = probs.argmax(axis=1)
+        confs[start:start + len(batch)] = probs.max(axis=1) * 100.0
+
+    correct = preds == labels
+    confusion = np.bincount(labels.astype(np.int64) * num_classes + preds,
+                            minlength=num_classes * num_classes).reshape(num_classes, num_classes)
+    per_class = {
+        class_names[i]: round(float(confusion[i, i] / confusion[i].sum()), 4)
+        for i in range(num_classes) if confusion[i].sum()
+    }
+
+    report = {
+        "model": model_path,
+        "backend": backend,
+        "images": int(len(labels)),
+        "accuracy": round(float(correct.mean()), 4),
+        "per_class_accuracy": per_class,
+        "confusion": confusion.tolist(),
+        "class_names": class_names,
+        "latency_ms_per_image": round(sum(batch_ms) / len(labels), 3),
+        "latency_ms_per_batch_p50": round(float(np.percentile(batch_ms, 50)), 3),
+        "latency_ms_per_batch_p95": round(float(np.percentile(batch_ms, 95)), 3),
+        "batch_size": batch_size,
+    }
+    if threshold is not None:
+        confident = confs >= threshold
+        report["threshold"] = threshold
+        report["coverage"] = round(float(confident.mean()), 4)
+        report["accuracy_at_threshold"] = round(float(correct[confident].mean()), 4) if confident.any() else None
+    return report
+
+
+def print_report(report):
+    print(f"📊 {report['model']} ({report['backend']}): accuracy {report['accuracy']:.2%} "
+          f"on {report['images']} images, {report['latency_ms_per_image']} ms/image")
+    if "threshold" in report:
+        acc = report["accuracy_at_threshold"]
+        print(f"   ≥{report['threshold']}% confidence: coverage {report['coverage']:.2%}, "
+              f"accuracy {acc:.2%}" if acc is not None else "   no prediction above threshold")
+    names = report["class_names"]
+    width = max(len(n) for n in names)
+    print(" " * (width + 3) + " ".join(f"{i:>4}" for i in range(len(names))))
+    for i, (name, row) in enumerate(zip(names, report["confusion"])):
+        print(f"{i:>2} {name:<{width}}" + " ".join(f"{v:>4}" for v in row))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Classifier evaluation from a memory-mapped tensor cache")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_build = sub.add_parser("build", help="decode a labeled directory into the cache")
+    p_build.add_argument("data_dir")
+    p_build.add_argument("--cache", default="eval_cache")
+    p_build.add_argument("--img-size", type=int, default=256)
+    p_build.add_argument("--dtype", choices=("uint8", "float16"), default="uint8")
+    p_build.add_argument("--force", action="store_true")
+
+    p_eval = sub.add_parser("eval", help="evaluate a checkpoint from the cache")
+    p_eval.add_argument("--cache", default="eval_cache")
+    p_eval.add_argument("--model", default="model.pth", help=".pth (torch) or .onnx (onnx)")
+    p_eval.add_argument("--backend", choices=("torch", "onnx"), default=None,
+                        help="default: from the --model extension")
+    p_eval.add_argument("--batch-size", type=int, default=32)
+    p_eval.add_argument("--threshold", type=float, default=None, help="confidence threshold (percent)")
+    p_eval.add_argument("--threads", type=int, default=None)
+    p_eval.add_argument("--json", action="store_true", help="print the report as JSON")
+
+    args = parser.parse_args()
+    if args.command == "build":
+        build_cache(args.data_dir, args.cache, args.img_size, args.dtype, force=args.force)
+    else:
+        backend = args.backend or ("onnx" if args.model.endswith(".onnx") else "torch")
+        result = evaluate(args.cache, args.model, backend, args.batch_size, args.threshold, args.threads)
+        if args.json:
+            print(json.dumps(result, indent=1))
+        else:
+            print_report(result)
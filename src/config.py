@@ -3,14 +3,74 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Only required by the Gemini backend; checked lazily in recipe_llm_gemini so
+# the local recipe backend keeps working on appliances without an API key.
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-if not GEMINI_API_KEY:
-    raise RuntimeError("GEMINI_API_KEY not set in environment")
-
 
 MYSQL_HOST = os.getenv("MYSQL_HOST", "127.0.0.1")  # force TCP on Windows
 MYSQL_PORT = int(os.getenv("MYSQL_PORT", "3306"))
 MYSQL_USER = os.getenv("MYSQL_USER", "root")
 MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD", "")
 MYSQL_DB = os.getenv("MYSQL_DB", "smart_fridge")
+MYSQL_POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", "0"))      # 0 = new connection per call
+
+# Recipe generation
+RECIPE_BACKEND = os.getenv("RECIPE_BACKEND", "gemini")        # 'gemini' | 'corpus' | 'local'
+# 'gemini' answers from the saved recipe corpus when it covers at least this
+# share of the soon-to-expire inventory (0..1); above 1 = always ask Gemini
+RECIPE_CORPUS_MIN_COVERAGE = float(os.getenv("RECIPE_CORPUS_MIN_COVERAGE", "0.8"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "20"))
+LLM_PROMPT_TOKEN_BUDGET = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", "1500"))
+
+# Headless service (fridge_server.py). When SMART_FRIDGE_SERVER_URL is set the
+# GUI becomes a thin client of that server instead of touching MySQL directly.
+SERVER_HOST = os.getenv("SMART_FRIDGE_SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("SMART_FRIDGE_SERVER_PORT", "8765"))
+SMART_FRIDGE_SERVER_URL = os.getenv("SMART_FRIDGE_SERVER_URL", "")
+
+# Fridge this process works on by default (fridges table; 1 = seeded default)
+FRIDGE_ID = int(os.getenv("SMART_FRIDGE_ID", "1"))
+
+# Food classifier: 'torch' (model.pth) or 'onnx' (model.onnx from export_onnx.py)
+CLASSIFIER_BACKEND = os.getenv("CLASSIFIER_BACKEND", "torch").lower()
+ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", "0"))   # 0 = onnxruntime default
+
+# Inference settings (inference_config.py). Non-empty values override the
+# file written by `python src/inference_config.py autotune`.
+INFERENCE_SETTINGS_PATH = os.getenv("SMART_FRIDGE_INFERENCE_SETTINGS") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "inference_settings.json"
+)
+INFERENCE_DEVICE = os.getenv("SMART_FRIDGE_INFER_DEVICE", "")                # 'auto' | 'cpu' | 'cuda'
+INFERENCE_THREADS = os.getenv("SMART_FRIDGE_INFER_THREADS", "")              # intra-op threads
+INFERENCE_INTEROP_THREADS = os.getenv("SMART_FRIDGE_INFER_INTEROP_THREADS", "")
+INFERENCE_MAX_BATCH = os.getenv("SMART_FRIDGE_INFER_MAX_BATCH", "")          # per forward pass
+INFERENCE_CPU_AFFINITY = os.getenv("SMART_FRIDGE_INFER_CPU_AFFINITY", "")    # e.g. "0-3" or "2,3"
+
+# Content-addressed image store (image_store.py)
+IMAGE_STORE_DIR = os.getenv("SMART_FRIDGE_IMAGE_DIR") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "image_store"
+)
+
+# Read-through cache for item_status_view reads (smart_fridge_db). Off by
+# default: it only sees this process's writes, so enable it only where this
+# process makes every write (single app or fridge_server.py). Entries are also
+# dropped after READ_CACHE_TTL seconds, which bounds how stale a write made
+# elsewhere can look.
+READ_CACHE_ENABLED = os.getenv("SMART_FRIDGE_READ_CACHE", "0").lower() in ("1", "true", "yes")
+READ_CACHE_TTL = float(os.getenv("SMART_FRIDGE_READ_CACHE_TTL") or 5.0)
+
+# In-memory inventory engine (inventory_store.py) for this fridge:
+# 'off' | 'through' (write-through) | 'behind' (batched write-behind)
+INVENTORY_STORE = os.getenv("SMART_FRIDGE_INVENTORY_STORE", "off").lower()
+
+# Structured logging (fridge_logging.py): JSON lines written off-thread;
+# INFO records beyond LOG_RATE/s per operation are sampled 1 in LOG_SAMPLE
+LOG_LEVEL = os.getenv("SMART_FRIDGE_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("SMART_FRIDGE_LOG_FORMAT", "json").lower()       # 'json' | 'text'
+LOG_FILE = os.getenv("SMART_FRIDGE_LOG_FILE", "")                       # also append to this file
+LOG_RATE = float(os.getenv("SMART_FRIDGE_LOG_RATE", "20"))              # 0 = no limit
+LOG_SAMPLE = int(os.getenv("SMART_FRIDGE_LOG_SAMPLE", "100"))           # 0 = drop everything over the rate
+
+# Hot-path latency histograms/counters (instrumentation.py); off = no-op
+METRICS_ENABLED = os.getenv("SMART_FRIDGE_METRICS", "0").lower() in ("1", "true", "yes")
@@ -0,0 +1,404 @@
+# event_log.py
+"""
+Append-only inventory event log with write-behind batching.
+
+Every committed add / consume / delete / move (smart_fridge_db mutation
+listener; a delete with spoiled=True is logged as "discard", a move as one
+"move" row per item carrying the new storage) and every item the expiry
+scheduler reports as expired becomes a row in inventory_events. An item
+expires at most once: the unique expire_item_id key makes a repeat (the
+scheduler reports expired items again after every restart) a no-op, and
+only expire rows actually inserted reach the rollup. Events are buffered in memory and flushed in one
+transaction per batch (executemany), so logging never adds a DB round trip
+to the mutation itself.
+
+Each flush also folds the batch into inventory_weekly_rollup
+(fridge_id, week_start, food_name, event_type) -> (event_count,
+total_quantity), which is what the analytics queries below read instead of
+scanning raw events.
+
+Failures: if the DB can't be reached, the batch goes back into the buffer
+untouched. If the INSERT itself fails, the batch is split in halves until
+the offending rows are found; the others are written, and a row that fails
+on its own MAX_ATTEMPTS times is dead-lettered (logged at ERROR and kept in
+EventLog.dead_letters) instead of blocking the log. The buffer holds at
+most max_buffer events; past that the oldest are dropped and counted.
+"""
+import atexit
+import threading
+from collections import defaultdict, deque
+from datetime import date, datetime, timedelta
+from typing import Dict, List
+
+from smart_fridge_db import (
+    DEFAULT_FRIDGE_ID,
+    get_connection,
+    add_mutation_listener,
+    remove_mutation_listener,
+)
+import food_catalog
+from expiry_scheduler import Notifier
+from fridge_logging import get_logger, fields
+from instrumentation import inc
+
+_LOG = get_logger("events")
+
+
+def _week_start(d: date) -> date:
+    """Monday of the week containing d."""
+    return d - timedelta(days=d.weekday())
+
+
+class EventLog:
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, batch_size: int = 100, flush_interval: float = 2.0, max_buffer: int = 10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+
+        # [row, failed attempts], oldest first
+        self._buffer: deque = deque()
+        self.dropped = 0
+        self.dead_letters: deque = deque(maxlen=1000)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---------- lifecycle ----------
+
+    def start(self):
+        if self._thread is not None:
+            return
+        add_mutation_listener(self._on_mutation)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        remove_mutation_listener(self._on_mutation)
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(timeout=self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # Keep the events; the next flush retries them
+                _LOG.warning("Event log flush failed: %s", e,
+                             extra=fields(op="flush", buffered=len(self._buffer), dropped=self.dropped))
+
+    # ---------- recording ----------
+
+    def record(self, event_type: str, item_id: int, food_name: str,
+               quantity=None, remaining=None, unit: str = None,
+               storage: str = None, event_time: datetime | None = None,
+               fridge_id: int | None = None):
+        """Buffer one event (no DB access)."""
+        row = (DEFAULT_FRIDGE_ID if fridge_id is None else fridge_id,
+               event_type, item_id, food_name, quantity, remaining, unit, storage,
+               event_time or datetime.now())
+        with self._lock:
+            self._buffer.append([row, 0])
+            self._trim()
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def _trim(self):
+        """Drop the oldest events past max_buffer (call with _lock held)."""
+        while len(self._buffer) > self.max_buffer:
+            self._buffer.popleft()
+            self.dropped += 1
+            inc("events.dropped")
+
+    def _on_mutation(self, event: str, details: dict):
+        if event == "move":
+            # No row snapshot here; flush() looks up the food names
+            for item_id in details["item_ids"]:
+                self.record("move", item_id, None, storage=details.get("storage"),
+                            fridge_id=details.get("fridge_id"))
+            return
+        if event not in ("add", "consume", "delete"):
+            return
+
+        # No DB round trip on the mutating thread: the catalog's cache, else
+        # flush() looks the name up with the rest of the batch
+        food_name = details.get("food_name")
+        if food_name is None and details.get("food_type_id") is not None:
+            food_name = food_catalog.food_type_name(details["food_type_id"])
+
+        remaining = details.get("remaining")
+        if event == "delete":
+            remaining = 0
+            if details.get("spoiled"):
+                event = "discard"
+        elif event == "add":
+            remaining = details.get("quantity")
+
+        self.record(event, details["item_id"], food_name,
+                    quantity=details.get("quantity"), remaining=remaining,
+                    unit=details.get("unit"), storage=details.get("storage"),
+                    fridge_id=details.get("fridge_id"))
+
+    # ---------- flushing ----------
+
+    def _resolve_food_names(self, rows: List[tuple]) -> List[tuple]:
+        """rows with food_name filled in where it was recorded without one (moves, uncached adds)."""
+        missing = list({row[2] for row in rows if row[3] is None})
+        if not missing:
+            return rows
+        conn = get_connection()
+        try:
+            with conn.cursor() as cur:
+                placeholders = ", ".join(["%s"] * len(missing))
+                cur.execute(f"SELECT item_id, food_name FROM item_status_view WHERE item_id IN ({placeholders});",
+                            tuple(missing))
+                names = dict(cur.fetchall())
+        finally:
+            conn.close()
+        return [row if row[3] is not None else row[:3] + (names.get(row[2], "unknown"),) + row[4:]
+                for row in rows]
+
+    def flush(self) -> int:
+        """
+        Write all buffered events + rollup deltas. Returns the number of
+        events written; raises if any had to stay in the buffer.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._buffer = list(self._buffer), deque()
+            if not batch:
+                return 0
+
+            try:
+                rows = self._resolve_food_names([row for row, _ in batch])
+                conn = get_connection()
+            except Exception:
+                # DB unreachable: nothing is wrong with the events themselves
+                self._requeue(batch)
+                raise
+            for entry, row in zip(batch, rows):
+                entry[0] = row
+
+            try:
+                written, failed, error = self._write_isolating(conn, batch)
+            finally:
+                conn.close()
+            if not written and len(failed) > 1:
+                # Nothing at all went in: more likely the DB than the rows
+                self._requeue(batch)
+                raise error
+
+            retry = []
+            for entry in failed:
+                entry[1] += 1
+                if entry[1] < self.MAX_ATTEMPTS:
+                    retry.append(entry)
+                    continue
+                self.dead_letters.append(entry[0])
+                inc("events.dead_letter")
+                _LOG.error("Dropping event after %d failed writes: %s", entry[1], error,
+                           extra=fields(op="flush", event=entry[0]))
+            self._requeue(retry)
+            if retry:
+                raise error
+            return written
+
+    def _requeue(self, entries: List[list]):
+        """Put entries back in front of anything recorded since."""
+        with self._lock:
+            self._buffer.extendleft(reversed(entries))
+            self._trim()
+
+    def _write_isolating(self, conn, batch: List[list]) -> tuple:
+        """
+        Write batch in one transaction; if that fails, split it and retry
+        each half, down to single rows. Returns (written, failed entries,
+        last error).
+        """
+        try:
+            self._write(conn, [row for row, _ in batch])
+            return len(batch), [], None
+        except Exception as e:
+            if len(batch) == 1:
+                return 0, batch, e
+        mid = len(batch) // 2
+        written_a, failed_a, error_a = self._write_isolating(conn, batch[:mid])
+        written_b, failed_b, error_b = self._write_isolating(conn, batch[mid:])
+        return written_a + written_b, failed_a + failed_b, error_b or error_a
+
+    def _write(self, conn, rows: List[tuple]):
+        """Insert rows and fold them into the rollup, in one transaction."""
+        insert = """
+            INSERT {ignore} INTO inventory_events
+                (fridge_id, event_type, item_id, food_name, quantity,
+                 remaining_quantity, unit, storage, event_time)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s);
+        """
+        try:
+            with conn.cursor() as cur:
+                counted = [row for row in rows if row[1] != "expire"]
+                if counted:
+                    cur.executemany(insert.format(ignore=""), counted)
+                # Expires one by one: a repeat is ignored and must not be counted
+                for row in rows:
+                    if row[1] == "expire":
+                        cur.execute(insert.format(ignore="IGNORE"), row)
+                        if cur.rowcount:
+                            counted.append(row)
+
+                # A spoiled item that already expired is waste once, as its expire
+                discarded = list({row[2] for row in counted if row[1] == "discard"})
+                expired = set()
+                if discarded:
+                    cur.execute(f"""
+                        SELECT expire_item_id FROM inventory_events
+                        WHERE expire_item_id IN ({", ".join(["%s"] * len(discarded))});
+                    """, tuple(discarded))
+                    expired = {row[0] for row in cur.fetchall()}
+
+                rollup = defaultdict(lambda: [0, 0.0])
+                for fridge_id, event_type, item_id, food_name, quantity, _, _, _, event_time in counted:
+                    if event_type == "move":
+                        continue      # not a quantity change; only the shelf-life model reads moves
+                    if event_type == "discard" and item_id in expired:
+                        continue
+                    key = (fridge_id, _week_start(event_time.date()), food_name, event_type)
+                    rollup[key][0] += 1
+                    rollup[key][1] += float(quantity or 0)
+                if rollup:
+                    cur.executemany("""
+                        INSERT INTO inventory_weekly_rollup
+                            (fridge_id, week_start, food_name, event_type, event_count, total_quantity)
+                        VALUES (%s, %s, %s, %s, %s, %s)
+                        ON DUPLICATE KEY UPDATE
+                            event_count = event_count + VALUES(event_count),
+                            total_quantity = total_quantity + VALUES(total_quantity);
+                    """, [(*key, count, qty) for key, (count, qty) in rollup.items()])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+class EventLogNotifier(Notifier):
+    """
+    Expiry scheduler notifier that records "expire" events. The scheduler
+    alerts each item once per process; repeats after a restart are dropped
+    by the unique key when the event log flushes.
+    """
+
+    def __init__(self, event_log: EventLog, inner: Notifier | None = None):
+        self.event_log = event_log
+        self.inner = inner
+
+    def notify(self, kind: str, items: List[Dict]):
+        if kind == "expired":
+            for item in items:
+                self.event_log.record("expire", item["item_id"], item["food_name"],
+                                      quantity=item.get("quantity"),
+                                      remaining=item.get("quantity"),
+                                      unit=item.get("unit"),
+                                      storage=item.get("storage"),
+                                      fridge_id=item.get("fridge_id"))
+        if self.inner is not None:
+            self.inner.notify(kind, items)
+
+
+_EVENT_LOG = None
+_EVENT_LOG_LOCK = threading.Lock()
+
+
+def get_event_log() -> EventLog:
+    """Return the process-wide event log, starting it on first use."""
+    global _EVENT_LOG
+    with _EVENT_LOG_LOCK:
+        if _EVENT_LOG is None:
+            _EVENT_LOG = EventLog()
+            _EVENT_LOG.start()
+    return _EVENT_LOG
+
+
+# ---------- Analytics (read the rollup, never raw events) ----------
+# fridge_id=None aggregates over every fridge.
+
+def get_weekly_consumption(food_name: str | None = None, weeks: int = 8,
+                           fridge_id: int | None = None) -> List[Dict]:
+    """
+    Consumed quantity per food per week for the last `weeks` weeks:
+    [{"week_start", "food_name", "event_count", "total_quantity"}, ...]
+    """
+    since = _week_start(date.today()) - timedelta(weeks=weeks - 1)
+    sql = """
+        SELECT week_start, food_name,
+               SUM(event_count) AS event_count, SUM(total_quantity) AS total_quantity
+        FROM inventory_weekly_rollup
+        WHERE event_type = 'consume' AND week_start >= %s
+    """
+    params = [since]
+    if fridge_id is not None:
+        sql += " AND fridge_id = %s"
+        params.append(fridge_id)
+    if food_name is not None:
+        sql += " AND food_name = %s"
+        params.append(food_name)
+    sql += " GROUP BY week_start, food_name ORDER BY week_start, food_name;"
+
+    conn = get_connection()
+    try:
+        with conn.cursor(dictionary=True) as cur:
+            cur.execute(sql, params)
+            return cur.fetchall()
+    finally:
+        conn.close()
+
+
+def get_waste_summary(weeks: int = 8, fridge_id: int | None = None) -> List[Dict]:
+    """
+    Quantity wasted per food over the last `weeks` weeks, with the consumed
+    quantity alongside for a waste ratio:
+    [{"food_name", "expired_quantity", "discarded_quantity", "wasted_quantity",
+      "consumed_quantity", "waste_ratio"}, ...]
+
+    discarded_quantity is food thrown away as spoiled (delete_item(...,
+    spoiled=True)) before it reached its expiry date; an item that expired
+    and was then discarded counts once, under expired_quantity.
+    """
+    since = _week_start(date.today()) - timedelta(weeks=weeks - 1)
+    fridge_filter = "" if fridge_id is None else " AND fridge_id = %s"
+    params = [since] if fridge_id is None else [since, fridge_id]
+    conn = get_connection()
+    try:
+        with conn.cursor(dictionary=True) as cur:
+            cur.execute(f"""
+                SELECT food_name,
+                       SUM(CASE WHEN event_type = 'expire'  THEN total_quantity ELSE 0 END) AS expired_quantity,
+                       SUM(CASE WHEN event_type = 'discard' THEN total_quantity ELSE 0 END) AS discarded_quantity,
+                       SUM(CASE WHEN event_type = 'consume' THEN total_quantity ELSE 0 END) AS consumed_quantity
+                FROM inventory_weekly_rollup
+                WHERE week_start >= %s AND event_type IN ('expire', 'discard', 'consume'){fridge_filter}
+                GROUP BY food_name
+                HAVING expired_quantity + discarded_quantity > 0
+                ORDER BY expired_quantity + discarded_quantity DESC;
+            """, params)
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+
+    for row in rows:
+        wasted = float(row["expired_quantity"]) + float(row["discarded_quantity"])
+        consumed = float(row["consumed_quantity"])
+        row["wasted_quantity"] = wasted
+        row["waste_ratio"] = round(wasted / (wasted + consumed), 3) if wasted + consumed else 0.0
+    return rows
@@ -0,0 +1,278 @@
+# expiry_scheduler.py
+"""
+Background expiry scheduler.
+
+Keeps the fridge items that have an expiration_date in calendar buckets
+(expiration_date -> rows, plus a sorted list of dates), so "what expires in
+the next N days" and "what has expired" are a bisect + O(result) walk with no
+MySQL round trip.
+
+The buckets are rebuilt:
+  - once per day (just after midnight), and
+  - after each inventory mutation (smart_fridge_db mutation listener): the
+    mutation marks the buckets dirty and wakes the worker, and a query that
+    finds them dirty rebuilds first, so a read right after a write never
+    sees the old inventory.
+
+New alerts are sent to a pluggable Notifier; each item is alerted at most
+once per kind ("expiring" / "expired").
+
+There is one scheduler per fridge (get_scheduler(fridge_id=...)); a
+mutation only wakes the scheduler of the fridge it touched. Only fridges in
+the fridges table get one, and at most MAX_SCHEDULERS run at a time (the
+least recently used is stopped).
+"""
+import threading
+from collections import OrderedDict
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List
+
+from fridge_logging import get_logger, fields
+from smart_fridge_db import (
+    DEFAULT_FRIDGE_ID,
+    fridge_exists,
+    get_all_items,
+    add_mutation_listener,
+    remove_mutation_listener,
+)
+
+_LOG = get_logger("expiry")
+
+
+# ---------- Notifiers ----------
+
+class Notifier:
+    """Receives alerts. kind is "expiring" or "expired"."""
+
+    def notify(self, kind: str, items: List[Dict]):
+        raise NotImplementedError
+
+
+class LogNotifier(Notifier):
+    """Default notifier: one log record per item (expired: WARNING, expiring: INFO)."""
+
+    def notify(self, kind: str, items: List[Dict]):
+        for item in items:
+            extra = fields(op="expiry_alert", kind=kind, item_id=item["item_id"],
+                           food_name=item["food_name"], expiration_date=item["expiration_date"],
+                           fridge_id=item.get("fridge_id"))
+            if kind == "expired":
+                _LOG.warning("%s (ID %s) expired on %s", item["food_name"], item["item_id"],
+                             item["expiration_date"], extra=extra)
+            else:
+                _LOG.info("%s (ID %s) expires on %s", item["food_name"], item["item_id"],
+                          item["expiration_date"], extra=extra)
+
+
+class CallbackNotifier(Notifier):
+    """Adapter for a plain fn(kind, items) callable."""
+
+    def __init__(self, fn: Callable[[str, List[Dict]], None]):
+        self.fn = fn
+
+    def notify(self, kind: str, items: List[Dict]):
+        self.fn(kind, items)
+
+
+# ---------- Scheduler ----------
+
+class ExpiryScheduler:
+    def __init__(self, notifier: Notifier | None = None, alert_days: int = 2,
+                 fridge_id: int | None = None):
+        self.notifier = notifier or LogNotifier()
+        self.alert_days = alert_days
+        self.fridge_id = DEFAULT_FRIDGE_ID if fridge_id is None else fridge_id
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()   # one rebuild/alert pass at a time
+        self._buckets: Dict[date, List[Dict]] = {}
+        self._dates: List[date] = []
+        self._alerted = set()          # {(kind, item_id)}
+        self._dirty = True             # a mutation arrived since the last rebuild
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---------- lifecycle ----------
+
+    def start(self):
+        """Compute the buckets now and keep them fresh in a daemon thread."""
+        if self._thread is not None:
+            return
+        # Listen first, so a mutation during the first refresh marks it dirty
+        add_mutation_listener(self._on_mutation)
+        self.refresh()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"expiry-scheduler-{self.fridge_id}",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        remove_mutation_listener(self._on_mutation)
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _on_mutation(self, event: str, details: dict):
+        # fridge_id None = a full clear, which touches every fridge
+        if details.get("fridge_id") not in (None, self.fridge_id):
+            return
+        # Coalesce bursts of mutations into one rebuild, on the worker thread
+        # or on the next query, whichever comes first
+        self._dirty = True
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            now = datetime.now()
+            next_midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+            woken = self._wake.wait(timeout=(next_midnight - now).total_seconds() + 1)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                if woken:
+                    self._sync()
+                else:
+                    self.refresh()
+            except Exception as e:
+                _LOG.warning("Expiry scheduler refresh failed for fridge %s: %s", self.fridge_id, e,
+                             extra=fields(op="expiry_refresh", fridge_id=self.fridge_id))
+
+    # ---------- computation ----------
+
+    def refresh(self):
+        """Rebuild the date buckets from the DB and send new alerts."""
+        with self._refresh_lock:
+            self._rebuild()
+
+    def _sync(self):
+        """Rebuild now if a mutation arrived since the last rebuild."""
+        if self._dirty:
+            with self._refresh_lock:
+                if self._dirty:
+                    self._rebuild()
+
+    def _rebuild(self):
+        # Cleared before reading, so a mutation during the read marks it again
+        self._dirty = False
+        try:
+            buckets: Dict[date, List[Dict]] = {}
+            for row in get_all_items(self.fridge_id):
+                exp = row.get("expiration_date")
+                if row.get("storage") != "fridge" or exp is None:
+                    continue
+                buckets.setdefault(exp, []).append(row)
+        except Exception:
+            self._dirty = True
+            raise
+
+        with self._lock:
+            self._buckets = buckets
+            self._dates = sorted(buckets)
+
+        self._send_alerts()
+
+    def _send_alerts(self):
+        today = date.today()
+        expired = self._range(None, today - timedelta(days=1))
+        expiring = self._range(today, today + timedelta(days=self.alert_days))
+
+        live = {("expired", i["item_id"]) for i in expired}
+        live |= {("expiring", i["item_id"]) for i in expiring}
+
+        new_expired = [i for i in expired if ("expired", i["item_id"]) not in self._alerted]
+        new_expiring = [i for i in expiring if ("expiring", i["item_id"]) not in self._alerted]
+        # Forget alerts for items that were consumed/removed
+        self._alerted &= live
+
+        if new_expired:
+            self.notifier.notify("expired", new_expired)
+        if new_expiring:
+            self.notifier.notify("expiring", new_expiring)
+        self._alerted |= {("expired", i["item_id"]) for i in new_expired}
+        self._alerted |= {("expiring", i["item_id"]) for i in new_expiring}
+
+    # ---------- queries (no DB access unless a mutation is pending) ----------
+
+    def _range(self, lo: date | None, hi: date | None) -> List[Dict]:
+        with self._lock:
+            dates = self._dates
+            start = 0 if lo is None else bisect_left(dates, lo)
+            end = len(dates) if hi is None else bisect_right(dates, hi)
+            out = []
+            for d in dates[start:end]:
+                out.extend(self._buckets[d])
+        return out
+
+    def expiring_within(self, days: int = 2) -> List[Dict]:
+        """Fridge items expiring today .. today+days (same as get_expiring_items)."""
+        self._sync()
+        today = date.today()
+        return self._range(today, today + timedelta(days=days))
+
+    def expired(self) -> List[Dict]:
+        """Fridge items already past their expiration_date (same as get_expired_items)."""
+        self._sync()
+        return self._range(None, date.today() - timedelta(days=1))
+
+
+# Running schedulers per fridge, least recently used first
+MAX_SCHEDULERS = 64
+_SCHEDULERS: "OrderedDict[int, ExpiryScheduler]" = OrderedDict()
+_SCHEDULER_LOCK = threading.Lock()
+# Notifier used for fridges whose scheduler is first created without one
+_DEFAULT_NOTIFIER = None
+
+
+def get_scheduler(notifier: Notifier | None = None, alert_days: int = 2,
+                  fridge_id: int | None = None) -> ExpiryScheduler:
+    """
+    Return the scheduler for one fridge (default DEFAULT_FRIDGE_ID),
+    starting it on first use. The first notifier passed in is reused for
+    fridges created later without one.
+
+    Raises ValueError for a fridge_id that is not in the fridges table.
+    Past MAX_SCHEDULERS, the least recently used scheduler is stopped.
+    """
+    global _DEFAULT_NOTIFIER
+    if fridge_id is None:
+        fridge_id = DEFAULT_FRIDGE_ID
+    with _SCHEDULER_LOCK:
+        if notifier is not None and _DEFAULT_NOTIFIER is None:
+            _DEFAULT_NOTIFIER = notifier
+        scheduler = _SCHEDULERS.get(fridge_id)
+        if scheduler is not None:
+            _SCHEDULERS.move_to_end(fridge_id)
+            return scheduler
+
+    # DB work (fridge check, first refresh) happens without the lock, so a
+    # slow fridge never holds up lookups for the others
+    if not fridge_exists(fridge_id):
+        raise ValueError(f"Unknown fridge_id {fridge_id}.")
+    evicted = []
+    with _SCHEDULER_LOCK:
+        scheduler = _SCHEDULERS.get(fridge_id)
+        if scheduler is not None:
+            return scheduler          # another thread registered it meanwhile
+        scheduler = ExpiryScheduler(notifier=notifier or _DEFAULT_NOTIFIER,
+                                    alert_days=alert_days, fridge_id=fridge_id)
+        _SCHEDULERS[fridge_id] = scheduler
+        while len(_SCHEDULERS) > MAX_SCHEDULERS:
+            evicted.append(_SCHEDULERS.popitem(last=False)[1])
+
+    # Joining a worker can take a moment; not while holding the lock
+    for old in evicted:
+        old.stop()
+    try:
+        scheduler.start()
+    except Exception:
+        with _SCHEDULER_LOCK:
+            if _SCHEDULERS.get(fridge_id) is scheduler:
+                del _SCHEDULERS[fridge_id]
+        raise
+    return scheduler
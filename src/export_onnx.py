@@ -0,0 +1,84 @@
+# export_onnx.py
+"""
+Export the EfficientNet-B2 classifier (model.pth) to ONNX for the
+onnxruntime backend of food_classifier, and check that both backends agree.
+
+    python src/export_onnx.py [--model model.pth] [--out model.onnx]
+    python src/export_onnx.py --check pictures/
+
+--check classifies every image in the directory with both backends (each
+with its own preprocessing, exactly as classify_food runs them) and exits
+non-zero if a label differs or a confidence differs by more than --tol
+percentage points. Only export needs torch; the appliance then runs
+CLASSIFIER_BACKEND=onnx with onnxruntime alone.
+"""
+import argparse
+import os
+import sys
+
+from food_classifier import (
+    DEFAULT_CLASS_NAMES,
+    build_model,
+    classify_food,
+    onnx_path_for,
+)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+def export(model_path="model.pth", out_path=None, img_size=256, opset=17):
+    """Write model_path as ONNX with a dynamic batch axis. Returns the output path."""
+    import torch
+
+    out_path = out_path or onnx_path_for(model_path)
+    model = build_model(len(DEFAULT_CLASS_NAMES))
+    model.load_state_dict(torch.load(model_path, map_location="cpu"))
+    model.eval()
+
+    dummy = torch.randn(1, 3, img_size, img_size)
+    torch.onnx.export(
+        model, dummy, out_path,
+        input_names=["image"],
+        output_names=["logits"],
+        dynamic_axes={"image": {0: "batch"}, "logits": {0: "batch"}},
+        opset_version=opset,
+        dynamo=False,
+    )
+    print(f"✅ Exported {model_path} -> {out_path}")
+    return out_path
+
+
+def check(pictures_dir, model_path="model.pth", tol=0.5) -> bool:
+    """Compare torch and onnx predictions on every image in pictures_dir."""
+    ok = True
+    checked = 0
+    for name in sorted(os.listdir(pictures_dir)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        path = os.path.join(pictures_dir, name)
+        torch_label, torch_conf = classify_food(path, model_path=model_path, backend="torch")
+        onnx_label, onnx_conf = classify_food(path, model_path=model_path, backend="onnx")
+        diff = abs(torch_conf - onnx_conf)
+        match = torch_label == onnx_label and diff <= tol
+        ok &= match
+        checked += 1
+        print(f"{'✅' if match else '❌'} {name}: torch={torch_label} ({torch_conf:.2f}%) "
+              f"onnx={onnx_label} ({onnx_conf:.2f}%) Δ={diff:.3f}")
+    print(f"{checked} images checked, {'parity OK' if ok else 'MISMATCH'}")
+    return ok and checked > 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the food classifier to ONNX")
+    parser.add_argument("--model", default="model.pth", help="classifier weights (.pth)")
+    parser.add_argument("--out", default=None, help="output .onnx (default: next to --model)")
+    parser.add_argument("--img-size", type=int, default=256)
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--check", metavar="DIR", default=None,
+                        help="compare torch vs onnx on the images in DIR instead of exporting")
+    parser.add_argument("--tol", type=float, default=0.5, help="max confidence difference (percentage points)")
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(0 if check(args.check, args.model, args.tol) else 1)
+    export(args.model, args.out, args.img_size, args.opset)
@@ -0,0 +1,148 @@
+# food_catalog.py
+"""
+Single catalog of known foods.
+
+Merges SHELF_LIFE_DAYS, FOOD_CATEGORIES, the ingredient alias table and the
+classifier's class labels into one immutable record per food, built once at
+import, with three lookup indexes:
+
+    by name              "spaghetti bolognese"
+    by alias             "spag bol", "bolognese"
+    by classifier label  "Spaghetti Bolognese"
+
+sync_food_types() upserts every record into food_types in one batch at
+startup and caches name -> food_type_id, so inserting an item for a known
+food never needs a get-or-create round trip.
+"""
+from typing import Dict, List, Tuple
+
+from shelf_life_data import SHELF_LIFE_DAYS
+from food_categories import FOOD_CATEGORIES
+from ingredient_normalizer import INGREDIENT_ALIASES, normalize_ingredient
+
+# Output order of the trained classifier head (model.pth); do not reorder.
+CLASSIFIER_LABELS = (
+    'Caesar Salad', 'Chicken Wings', 'French Fries',
+    'Fried Rice', 'Hamburger', 'Ice Cream',
+    'Pizza', 'Spaghetti Bolognese', 'Steak', 'Sushi',
+)
+
+
+class FoodRecord:
+    """Immutable catalog entry."""
+
+    __slots__ = ("name", "category", "shelf_life_days", "classifier_label", "aliases")
+
+    def __init__(self, name: str, category: str, shelf_life_days: int | None,
+                 classifier_label: str | None, aliases: Tuple[str, ...]):
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "category", category)
+        object.__setattr__(self, "shelf_life_days", shelf_life_days)
+        object.__setattr__(self, "classifier_label", classifier_label)
+        object.__setattr__(self, "aliases", aliases)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("FoodRecord is immutable")
+
+    def __repr__(self):
+        return f"FoodRecord({self.name!r}, category={self.category!r}, shelf_life_days={self.shelf_life_days!r})"
+
+
+def _build():
+    names = list(dict.fromkeys(list(SHELF_LIFE_DAYS) + list(FOOD_CATEGORIES)))
+    labels = {normalize_ingredient(label): label for label in CLASSIFIER_LABELS}
+
+    aliases: Dict[str, List[str]] = {}
+    for alias, canonical in INGREDIENT_ALIASES.items():
+        aliases.setdefault(canonical, []).append(alias)
+
+    by_name: Dict[str, FoodRecord] = {}
+    for name in names:
+        by_name[name] = FoodRecord(
+            name=name,
+            category=FOOD_CATEGORIES.get(name, "other"),
+            shelf_life_days=SHELF_LIFE_DAYS.get(name),
+            classifier_label=labels.get(name),
+            aliases=tuple(aliases.get(name, ())),
+        )
+
+    by_alias = {a: rec for rec in by_name.values() for a in rec.aliases}
+    by_label = {rec.classifier_label: rec for rec in by_name.values() if rec.classifier_label}
+    return by_name, by_alias, by_label
+
+
+_BY_NAME, _BY_ALIAS, _BY_LABEL = _build()
+
+# name -> food_type_id (and back), filled by sync_food_types() / remember_food_type_id()
+_FOOD_TYPE_IDS: Dict[str, int] = {}
+_FOOD_TYPE_NAMES: Dict[int, str] = {}
+
+
+# ---------- Lookups ----------
+
+def all_records() -> List[FoodRecord]:
+    return list(_BY_NAME.values())
+
+
+def get(name: str) -> FoodRecord | None:
+    """Record for a canonical name or alias (exact match, no normalization)."""
+    return _BY_NAME.get(name) or _BY_ALIAS.get(name)
+
+
+def resolve(text: str) -> FoodRecord | None:
+    """Record for free text ("2 Tomatoes"), via normalize_ingredient."""
+    return get(text) or get(normalize_ingredient(text))
+
+
+def by_classifier_label(label: str) -> FoodRecord | None:
+    """Record for a classifier class name ("Spaghetti Bolognese")."""
+    return _BY_LABEL.get(label)
+
+
+def food_type_id(name: str) -> int | None:
+    """Cached food_type_id for a canonical name (None if not synced/created yet)."""
+    return _FOOD_TYPE_IDS.get(name)
+
+
+def food_type_name(ftid: int) -> str | None:
+    """Cached name for a food_type_id (None if not synced/created yet)."""
+    return _FOOD_TYPE_NAMES.get(ftid)
+
+
+def remember_food_type_id(name: str, ftid: int):
+    _FOOD_TYPE_IDS[name] = ftid
+    _FOOD_TYPE_NAMES[ftid] = name
+
+
+def forget_food_type_ids():
+    """Drop cached ids (food_types was truncated)."""
+    _FOOD_TYPE_IDS.clear()
+    _FOOD_TYPE_NAMES.clear()
+
+
+# ---------- DB sync ----------
+
+def sync_food_types(conn) -> int:
+    """
+    Upsert every catalog record into food_types in one batch and reload the
+    name -> food_type_id cache (including non-catalog types already in the
+    table). Uses the caller's connection and commits.
+    """
+    records = all_records()
+    with conn.cursor() as cur:
+        cur.executemany("""
+            INSERT INTO food_types (name, category, average_shelf_life_days)
+            VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                category = VALUES(category),
+                average_shelf_life_days = VALUES(average_shelf_life_days);
+        """, [(r.name, r.category, r.shelf_life_days) for r in records])
+        cur.execute("SELECT name, food_type_id FROM food_types;")
+        rows = cur.fetchall()
+    conn.commit()
+
+    _FOOD_TYPE_IDS.clear()
+    _FOOD_TYPE_IDS.update({name: ftid for name, ftid in rows})
+    _FOOD_TYPE_NAMES.clear()
+    _FOOD_TYPE_NAMES.update({ftid: name for name, ftid in rows})
+    return len(records)
@@ -1,11 +1,20 @@
-import torch
-from torchvision import models, transforms
+import os
+
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 
+import config
+import inference_config
+from food_catalog import CLASSIFIER_LABELS
+from instrumentation import timed
+
+# torch / torchvision are imported on first use of the "torch" backend only;
+# the "onnx" backend needs just onnxruntime, numpy and Pillow.
+
 # ----------------------------------------------------------
 # GLOBAL STATE (kept for the lifetime of the process)
 # ----------------------------------------------------------
-_DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+_DEVICE = None
 
 _MODEL = None
 _MODEL_CLASS_NAMES = None
@@ -14,6 +23,35 @@ _MODEL_PATH = None
 _TRANSFORM = None
 _IMG_SIZE = None
 
+_ONNX_SESSIONS = {}          # onnx_path -> onnxruntime.InferenceSession
+
+DEFAULT_CLASS_NAMES = list(CLASSIFIER_LABELS)
+BACKENDS = ("torch", "onnx")
+
+# ImageNet normalization used in training
+_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+
+def _device():
+    """Device from inference_config (auto = cuda if available), threads applied first."""
+    global _DEVICE
+    if _DEVICE is None:
+        inference_config.apply("torch")
+        _DEVICE = inference_config.torch_device()
+    return _DEVICE
+
+
+def build_model(num_classes):
+    """EfficientNet-B2 with the custom classifier head (untrained)."""
+    import torch
+    from torchvision import models
+
+    model = models.efficientnet_b2(weights=None)
+    num_features = model.classifier[1].in_features
+    model.classifier[1] = torch.nn.Linear(num_features, num_classes)
+    return model
+
 
 def _get_model(model_path, class_names):
     """
@@ -26,14 +64,14 @@ def _get_model(model_path, class_names):
     global _MODEL, _MODEL_CLASS_NAMES, _MODEL_PATH
 
     if _MODEL is None:
+        import torch
+
         # First time: build architecture and load weights
-        model = models.efficientnet_b2(weights=None)
-        num_features = model.classifier[1].in_features
-        model.classifier[1] = torch.nn.Linear(num_features, len(class_names))
+        model = build_model(len(class_names))
 
-        state_dict = torch.load(model_path, map_location=_DEVICE)
+        state_dict = torch.load(model_path, map_location=_device())
         model.load_state_dict(state_dict)
-        model.to(_DEVICE)
+        model.to(_device())
         model.eval()
 
         _MODEL = model
@@ -65,6 +103,8 @@ def _get_transform(img_size):
     global _TRANSFORM, _IMG_SIZE
 
     if _TRANSFORM is None or img_size != _IMG_SIZE:
+        from torchvision import transforms
+
         _TRANSFORM = transforms.Compose([
             transforms.Resize((img_size, img_size)),
             transforms.ToTensor(),
@@ -76,11 +116,142 @@ def _get_transform(img_size):
     return _TRANSFORM
 
 
+# ----------------------------------------------------------
+# ONNX RUNTIME BACKEND (see export_onnx.py)
+# ----------------------------------------------------------
+
+def onnx_path_for(model_path):
+    """model.pth -> model.onnx (written by export_onnx.py)."""
+    return os.path.splitext(model_path)[0] + ".onnx"
+
+
+def weights_path(model_path="model.pth", backend=None):
+    """File the given backend actually loads."""
+    backend = backend or config.CLASSIFIER_BACKEND
+    return onnx_path_for(model_path) if backend == "onnx" else model_path
+
+
+def _get_onnx_session(onnx_path, class_names):
+    """
+    Create the ONNX Runtime CPU session once per file: all graph
+    optimizations on, thread counts from inference_config.
+    """
+    session = _ONNX_SESSIONS.get(onnx_path)
+    if session is None:
+        import onnxruntime as ort
+
+        if not os.path.exists(onnx_path):
+            raise FileNotFoundError(
+                f"{onnx_path} not found; create it with: python src/export_onnx.py"
+            )
+        inference_config.apply("onnx")
+        options = inference_config.onnx_session_options()
+        session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+
+        num_outputs = session.get_outputs()[0].shape[-1]
+        if isinstance(num_outputs, int) and num_outputs != len(class_names):
+            raise ValueError(
+                f"{onnx_path} has {num_outputs} outputs but {len(class_names)} class names were given."
+            )
+        _ONNX_SESSIONS[onnx_path] = session
+    return session
+
+
+def resize_pixels(img, img_size):
+    """PIL image -> img_size x img_size x 3 uint8 (the transform's Resize step)."""
+    return np.asarray(img.convert("RGB").resize((img_size, img_size), Image.BILINEAR), dtype=np.uint8)
+
+
+def normalize_pixels(pixels):
+    """HxWx3 / NxHxWx3 uint8 -> CHW / NCHW float32 (ToTensor + Normalize)."""
+    arr = (np.asarray(pixels, dtype=np.float32) / 255.0 - _MEAN) / _STD
+    return np.moveaxis(arr, -1, -3)
+
+
+def _preprocess_np(img, img_size):
+    """Same as the torchvision transform (bilinear resize, ToTensor, Normalize), as CHW float32."""
+    return normalize_pixels(resize_pixels(img, img_size))
+
+
+def _softmax(logits):
+    e = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return e / e.sum(axis=1, keepdims=True)
+
+
+# ----------------------------------------------------------
+# SHARED INFERENCE
+# ----------------------------------------------------------
+
+def _predict(images, backend, model_path, class_names, img_size, batch_size=32, stage="classify"):
+    """
+    Run the model on PIL images in batches of batch_size, capped by the
+    inference_config max_batch_size, on the (possibly CPU-pinned)
+    inference thread.
+
+    Returns (class_names, confidences 0..1, predicted indexes).
+    """
+    return inference_config.run_pinned(_predict_here, images, backend, model_path, class_names,
+                                       img_size, batch_size, stage)
+
+
+def _predict_here(images, backend, model_path, class_names, img_size, batch_size, stage):
+    confs, preds = [], []
+    batch_size = min(batch_size, inference_config.get_settings().max_batch_size)
+
+    if backend == "onnx":
+        session = _get_onnx_session(onnx_path_for(model_path), class_names)
+        input_name = session.get_inputs()[0].name
+        with timed(f"{stage}.preprocess", backend="onnx"):
+            batch = np.stack([_preprocess_np(img, img_size) for img in images])
+        with timed(f"{stage}.forward", backend="onnx"):
+            for start in range(0, len(images), batch_size):
+                logits = session.run(None, {input_name: batch[start:start + batch_size]})[0]
+                probs = _softmax(logits)
+                confs.extend(probs.max(axis=1).tolist())
+                preds.extend(probs.argmax(axis=1).tolist())
+        return list(class_names), confs, preds
+
+    if backend != "torch":
+        raise ValueError(f"Unknown classifier backend {backend!r} (use one of {BACKENDS})")
+
+    import torch
+
+    # Get cached model and class names (or load them on first call)
+    model, class_names = _get_model(model_path, class_names)
+    transform = _get_transform(img_size)
+
+    with timed(f"{stage}.preprocess", backend="torch"):
+        batch = torch.stack([transform(img) for img in images])
+    with timed(f"{stage}.forward", backend="torch"), torch.no_grad():
+        for start in range(0, len(images), batch_size):
+            x = batch[start:start + batch_size].to(_device())
+            probs = torch.softmax(model(x), dim=1)
+            conf, pred = torch.max(probs, dim=1)
+            confs.extend(conf.tolist())
+            preds.extend(pred.tolist())
+    return class_names, confs, preds
+
+
+def warm_up(model_path="model.pth", class_names=None, img_size=256, backend=None):
+    """
+    Load the model and transform ahead of the first request (used by
+    long-running processes such as fridge_server.py).
+    """
+    backend = backend or config.CLASSIFIER_BACKEND
+    class_names = class_names or DEFAULT_CLASS_NAMES
+    if backend == "onnx":
+        inference_config.run_pinned(_get_onnx_session, onnx_path_for(model_path), class_names)
+    else:
+        inference_config.run_pinned(_get_model, model_path, class_names)
+        _get_transform(img_size)
+
+
 def classify_food(image_path,
                   model_path="model.pth",
                   class_names=None,
                   img_size=256,
-                  visualize=False):
+                  visualize=False,
+                  backend=None):
     """
     Classify a food image using a trained EfficientNet-B2 model.
 
@@ -88,38 +259,34 @@ def classify_food(image_path,
     loaded only once and kept in memory until the process ends.
 
     Args:
-        image_path (str): Path to the input image.
+        image_path (str): Path to the input image, or to a preprocessed
+            HxWx3 uint8 .npy tensor from image_store (skips JPEG decoding).
         model_path (str): Path to the trained .pth model weights.
         class_names (list): List of class names corresponding to model outputs.
         img_size (int): Input image size for resizing.
         visualize (bool): Whether to display the image with label overlay.
+        backend (str): "torch" or "onnx" (ONNX Runtime on the exported
+            model next to model_path). Default: config.CLASSIFIER_BACKEND.
 
     Returns:
         tuple: (predicted_label, confidence_percent)
     """
     if class_names is None:
-        class_names = [
-            'Caesar Salad', 'Chicken Wings', 'French Fries',
-            'Fried Rice', 'Hamburger', 'Ice Cream',
-            'Pizza', 'Spaghetti Bolognese', 'Steak', 'Sushi'
-        ]
+        class_names = DEFAULT_CLASS_NAMES
+    backend = backend or config.CLASSIFIER_BACKEND
 
-    # Get cached model and class names (or load them on first call)
-    model, class_names = _get_model(model_path, class_names)
-    transform = _get_transform(img_size)
-
-    # --- Load and preprocess image ---
-    img = Image.open(image_path).convert("RGB")
-    x = transform(img).unsqueeze(0).to(_DEVICE)
+    # --- Load image ---
+    with timed("classify.decode"):
+        if str(image_path).endswith(".npy"):
+            img = Image.fromarray(np.load(image_path))
+        else:
+            img = Image.open(image_path).convert("RGB")
 
-    # --- Inference ---
-    with torch.no_grad():
-        logits = model(x)
-        probs = torch.softmax(logits, dim=1)
-        conf, pred = torch.max(probs, dim=1)
+    # --- Preprocess + inference ---
+    class_names, confs, preds = _predict([img], backend, model_path, class_names, img_size)
 
-    label = class_names[pred.item()]
-    confidence = conf.item() * 100.0
+    label = class_names[preds[0]]
+    confidence = confs[0] * 100.0
 
     # --- Visualization (optional) ---
     if visualize:
@@ -136,3 +303,116 @@ def classify_food(image_path,
         img.show()
 
     return label, confidence
+
+
+# ----------------------------------------------------------
+# DETECTION MODE (one shelf photo -> several items)
+# ----------------------------------------------------------
+_ROW_NAMES = ("top", "middle", "bottom")
+_COL_NAMES = ("left", "center", "right")
+
+
+def _window_boxes(width, height, window_fracs, overlap):
+    """Sliding windows (x0, y0, x1, y1) at each fraction of the frame size."""
+    boxes = []
+    for frac in window_fracs:
+        w, h = max(1, int(width * frac)), max(1, int(height * frac))
+        step_x = max(1, int(w * (1 - overlap)))
+        step_y = max(1, int(h * (1 - overlap)))
+        xs = list(range(0, width - w + 1, step_x))
+        ys = list(range(0, height - h + 1, step_y))
+        # Make sure the right/bottom edges are covered
+        if xs[-1] != width - w:
+            xs.append(width - w)
+        if ys[-1] != height - h:
+            ys.append(height - h)
+        boxes.extend((x, y, x + w, y + h) for y in ys for x in xs)
+    return boxes
+
+
+def _overlap(a, b):
+    """(IoU, intersection / smaller area) of two boxes."""
+    ix = max(0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    if not inter:
+        return 0.0, 0.0
+    area_a = (a[2] - a[0]) * (a[3] - a[1])
+    area_b = (b[2] - b[0]) * (b[3] - b[1])
+    return inter / (area_a + area_b - inter), inter / min(area_a, area_b)
+
+
+def _merge_detections(detections, iou_threshold, merge_overlap):
+    """
+    Greedy NMS, highest confidence first. A detection is dropped if a kept
+    one overlaps it by IoU > iou_threshold (any label), or if a kept one
+    with the same label covers > merge_overlap of the smaller box (the same
+    object seen by a big and a small window).
+    """
+    kept = []
+    for det in sorted(detections, key=lambda d: d["confidence"], reverse=True):
+        duplicate = False
+        for other in kept:
+            iou, covered = _overlap(det["box"], other["box"])
+            if iou > iou_threshold or (det["label"] == other["label"] and covered > merge_overlap):
+                duplicate = True
+                break
+        if not duplicate:
+            kept.append(det)
+    return kept
+
+
+def location_slot_for(box, width, height):
+    """Shelf position of a box centre on a 3x3 grid, e.g. "top-left"."""
+    cx = (box[0] + box[2]) / 2
+    cy = (box[1] + box[3]) / 2
+    row = min(int(cy / height * 3), 2)
+    col = min(int(cx / width * 3), 2)
+    return f"{_ROW_NAMES[row]}-{_COL_NAMES[col]}"
+
+
+def detect_foods(image_path,
+                 model_path="model.pth",
+                 class_names=None,
+                 img_size=256,
+                 window_fracs=(0.5, 1 / 3),
+                 overlap=0.5,
+                 min_confidence=60.0,
+                 iou_threshold=0.7,
+                 merge_overlap=0.5,
+                 batch_size=32,
+                 backend=None):
+    """
+    Find several foods in one photo (e.g. a whole fridge shelf).
+
+    The frame is tiled into overlapping sliding windows at each size in
+    window_fracs (default 9 half-size + 25 third-size windows). Every crop
+    is classified in batched forward passes (batch_size crops each),
+    crops under min_confidence are discarded, and duplicates are merged by
+    overlap (see _merge_detections).
+
+    Returns:
+        list of {"label", "confidence", "box": (x0, y0, x1, y1),
+                 "location_slot"}, most confident first.
+    """
+    if class_names is None:
+        class_names = DEFAULT_CLASS_NAMES
+    backend = backend or config.CLASSIFIER_BACKEND
+
+    with timed("detect.decode"):
+        img = Image.open(image_path).convert("RGB")
+    width, height = img.size
+    boxes = _window_boxes(width, height, window_fracs, overlap)
+
+    class_names, confs, preds = _predict([img.crop(box) for box in boxes], backend, model_path,
+                                         class_names, img_size, batch_size=batch_size, stage="detect")
+
+    detections = [
+        {"label": class_names[pred], "confidence": conf * 100.0, "box": box}
+        for box, conf, pred in zip(boxes, confs, preds)
+        if conf * 100.0 >= min_confidence
+    ]
+    detections = _merge_detections(detections, iou_threshold, merge_overlap)
+    for det in detections:
+        det["location_slot"] = location_slot_for(det["box"], width, height)
+    return detections
@@ -0,0 +1,182 @@
+# fridge_client.py
+"""
+Thin HTTP client for fridge_server.py.
+
+Exposes the same functions the GUI imports from setup_db / smart_fridge_db /
+recipe_service, so the GUI can switch between in-process and remote mode
+just by where it imports them from. Only the standard library is needed.
+
+Every call targets this appliance's fridge (config.FRIDGE_ID) unless a
+fridge_id is passed.
+"""
+import base64
+import json
+import os
+from datetime import date
+from typing import List, Dict
+from urllib import request, error
+from urllib.parse import urlencode
+
+import config
+
+_TIMEOUT_SECONDS = 120   # recipe generation can take a while
+
+
+def _url(path: str, **query) -> str:
+    base = config.SMART_FRIDGE_SERVER_URL.rstrip("/")
+    query = {k: v for k, v in query.items() if v is not None}
+    return f"{base}{path}" + (f"?{urlencode(query)}" if query else "")
+
+
+def _call(method: str, path: str, body: dict | None = None, **query):
+    data = None
+    headers = {}
+    if body is not None:
+        data = json.dumps(body, default=str).encode("utf-8")
+        headers["Content-Type"] = "application/json"
+
+    req = request.Request(_url(path, **query), data=data, method=method, headers=headers)
+    try:
+        with request.urlopen(req, timeout=_TIMEOUT_SECONDS) as resp:
+            return json.loads(resp.read())
+    except error.HTTPError as e:
+        try:
+            message = json.loads(e.read()).get("error", str(e))
+        except Exception:
+            message = str(e)
+        # Same exception type the local functions raise for bad input
+        if e.code == 400:
+            raise ValueError(message) from None
+        raise RuntimeError(message) from None
+
+
+def _fid(fridge_id: int | None) -> int:
+    return config.FRIDGE_ID if fridge_id is None else fridge_id
+
+
+def _image_payload(image_path: str) -> dict:
+    with open(image_path, "rb") as f:
+        encoded = base64.b64encode(f.read()).decode("ascii")
+    return {"image_base64": encoded, "filename": os.path.basename(image_path)}
+
+
+# ---------- same API as the local modules ----------
+
+def ensure_schema():
+    """The server owns the schema; just check that it is reachable."""
+    _call("GET", "/health")
+
+
+def add_item_simple(name: str, quantity: float = 1, unit: str = "pcs",
+                    expiration_date: str | date | None = None,
+                    storage: str = "fridge", location_slot: str | None = None,
+                    fridge_id: int | None = None) -> int:
+    return _call("POST", "/items", {
+        "name": name, "quantity": quantity, "unit": unit,
+        "expiration_date": expiration_date, "storage": storage,
+        "location_slot": location_slot, "fridge_id": _fid(fridge_id),
+    })["item_id"]
+
+
+def add_item_by_image(image_path: str, quantity: float, unit: str = "pcs",
+                      expiration_date: str | date | None = None,
+                      storage: str = "fridge", location_slot: str | None = None,
+                      fridge_id: int | None = None) -> int:
+    body = _image_payload(image_path)
+    body.update({
+        "quantity": quantity, "unit": unit, "expiration_date": expiration_date,
+        "storage": storage, "location_slot": location_slot,
+        "fridge_id": _fid(fridge_id),
+    })
+    return _call("POST", "/items/image", body)["item_id"]
+
+
+def add_items_by_photo(image_path: str, quantity: float = 1, unit: str = "pcs",
+                       storage: str = "fridge", min_confidence: float = 60.0,
+                       fridge_id: int | None = None) -> List[int]:
+    body = _image_payload(image_path)
+    body.update({
+        "quantity": quantity, "unit": unit, "storage": storage,
+        "min_confidence": min_confidence, "fridge_id": _fid(fridge_id),
+    })
+    return _call("POST", "/items/photo", body)["item_ids"]
+
+
+def classify_food(image_path: str):
+    result = _call("POST", "/classify", _image_payload(image_path))
+    return result["label"], result["confidence"]
+
+
+def get_all_items(fridge_id: int | None = None) -> List[Dict]:
+    return _call("GET", "/items", fridge_id=_fid(fridge_id))
+
+
+def get_expiring_items(days: int = 2, fridge_id: int | None = None) -> List[Dict]:
+    return _call("GET", "/items/expiring", days=days, fridge_id=_fid(fridge_id))
+
+
+def get_expired_items(fridge_id: int | None = None) -> List[Dict]:
+    return _call("GET", "/items/expired", fridge_id=_fid(fridge_id))
+
+
+def get_freezer_items(fridge_id: int | None = None) -> List[Dict]:
+    return _call("GET", "/items/freezer", fridge_id=_fid(fridge_id))
+
+
+def consume(name: str, qty_used: float, item_id: int | None = None,
+            fridge_id: int | None = None) -> str:
+    return _call("POST", "/consume", {
+        "name": name, "qty_used": qty_used, "item_id": item_id,
+        "fridge_id": _fid(fridge_id),
+    })["result"]
+
+
+def move_items(item_ids: List[int], to_storage: str, fridge_id: int | None = None) -> int:
+    return _call("POST", "/items/move", {
+        "item_ids": list(item_ids), "to_storage": to_storage,
+        "fridge_id": _fid(fridge_id),
+    })["moved"]
+
+
+def cook_recipe(ranked_recipe: Dict, quantities: Dict[str, float] | None = None,
+                fridge_id: int | None = None, match_aliases: bool = False) -> Dict[str, float]:
+    return _call("POST", "/recipes/cook", {
+        "recipe": ranked_recipe, "quantities": quantities,
+        "fridge_id": _fid(fridge_id), "match_aliases": match_aliases,
+    })["consumed"]
+
+
+def get_shopping_list(recipes: List[Dict], portions: Dict[str, float] | None = None,
+                      fridge_id: int | None = None) -> List[Dict]:
+    return _call("POST", "/recipes/shopping-list", {
+        "recipes": recipes, "portions": portions,
+        "fridge_id": _fid(fridge_id),
+    })["items"]
+
+
+def delete_item(item_id: int, fridge_id: int | None = None, spoiled: bool = False) -> int:
+    return _call("DELETE", f"/items/{item_id}", fridge_id=_fid(fridge_id),
+                 spoiled=1 if spoiled else None)["deleted"]
+
+
+def clear_database(fridge_id: int | None = None):
+    _call("POST", "/clear", {"fridge_id": _fid(fridge_id)})
+
+
+def get_recipe_suggestions_for_user(user_id: int = None, max_recipes: int = 10,
+                                    backend: str | None = None,
+                                    fridge_id: int | None = None) -> List[Dict]:
+    # An explicit user_id picks that user's fridge on the server
+    if user_id is None:
+        fridge_id = _fid(fridge_id)
+    return _call("GET", "/recipes", user_id=user_id, max_recipes=max_recipes,
+                 backend=backend, fridge_id=fridge_id)
+
+
+def get_meal_plan_for_user(user_id: int = None, meals: int = 5, days: int | None = None,
+                           max_recipes: int = 50, backend: str | None = None,
+                           fridge_id: int | None = None) -> Dict:
+    if user_id is None:
+        fridge_id = _fid(fridge_id)
+    return _call("GET", "/recipes/plan", user_id=user_id, meals=meals, days=days,
+                 max_recipes=max_recipes, backend=backend, fridge_id=fridge_id)
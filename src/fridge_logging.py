@@ -0,0 +1,239 @@
+# fridge_logging.py
+"""
+Structured, non-blocking logging for the inventory hot paths.
+
+    _LOG = get_logger("db")
+    _LOG.info("Moved %d item(s)", moved, extra=fields(op="move_items", moved=moved))
+
+    with log_op(_LOG, "consume", name=name) as op:
+        ...
+        op.done(f"Consumed {qty}{unit} of {name}", remaining=new_qty)
+
+Every logger lives under "smart_fridge" and only puts records on an
+in-process queue (QueueHandler); formatting and I/O happen on a
+QueueListener thread, so a mutation never waits for stdout or a file.
+
+Output is one JSON object per line (SMART_FRIDGE_LOG_FORMAT=json, default):
+
+    {"ts": "...", "level": "INFO", "logger": "smart_fridge.db",
+     "msg": "Added 1 pcs of milk (fridge)", "op": "add_item_simple",
+     "duration_ms": 3.41, "item_id": 17, ...}
+
+or the plain message (=text). log_op() adds duration_ms and, if the block
+raises, logs the error before re-raising.
+
+High-volume operations (bulk ingest) are rate limited per op: after
+SMART_FRIDGE_LOG_RATE records/s, only 1 in SMART_FRIDGE_LOG_SAMPLE is
+kept (with "sampled": N), and the next record that passes reports how many
+were dropped ("suppressed"). WARNING and above are never dropped.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, date
+from decimal import Decimal
+from typing import Dict
+
+import config
+
+ROOT_LOGGER = "smart_fridge"
+
+_LISTENER: logging.handlers.QueueListener | None = None
+_CONFIGURED = False
+_CONFIG_LOCK = threading.RLock()
+
+# LogRecord attributes that are not user fields
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "fields"}
+
+
+def fields(**kv) -> Dict:
+    """extra= for a log call: fields(op="consume", item_id=3)."""
+    return {"fields": kv}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, msg, then the fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        out.update(getattr(record, "fields", None) or {})
+        for key, value in vars(record).items():
+            if key not in _RESERVED and key not in out:
+                out[key] = value
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        return json.dumps(out, default=_json_default, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Per-(logger, op) token bucket for records below WARNING: `rate`
+    records/s with bursts of `rate`, then 1 in `sample` (0 = drop all).
+    rate <= 0 disables the limit.
+    """
+
+    def __init__(self, rate: float, sample: int):
+        super().__init__()
+        self.rate = rate
+        self.sample = sample
+        self._buckets: Dict[tuple, list] = {}    # key -> [tokens, last time, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate <= 0 or record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, (getattr(record, "fields", None) or {}).get("op"))
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.rate, now, 0]
+            bucket[0] = min(self.rate, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                sampled = None
+            elif self.sample and (bucket[2] + 1) % self.sample == 0:
+                sampled = self.sample
+            else:
+                bucket[2] += 1
+                return False
+            suppressed, bucket[2] = bucket[2], 0
+
+        extra = {}
+        if sampled:
+            extra["sampled"] = sampled
+        if suppressed:
+            extra["suppressed"] = suppressed
+        if extra:
+            record.fields = dict(getattr(record, "fields", None) or {}, **extra)
+        return True
+
+
+class _InProcessQueueHandler(logging.handlers.QueueHandler):
+    """
+    The queue never leaves this process, so the record is enqueued as-is;
+    the listener thread does all formatting (the stock prepare() formats in
+    the caller).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def configure(level: str | None = None, fmt: str | None = None, log_file: str | None = None,
+              rate: float | None = None, sample: int | None = None) -> logging.Logger:
+    """
+    Install the queue handler on the "smart_fridge" logger and start the
+    listener thread (defaults from config / SMART_FRIDGE_LOG_*). Calling it
+    again replaces the previous setup.
+    """
+    global _LISTENER, _CONFIGURED
+    level = (level or config.LOG_LEVEL).upper()
+    fmt = (fmt or config.LOG_FORMAT).lower()
+    log_file = config.LOG_FILE if log_file is None else log_file
+    rate = config.LOG_RATE if rate is None else rate
+    sample = config.LOG_SAMPLE if sample is None else sample
+
+    formatter = JsonFormatter() if fmt == "json" else logging.Formatter("%(message)s")
+    sinks = [logging.StreamHandler(sys.stdout)]
+    if log_file:
+        sinks.append(logging.FileHandler(log_file, encoding="utf-8"))
+    for sink in sinks:
+        sink.setFormatter(formatter)
+
+    root = logging.getLogger(ROOT_LOGGER)
+    with _CONFIG_LOCK:
+        if _LISTENER is not None:
+            _LISTENER.stop()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+            handler.close()
+
+        log_queue = queue.SimpleQueue()
+        handler = _InProcessQueueHandler(log_queue)
+        handler.addFilter(RateLimitFilter(rate, sample))
+        root.addHandler(handler)
+        root.setLevel(level)
+        root.propagate = False
+
+        _LISTENER = logging.handlers.QueueListener(log_queue, *sinks, respect_handler_level=True)
+        _LISTENER.start()
+        _CONFIGURED = True
+    return root
+
+
+def shutdown():
+    """Drain the queue and stop the listener thread (also runs at exit)."""
+    global _LISTENER
+    with _CONFIG_LOCK:
+        if _LISTENER is not None:
+            _LISTENER.stop()
+            _LISTENER = None
+
+
+atexit.register(shutdown)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """smart_fridge.<name>, configuring the logging layer on first use."""
+    with _CONFIG_LOCK:
+        if not _CONFIGURED:
+            configure()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+class _Op:
+    __slots__ = ("fields", "message", "level")
+
+    def __init__(self, fields: Dict):
+        self.fields = fields
+        self.message = None
+        self.level = logging.INFO
+
+    def done(self, message: str, level: int = logging.INFO, **kv):
+        """Set the record's message (and extra fields) logged when the block ends."""
+        self.message = message
+        self.level = level
+        self.fields.update(kv)
+
+
+@contextmanager
+def log_op(logger: logging.Logger, op: str, **kv):
+    """
+    Time a block and log one record for it with op, duration_ms and the
+    given fields. Nothing is logged if the block never calls done(), unless
+    it raises (ValueError = bad input: WARNING, anything else: ERROR).
+    """
+    entry = _Op(dict(op=op, **kv))
+    t0 = time.perf_counter()
+    try:
+        yield entry
+    except Exception as e:
+        entry.fields["duration_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+        entry.fields["error"] = f"{type(e).__name__}: {e}"
+        level = logging.WARNING if isinstance(e, ValueError) else logging.ERROR
+        logger.log(level, "%s failed", op, extra={"fields": entry.fields})
+        raise
+    if entry.message is not None:
+        entry.fields["duration_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+        logger.log(entry.level, entry.message, extra={"fields": entry.fields})
@@ -0,0 +1,346 @@
+# fridge_server.py
+"""
+Headless Smart Fridge service.
+
+Runs schema setup, the DB connection pool, the classifier and the recipe
+backends once per host and exposes them over a small local HTTP/JSON API:
+
+    GET    /health
+    GET    /items                      all items (item_status_view)
+    GET    /items/expiring?days=2      (served from the expiry scheduler)
+    GET    /items/expired              (served from the expiry scheduler)
+    GET    /items/freezer
+    POST   /items                      {"name", "quantity", "unit", "expiration_date", "storage", "location_slot"}
+    POST   /items/image                {"image_path" | "image_base64", "quantity", ...}
+    POST   /items/photo                {"image_path" | "image_base64", "quantity", "min_confidence", ...}
+    POST   /items/move                 {"item_ids": [...], "to_storage": "freezer" | "fridge"}
+    DELETE /items/<item_id>?spoiled=1   (spoiled: thrown away because it went off)
+    POST   /consume                    {"name", "qty_used", "item_id"}
+    POST   /recipes/cook               {"recipe": <ranked recipe>, "quantities": {"eggs": 2}, "match_aliases": false}
+    POST   /recipes/shopping-list      {"recipes": [<ranked recipe>, ...], "portions": {"eggs": 2}}
+    POST   /clear
+    POST   /classify                   {"image_path" | "image_base64"}
+    GET    /recipes?max_recipes=5&user_id=1&backend=local
+    GET    /recipes/plan?meals=5&days=5&max_recipes=50
+    GET    /analytics/consumption?weeks=8&food_name=milk
+    GET    /analytics/waste?weeks=8
+    GET    /metrics?format=json|prometheus  (SMART_FRIDGE_METRICS=1)
+
+Every inventory route takes an optional fridge_id (query string for GET and
+DELETE, JSON body for POST); without one the server's config.FRIDGE_ID is
+used. Analytics without fridge_id aggregate over all fridges.
+
+Errors come back as {"error": "..."} with status 400 (bad input / ValueError)
+or 500. Run with:
+
+    python src/fridge_server.py [--host 127.0.0.1] [--port 8765]
+"""
+import argparse
+import base64
+import json
+import os
+import tempfile
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import config
+from fridge_logging import get_logger, fields
+from setup_db import ensure_schema
+from smart_fridge_db import (
+    init_pool,
+    add_item_simple,
+    add_item_by_image,
+    add_items_by_photo,
+    get_all_items,
+    get_freezer_items,
+    consume,
+    cook_recipe,
+    move_items,
+    delete_item,
+    clear_database,
+)
+from recipe_service import get_recipe_suggestions_for_user, get_meal_plan_for_user
+from recipe_backends import get_backend
+from shopping_list import build_shopping_list
+from expiry_scheduler import get_scheduler, LogNotifier
+from event_log import get_event_log, EventLogNotifier, get_weekly_consumption, get_waste_summary
+from shelf_life_model import get_shelf_life_model
+import instrumentation
+
+_LOG = get_logger("server")
+
+# One warm model for every client; inference is serialized on it
+_CLASSIFY_LOCK = threading.Lock()
+
+
+def _json_default(o):
+    if isinstance(o, (date, datetime)):
+        return o.isoformat()
+    if isinstance(o, Decimal):
+        return float(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _image_from_body(body: dict) -> tuple:
+    """
+    Return (image_path, is_temp). Clients on the same host send image_path;
+    remote clients send the file as image_base64.
+    """
+    if body.get("image_base64"):
+        suffix = os.path.splitext(body.get("filename") or "")[1] or ".jpg"
+        fd, path = tempfile.mkstemp(prefix="fridge_upload_", suffix=suffix)
+        with os.fdopen(fd, "wb") as f:
+            f.write(base64.b64decode(body["image_base64"]))
+        return path, True
+    if body.get("image_path"):
+        return body["image_path"], False
+    raise ValueError("Send either image_path or image_base64.")
+
+
+def _fridge_id(source: dict) -> int:
+    fridge_id = source.get("fridge_id")
+    return int(fridge_id) if fridge_id not in (None, "") else config.FRIDGE_ID
+
+
+def _classify(image_path: str):
+    from food_classifier import classify_food
+    with _CLASSIFY_LOCK:
+        return classify_food(image_path)
+
+
+class FridgeRequestHandler(BaseHTTPRequestHandler):
+    server_version = "SmartFridge/1.0"
+
+    # ---------- plumbing ----------
+
+    def _send(self, status: int, payload):
+        if isinstance(payload, str):
+            # Plain-text exports (Prometheus scrape format)
+            data, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+        else:
+            data, content_type = json.dumps(payload, default=_json_default).encode("utf-8"), "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length))
+
+    def _dispatch(self, method: str):
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            body = self._body() if method in ("POST", "DELETE") else {}
+            result = self._route(method, url.path.rstrip("/") or "/", query, body)
+        except KeyError as e:
+            self._send(400, {"error": f"Missing field {e}"})
+        except (ValueError, json.JSONDecodeError) as e:
+            self._send(400, {"error": str(e)})
+        except Exception as e:
+            self._send(500, {"error": str(e)})
+        else:
+            if result is None:
+                self._send(404, {"error": f"No route for {method} {url.path}"})
+            else:
+                self._send(200, result)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def log_message(self, format, *args):
+        # Keep the console quiet; errors are returned to the client
+        pass
+
+    # ---------- routes ----------
+
+    def _route(self, method: str, path: str, query: dict, body: dict):
+        if method == "GET":
+            if path == "/health":
+                return {"status": "ok"}
+            if path == "/metrics":
+                if query.get("format") == "prometheus":
+                    return instrumentation.export_prometheus()
+                return instrumentation.snapshot()
+            if path == "/items":
+                return get_all_items(_fridge_id(query))
+            if path == "/items/expiring":
+                return get_scheduler(fridge_id=_fridge_id(query)).expiring_within(int(query.get("days", 2)))
+            if path == "/items/expired":
+                return get_scheduler(fridge_id=_fridge_id(query)).expired()
+            if path == "/items/freezer":
+                return get_freezer_items(_fridge_id(query))
+            if path == "/recipes":
+                user_id = query.get("user_id")
+                fridge_id = query.get("fridge_id")
+                return get_recipe_suggestions_for_user(
+                    user_id=int(user_id) if user_id else None,
+                    max_recipes=int(query.get("max_recipes", 10)),
+                    backend=query.get("backend"),
+                    fridge_id=int(fridge_id) if fridge_id else None,
+                )
+            if path == "/recipes/plan":
+                user_id = query.get("user_id")
+                fridge_id = query.get("fridge_id")
+                days = query.get("days")
+                return get_meal_plan_for_user(
+                    user_id=int(user_id) if user_id else None,
+                    meals=int(query.get("meals", 5)),
+                    days=int(days) if days else None,
+                    max_recipes=int(query.get("max_recipes", 50)),
+                    backend=query.get("backend"),
+                    fridge_id=int(fridge_id) if fridge_id else None,
+                )
+            if path == "/analytics/consumption" or path == "/analytics/waste":
+                fridge_id = query.get("fridge_id")
+                fridge_id = int(fridge_id) if fridge_id else None
+                weeks = int(query.get("weeks", 8))
+                if path == "/analytics/waste":
+                    return get_waste_summary(weeks, fridge_id)
+                return get_weekly_consumption(query.get("food_name"), weeks, fridge_id)
+
+        elif method == "POST":
+            if path == "/items":
+                item_id = add_item_simple(
+                    name=body["name"],
+                    quantity=float(body.get("quantity", 1)),
+                    unit=body.get("unit", "pcs"),
+                    expiration_date=body.get("expiration_date"),
+                    storage=body.get("storage", "fridge"),
+                    location_slot=body.get("location_slot"),
+                    fridge_id=_fridge_id(body),
+                )
+                return {"item_id": item_id}
+            if path == "/items/image":
+                image_path, is_temp = _image_from_body(body)
+                try:
+                    with _CLASSIFY_LOCK:
+                        item_id = add_item_by_image(
+                            image_path=image_path,
+                            quantity=float(body.get("quantity", 1)),
+                            unit=body.get("unit", "pcs"),
+                            expiration_date=body.get("expiration_date"),
+                            storage=body.get("storage", "fridge"),
+                            location_slot=body.get("location_slot"),
+                            fridge_id=_fridge_id(body),
+                        )
+                finally:
+                    if is_temp:
+                        os.remove(image_path)
+                return {"item_id": item_id}
+            if path == "/items/photo":
+                image_path, is_temp = _image_from_body(body)
+                try:
+                    with _CLASSIFY_LOCK:
+                        item_ids = add_items_by_photo(
+                            image_path=image_path,
+                            quantity=float(body.get("quantity", 1)),
+                            unit=body.get("unit", "pcs"),
+                            storage=body.get("storage", "fridge"),
+                            min_confidence=float(body.get("min_confidence", 60.0)),
+                            fridge_id=_fridge_id(body),
+                        )
+                finally:
+                    if is_temp:
+                        os.remove(image_path)
+                return {"item_ids": item_ids}
+            if path == "/items/move":
+                moved = move_items([int(i) for i in body["item_ids"]], body["to_storage"],
+                                   _fridge_id(body))
+                return {"moved": moved}
+            if path == "/consume":
+                item_id = body.get("item_id")
+                result = consume(
+                    name=body["name"],
+                    qty_used=float(body["qty_used"]),
+                    item_id=int(item_id) if item_id else None,
+                    fridge_id=_fridge_id(body),
+                )
+                return {"result": result}
+            if path == "/recipes/cook":
+                used = cook_recipe(body["recipe"], body.get("quantities"), _fridge_id(body),
+                                   match_aliases=bool(body.get("match_aliases")))
+                return {"consumed": used}
+            if path == "/recipes/shopping-list":
+                items = build_shopping_list(body.get("recipes") or [], get_all_items(_fridge_id(body)),
+                                            body.get("portions"))
+                return {"items": items}
+            if path == "/clear":
+                # Clearing over HTTP only ever empties one fridge
+                clear_database(_fridge_id(body))
+                return {"status": "cleared"}
+            if path == "/classify":
+                image_path, is_temp = _image_from_body(body)
+                try:
+                    label, confidence = _classify(image_path)
+                finally:
+                    if is_temp:
+                        os.remove(image_path)
+                return {"label": label, "confidence": confidence}
+
+        elif method == "DELETE":
+            if path.startswith("/items/"):
+                return {"deleted": delete_item(int(path.rsplit("/", 1)[1]), _fridge_id(query),
+                                               spoiled=query.get("spoiled") in ("1", "true"))}
+
+        return None
+
+
+def warm_up(model_path: str = "model.pth"):
+    """Load everything that is expensive once, before serving requests."""
+    ensure_schema()
+    init_pool()
+    get_backend()
+    # Expired items are both logged and recorded as "expire" events
+    get_scheduler(notifier=EventLogNotifier(get_event_log(), LogNotifier()))
+    get_shelf_life_model()
+    if config.INVENTORY_STORE != "off":
+        from inventory_store import get_inventory_store
+        get_inventory_store(config.FRIDGE_ID)
+
+    from food_classifier import warm_up as warm_up_classifier, weights_path
+    weights = weights_path(model_path)
+    if os.path.exists(weights):
+        warm_up_classifier(model_path)
+    else:
+        _LOG.warning("%s not found; classifier will load on first image request", weights,
+                     extra=fields(op="warm_up", weights=weights))
+
+
+def serve(host: str | None = None, port: int | None = None, model_path: str = "model.pth"):
+    host = host or config.SERVER_HOST
+    port = port or config.SERVER_PORT
+
+    warm_up(model_path)
+    httpd = ThreadingHTTPServer((host, port), FridgeRequestHandler)
+    _LOG.info("Smart Fridge service listening on http://%s:%s", host, port,
+              extra=fields(op="serve", host=host, port=port))
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless Smart Fridge HTTP service")
+    parser.add_argument("--host", default=None)
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--model", default="model.pth", help="classifier weights (.pth)")
+    args = parser.parse_args()
+
+    serve(args.host, args.port, args.model)
@@ -0,0 +1,132 @@
+# image_store.py
+"""
+Content-addressed image store.
+
+Every image added to the fridge is copied once into
+
+    <root>/originals/<h[:2]>/<h>.<ext>    the upload, byte for byte
+    <root>/thumbs/<h[:2]>/<h>.jpg         THUMBNAIL_SIZE JPEG for the GUI
+    <root>/tensors/<h[:2]>/<h>.npy        TENSOR_SIZE x TENSOR_SIZE x 3 uint8 RGB
+
+where h is the SHA-256 of the file contents, so identical images are stored
+(and decoded) once no matter how often or under which name they are added.
+food_items.image_path holds the stored original's path, which stays valid
+after the caller's file moves; the thumbnail and tensor are found from it
+with artifacts_for().
+
+The tensor is the decoded, resized image the classifier consumes at its
+default img_size, so re-classification reads ~200 KB of raw pixels instead
+of decoding a multi-megabyte JPEG.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+import config
+
+THUMBNAIL_SIZE = (128, 128)
+TENSOR_SIZE = 256
+_CHUNK = 1 << 20
+
+
+class StoredImage:
+    __slots__ = ("sha256", "original", "thumbnail", "tensor", "is_new")
+
+    def __init__(self, sha256: str, original: str, thumbnail: str, tensor: str, is_new: bool):
+        self.sha256 = sha256
+        self.original = original
+        self.thumbnail = thumbnail
+        self.tensor = tensor
+        self.is_new = is_new
+
+    def __repr__(self):
+        return f"StoredImage({self.sha256[:12]}…, new={self.is_new})"
+
+
+def _root() -> str:
+    return config.IMAGE_STORE_DIR
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _paths(sha256: str, ext: str) -> tuple:
+    shard = sha256[:2]
+    root = _root()
+    return (
+        os.path.join(root, "originals", shard, sha256 + ext),
+        os.path.join(root, "thumbs", shard, sha256 + ".jpg"),
+        os.path.join(root, "tensors", shard, sha256 + ".npy"),
+    )
+
+
+def _atomic_write(path: str, write):
+    """Write via a temp file in the same directory, then rename into place."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def ingest(image_path: str) -> StoredImage:
+    """
+    Store image_path (deduplicated by content) and make sure its thumbnail
+    and tensor exist. Cheap for an image that is already stored: one hash
+    pass over the file, no decode.
+    """
+    sha256 = file_sha256(image_path)
+    ext = os.path.splitext(image_path)[1].lower() or ".jpg"
+    original, thumbnail, tensor = _paths(sha256, ext)
+
+    is_new = not os.path.exists(original)
+    if is_new:
+        def copy(f):
+            with open(image_path, "rb") as src:
+                shutil.copyfileobj(src, f, _CHUNK)
+        _atomic_write(original, copy)
+
+    if not (os.path.exists(thumbnail) and os.path.exists(tensor)):
+        # One decode produces both derived artifacts
+        with Image.open(original) as img:
+            img = img.convert("RGB")
+            pixels = np.asarray(img.resize((TENSOR_SIZE, TENSOR_SIZE), Image.BILINEAR), dtype=np.uint8)
+            img.thumbnail(THUMBNAIL_SIZE)
+            _atomic_write(thumbnail, lambda f: img.save(f, format="JPEG", quality=85))
+        _atomic_write(tensor, lambda f: np.save(f, pixels))
+
+    return StoredImage(sha256, original, thumbnail, tensor, is_new)
+
+
+def artifacts_for(stored_path: str) -> StoredImage | None:
+    """Thumbnail/tensor paths for a stored original (None if not in the store)."""
+    name = os.path.basename(stored_path)
+    sha256, ext = os.path.splitext(name)
+    if len(sha256) != 64:
+        return None
+    original, thumbnail, tensor = _paths(sha256, ext)
+    if os.path.abspath(original) != os.path.abspath(stored_path):
+        return None
+    return StoredImage(sha256, original, thumbnail, tensor, False)
+
+
+def load_tensor(stored_path: str) -> np.ndarray:
+    """TENSOR_SIZE x TENSOR_SIZE x 3 uint8 pixels of a stored image (re-ingests if missing)."""
+    artifacts = artifacts_for(stored_path)
+    if artifacts is None or not os.path.exists(artifacts.tensor):
+        artifacts = ingest(stored_path)
+    return np.load(artifacts.tensor)
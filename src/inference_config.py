@@ -0,0 +1,364 @@
+# inference_config.py
+"""
+Classifier inference settings: device, intra-op / inter-op thread counts,
+a per-forward-pass batch cap and optional CPU affinity.
+
+Settings are resolved once per process, lowest priority first:
+
+    1. defaults (library thread defaults, batch cap 32, no affinity)
+    2. inference_settings.json, written by the autotune command below
+    3. SMART_FRIDGE_INFER_* environment variables (see config.py)
+
+and applied by food_classifier the first time a backend is loaded:
+
+    python src/inference_config.py show
+    python src/inference_config.py autotune [--backend onnx] [--pictures pictures/]
+
+autotune times every candidate in a fresh subprocess (torch accepts
+inter-op threads and affinity only once per process) on the pictures/
+samples, then saves the fastest settings. On a small appliance, fewer
+threads than cores usually wins: the GUI, DB workers and scheduler need
+the rest.
+
+CPU affinity never applies to the whole process: with cpu_affinity set,
+food_classifier loads models and runs inference through run_pinned(), on
+one dedicated worker thread pinned to those CPUs. The torch / onnxruntime
+thread pools are created from that thread and inherit its mask, while the
+HTTP server, GUI and DB threads keep every core.
+"""
+import argparse
+import itertools
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+DEVICES = ("auto", "cpu", "cuda")
+
+
+class InferenceSettings:
+    __slots__ = ("device", "intra_op_threads", "inter_op_threads", "max_batch_size", "cpu_affinity")
+
+    def __init__(self, device="auto", intra_op_threads=0, inter_op_threads=0,
+                 max_batch_size=32, cpu_affinity=None):
+        if device not in DEVICES:
+            raise ValueError(f"Unknown inference device {device!r} (use one of {DEVICES})")
+        self.device = device
+        self.intra_op_threads = int(intra_op_threads)     # 0 = library default
+        self.inter_op_threads = int(inter_op_threads)     # 0 = library default
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.cpu_affinity = sorted(set(cpu_affinity)) if cpu_affinity else None
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self):
+        return f"InferenceSettings({self.to_dict()})"
+
+
+def parse_cpu_list(spec) -> list | None:
+    """'0-3,6' -> [0, 1, 2, 3, 6]; empty -> None."""
+    if not spec:
+        return None
+    if isinstance(spec, (list, tuple)):
+        return [int(c) for c in spec]
+    cpus = []
+    for part in str(spec).split(","):
+        part = part.strip()
+        if "-" in part:
+            lo, hi = part.split("-", 1)
+            cpus.extend(range(int(lo), int(hi) + 1))
+        elif part:
+            cpus.append(int(part))
+    return cpus or None
+
+
+def format_cpu_list(cpus) -> str:
+    return ",".join(str(c) for c in cpus) if cpus else ""
+
+
+def _from_file(path) -> dict:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring {path}: {e}")
+        return {}
+    return {k: v for k, v in data.get("settings", data).items() if k in InferenceSettings.__slots__}
+
+
+def _from_env() -> dict:
+    values = {}
+    if config.INFERENCE_DEVICE:
+        values["device"] = config.INFERENCE_DEVICE.lower()
+    if config.INFERENCE_THREADS:
+        values["intra_op_threads"] = int(config.INFERENCE_THREADS)
+    elif config.ONNX_INTRA_OP_THREADS:
+        values["intra_op_threads"] = config.ONNX_INTRA_OP_THREADS
+    if config.INFERENCE_INTEROP_THREADS:
+        values["inter_op_threads"] = int(config.INFERENCE_INTEROP_THREADS)
+    if config.INFERENCE_MAX_BATCH:
+        values["max_batch_size"] = int(config.INFERENCE_MAX_BATCH)
+    if config.INFERENCE_CPU_AFFINITY:
+        values["cpu_affinity"] = parse_cpu_list(config.INFERENCE_CPU_AFFINITY)
+    return values
+
+
+_SETTINGS = None
+_APPLIED = set()            # backends whose thread settings were applied
+_LOCK = threading.Lock()
+
+
+def get_settings() -> InferenceSettings:
+    """Resolved settings (defaults < settings file < environment), cached."""
+    global _SETTINGS
+    if _SETTINGS is None:
+        values = _from_file(config.INFERENCE_SETTINGS_PATH)
+        values.update(_from_env())
+        _SETTINGS = InferenceSettings(**values)
+    return _SETTINGS
+
+
+def reset():
+    """Forget the resolved settings (already-applied thread settings stay)."""
+    global _SETTINGS
+    _SETTINGS = None
+
+
+def _apply_affinity(cpus):
+    """
+    Pin the calling thread (pid 0 = this thread on Linux); thread pools it
+    creates afterwards inherit the mask. Only ever called on the inference
+    worker. No-op where sched_setaffinity is unavailable (Windows/macOS).
+    """
+    if not cpus or not hasattr(os, "sched_setaffinity"):
+        return
+    available = os.sched_getaffinity(0)
+    cpus = [c for c in cpus if c in available]
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+
+
+_WORKER: ThreadPoolExecutor | None = None
+_WORKER_STATE = threading.local()
+
+
+def _init_worker(cpus):
+    _WORKER_STATE.pinned = True
+    _apply_affinity(cpus)
+
+
+def run_pinned(fn, *args, **kwargs):
+    """
+    Call fn on the inference worker thread, pinned to cpu_affinity, and
+    return its result. Runs fn directly when no affinity is configured
+    (or supported), or when already on the worker.
+    """
+    global _WORKER
+    cpus = get_settings().cpu_affinity
+    if not cpus or not hasattr(os, "sched_setaffinity") or getattr(_WORKER_STATE, "pinned", False):
+        return fn(*args, **kwargs)
+    with _LOCK:
+        if _WORKER is None:
+            _WORKER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference",
+                                         initializer=_init_worker, initargs=(cpus,))
+    return _WORKER.submit(fn, *args, **kwargs).result()
+
+
+def apply(backend: str):
+    """
+    Apply the settings for backend ("torch" or "onnx") once per process.
+    Called by food_classifier before it loads a model.
+    """
+    with _LOCK:
+        if backend in _APPLIED:
+            return
+        settings = get_settings()
+        if backend == "torch":
+            import torch
+
+            if settings.intra_op_threads:
+                torch.set_num_threads(settings.intra_op_threads)
+            if settings.inter_op_threads:
+                try:
+                    torch.set_num_interop_threads(settings.inter_op_threads)
+                except RuntimeError as e:
+                    # Only allowed before torch starts any parallel work
+                    print(f"⚠️ Could not set inter-op threads: {e}")
+        _APPLIED.add(backend)
+
+
+def torch_device():
+    import torch
+
+    device = get_settings().device
+    if device == "auto":
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+    return torch.device(device)
+
+
+def onnx_session_options():
+    """onnxruntime.SessionOptions with the configured thread counts."""
+    import onnxruntime as ort
+
+    settings = get_settings()
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if settings.intra_op_threads:
+        options.intra_op_num_threads = settings.intra_op_threads
+    if settings.inter_op_threads:
+        options.inter_op_num_threads = settings.inter_op_threads
+    return options
+
+
+def save_settings(settings: InferenceSettings, path=None, benchmark=None) -> str:
+    path = path or config.INFERENCE_SETTINGS_PATH
+    payload = {"settings": settings.to_dict()}
+    if benchmark:
+        payload["benchmark"] = benchmark
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp, path)
+    return path
+
+
+# ---------- auto-tune ----------
+
+def _load_samples(pictures_dir, img_size):
+    from PIL import Image
+
+    images = []
+    for name in sorted(os.listdir(pictures_dir)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        try:
+            with Image.open(os.path.join(pictures_dir, name)) as img:
+                images.append(img.convert("RGB").resize((img_size, img_size)))
+        except OSError:
+            continue
+    if not images:
+        raise ValueError(f"No readable images in {pictures_dir}")
+    return images
+
+
+def _bench(backend, model_path, pictures_dir, num_images, repeats, img_size=256) -> dict:
+    """Time the current process's settings (run inside an autotune worker)."""
+    from food_classifier import DEFAULT_CLASS_NAMES, _predict
+
+    samples = _load_samples(pictures_dir, img_size)
+    images = list(itertools.islice(itertools.cycle(samples), num_images))
+    batch_size = get_settings().max_batch_size
+
+    _predict(images[:batch_size], backend, model_path, DEFAULT_CLASS_NAMES, img_size, batch_size)  # warm-up
+    runs = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        _predict(images, backend, model_path, DEFAULT_CLASS_NAMES, img_size, batch_size)
+        runs.append((time.perf_counter() - t0) * 1000 / len(images))
+    return {"ms_per_image": round(statistics.median(runs), 3), "runs": [round(r, 3) for r in runs]}
+
+
+def _candidates(cpu_count, threads=None, interop=None, batch_sizes=None, pin=True):
+    threads = threads or sorted({t for t in (1, 2, 4, cpu_count // 2, cpu_count) if 1 <= t <= cpu_count})
+    interop = interop or [1, 2]
+    batch_sizes = batch_sizes or [1, 8, 32]
+    for t, i, b in itertools.product(threads, interop, batch_sizes):
+        yield InferenceSettings("auto", t, i, b)
+        if pin and t < cpu_count:
+            yield InferenceSettings("auto", t, i, b, list(range(cpu_count - t, cpu_count)))
+
+
+def autotune(backend=None, model_path="model.pth", pictures_dir="pictures", num_images=32,
+             repeats=3, threads=None, interop=None, batch_sizes=None, pin=True,
+             save=True, path=None):
+    """
+    Benchmark each candidate setting in its own subprocess and (optionally)
+    persist the fastest. Returns (best InferenceSettings, results list).
+    """
+    backend = backend or config.CLASSIFIER_BACKEND
+    cpu_count = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    pin = pin and hasattr(os, "sched_setaffinity")
+
+    results = []
+    for settings in _candidates(cpu_count, threads, interop, batch_sizes, pin):
+        cmd = [sys.executable, os.path.abspath(__file__), "_bench", "--backend", backend,
+               "--model", model_path, "--pictures", pictures_dir,
+               "--images", str(num_images), "--repeats", str(repeats),
+               "--settings", json.dumps(settings.to_dict())]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"❌ {settings.to_dict()}: {proc.stderr.strip().splitlines()[-1:]}")
+            continue
+        timing = json.loads(proc.stdout.strip().splitlines()[-1])
+        results.append({"settings": settings.to_dict(), **timing})
+        print(f"⏱️ threads={settings.intra_op_threads} interop={settings.inter_op_threads} "
+              f"batch={settings.max_batch_size} cpus={format_cpu_list(settings.cpu_affinity) or 'all'}: "
+              f"{timing['ms_per_image']} ms/image")
+
+    if not results:
+        raise RuntimeError("Every autotune candidate failed; check --model and --pictures")
+    best = min(results, key=lambda r: r["ms_per_image"])
+    best_settings = InferenceSettings(**best["settings"])
+    if save:
+        saved = save_settings(best_settings, path, benchmark={
+            "backend": backend,
+            "ms_per_image": best["ms_per_image"],
+            "cpu_count": cpu_count,
+            "tuned_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        })
+        print(f"✅ Saved {best_settings.to_dict()} ({best['ms_per_image']} ms/image) to {saved}")
+    return best_settings, results
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Classifier inference settings")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("show", help="print the resolved settings")
+
+    for name in ("autotune", "_bench"):
+        p = sub.add_parser(name, help="sweep settings on this machine and save the fastest"
+                           if name == "autotune" else "(internal) time one setting")
+        p.add_argument("--backend", choices=("torch", "onnx"), default=None)
+        p.add_argument("--model", default="model.pth")
+        p.add_argument("--pictures", default="pictures")
+        p.add_argument("--images", type=int, default=32, help="images per timed run")
+        p.add_argument("--repeats", type=int, default=3)
+        if name == "autotune":
+            p.add_argument("--threads", type=_int_list, default=None, help="e.g. 1,2,4")
+            p.add_argument("--interop", type=_int_list, default=None, help="e.g. 1,2")
+            p.add_argument("--batch-sizes", type=_int_list, default=None, help="e.g. 1,8,32")
+            p.add_argument("--no-pin", action="store_true", help="skip CPU affinity candidates")
+            p.add_argument("--dry-run", action="store_true", help="do not save the result")
+            p.add_argument("--out", default=None, help="settings file (default: config)")
+        else:
+            p.add_argument("--settings", required=True, help="InferenceSettings as JSON")
+
+    args = parser.parse_args()
+    if args.command == "show":
+        print(json.dumps(get_settings().to_dict(), indent=2))
+    elif args.command == "_bench":
+        # Exactly the candidate under test: no settings file, no env overrides.
+        # food_classifier imports this file as inference_config, not __main__.
+        import inference_config
+        inference_config._SETTINGS = inference_config.InferenceSettings(**json.loads(args.settings))
+        backend = args.backend or config.CLASSIFIER_BACKEND
+        print(json.dumps(inference_config._bench(backend, args.model, args.pictures, args.images, args.repeats)))
+    else:
+        autotune(args.backend, args.model, args.pictures, args.images, args.repeats,
+                 args.threads, args.interop, args.batch_sizes, not args.no_pin,
+                 save=not args.dry_run, path=args.out)
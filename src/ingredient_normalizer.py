@@ -0,0 +1,232 @@
+# ingredient_normalizer.py
+"""
+Map free-text ingredient / food names onto the canonical names used by
+SHELF_LIFE_DAYS, FOOD_CATEGORIES and food_types.
+
+    "2 Eggs"                 -> "eggs"
+    "Tomatoes"               -> "tomato"
+    "chicken breast"         -> "chicken"
+    "chicken thigh strips"   -> "chicken"
+    "200g minced beef"       -> "beef"
+    "fresh strawberries"     -> "strawberry"
+    "tomato sauce"           -> "tomato sauce"   (unknown: cleaned, singular)
+
+clean_food_name() is the storage-side variant: it only strips quantities and
+adjectives and singularizes, without alias folding or cut stripping, so what
+the user put in the fridge ("bacon", "chicken breast") keeps its name.
+Aliases are applied when matching recipes, via normalize_ingredient() on
+both sides. RELATED_FOODS ("bacon" -> "ham") are different foods that only
+borrow a known food's default shelf life and category (defaults_food()).
+
+The lookup tables are compiled once at import and normalize_ingredient() is
+memoized, so repeated strings (the common case for LLM output and the
+fridge inventory) cost a single dict hit.
+"""
+import re
+from functools import lru_cache
+
+from shelf_life_data import SHELF_LIFE_DAYS
+from food_categories import FOOD_CATEGORIES
+
+# ----------------------------------------------------------
+# Alias table (alias -> canonical name): other spellings, names and cuts of
+# the same food, which recipe matching treats as interchangeable
+# ----------------------------------------------------------
+INGREDIENT_ALIASES = {
+    # meat & fish
+    "chicken breast": "chicken",
+    "chicken thigh": "chicken",
+    "chicken fillet": "chicken",
+    "ground beef": "beef",
+    "minced beef": "beef",
+    "beef mince": "beef",
+
+    # dairy & eggs
+    "egg": "eggs",
+    "yoghurt": "yogurt",
+    "greek yogurt": "yogurt",
+
+    # produce
+    "red onion": "onion",
+    "scallion": "spring onion",
+    "romaine": "lettuce",
+    "iceberg lettuce": "lettuce",
+    "cherry tomato": "tomato",
+    "grape": "grapes",
+
+    # condiments
+    "mayo": "mayonnaise",
+    "catsup": "ketchup",
+
+    # cooked dishes / classifier labels
+    "burger": "hamburger",
+    "fries": "french fries",
+    "wings": "chicken wings",
+    "spag bol": "spaghetti bolognese",
+    "bolognese": "spaghetti bolognese",
+    "leftover": "leftovers",
+}
+
+# ----------------------------------------------------------
+# Related foods (food -> known food): distinct foods that take a known
+# food's default shelf life and category, but are never matched as it
+# (a recipe's "ham" is not bacon)
+# ----------------------------------------------------------
+RELATED_FOODS = {
+    "bacon": "ham",
+    "salmon": "fish",
+    "cod": "fish",
+    "tuna": "fish",
+    "white fish": "fish",
+    "mince": "beef",
+    "cheddar": "cheese",
+    "cheddar cheese": "cheese",
+    "mozzarella": "cheese",
+    "mozzarella cheese": "cheese",
+    "parmesan": "cheese",
+    "parmesan cheese": "cheese",
+    "feta": "cheese",
+    "spring onion": "onion",
+    "orange juice": "juice",
+    "apple juice": "juice",
+    "cola": "soda",
+    "cheeseburger": "hamburger",
+}
+
+# Words dropped before matching (quantities, units, preparation adjectives)
+_QUANTITY_WORDS = {
+    "a", "an", "of", "one", "two", "three", "four", "five", "six",
+    "dozen", "half", "some", "few", "handful", "pinch", "dash",
+}
+_UNIT_WORDS = {
+    "g", "gram", "kg", "mg", "ml", "l", "litre", "liter", "cl", "oz", "lb",
+    "cup", "tbsp", "tsp", "tablespoon", "teaspoon", "pc", "pcs", "piece",
+    "slice", "can", "tin", "jar", "pack", "packet", "bunch", "clove",
+    "stick", "bottle", "fillet",
+}
+_ADJECTIVE_WORDS = {
+    "fresh", "large", "small", "medium", "big", "ripe", "raw", "organic",
+    "chopped", "diced", "sliced", "grated", "shredded", "minced", "crushed",
+    "peeled", "boneless", "skinless", "lean", "whole", "frozen", "chilled",
+    "leftover", "optional", "finely", "roughly", "thinly", "free-range",
+}
+_DROP_WORDS = _QUANTITY_WORDS | _UNIT_WORDS | _ADJECTIVE_WORDS
+
+# Cuts/forms that may follow a known food ("chicken thigh", "pork loin")
+_CUT_WORDS = {
+    "breast", "thigh", "leg", "drumstick", "loin", "chop", "mince",
+    "strip", "chunk", "cube", "piece", "floret", "segment", "wedge",
+}
+
+_PAREN_RE = re.compile(r"\([^)]*\)")
+_TOKEN_RE = re.compile(r"[a-z]+(?:-[a-z]+)?")
+
+
+def _singular(word: str) -> str:
+    """Very small English plural stemmer (good enough for food words)."""
+    if len(word) <= 3 or word.endswith(("ss", "us", "is")):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"            # strawberries -> strawberry
+    if word.endswith(("oes", "ches", "shes", "xes", "sses")):
+        return word[:-2]                  # tomatoes -> tomato
+    if word.endswith("s"):
+        return word[:-1]                  # eggs -> egg
+    return word
+
+
+def _stem_phrase(words) -> str:
+    return " ".join(_singular(w) for w in words)
+
+
+def _compile_lookup(aliases: bool = True) -> dict:
+    """stemmed phrase -> canonical name, built once from the data modules."""
+    lookup = {}
+    for name in list(SHELF_LIFE_DAYS) + list(FOOD_CATEGORIES):
+        lookup[_stem_phrase(name.split())] = name
+        lookup.setdefault(name, name)
+    if aliases:
+        for alias, canonical in INGREDIENT_ALIASES.items():
+            lookup.setdefault(_stem_phrase(alias.split()), canonical)
+    return lookup
+
+
+_LOOKUP = _compile_lookup()
+_NAME_LOOKUP = _compile_lookup(aliases=False)
+
+
+def _core_words(text: str) -> tuple:
+    """(all words, words without quantities / units / adjectives) of lower-cased text."""
+    text = _PAREN_RE.sub(" ", text).split(",")[0]
+    words = _TOKEN_RE.findall(text)
+    return words, [w for w in words if _singular(w) not in _DROP_WORDS and w not in _DROP_WORDS]
+
+
+@lru_cache(maxsize=8192)
+def normalize_ingredient(s: str | None) -> str | None:
+    """
+    Return the canonical name for an ingredient / food string.
+
+    Known foods (SHELF_LIFE_DAYS, FOOD_CATEGORIES, INGREDIENT_ALIASES) map to
+    their canonical spelling; anything else comes back lower-cased, with
+    quantities/adjectives removed and words singularized.
+    """
+    if not isinstance(s, str):
+        return s
+
+    text = s.strip().lower()
+    if text in _LOOKUP:
+        return _LOOKUP[text]
+
+    words, core = _core_words(text)
+
+    # 1) full phrase (handles "cooked rice" before "cooked" could be touched)
+    stemmed = _stem_phrase(words)
+    if stemmed in _LOOKUP:
+        return _LOOKUP[stemmed]
+
+    # 2) without quantities / units / adjectives
+    stemmed = _stem_phrase(core)
+    if stemmed in _LOOKUP:
+        return _LOOKUP[stemmed]
+
+    # 3) known food followed only by cut words ("chicken thigh strips")
+    core_stems = stemmed.split()
+    for size in range(len(core_stems) - 1, 0, -1):
+        head = " ".join(core_stems[:size])
+        if head in _LOOKUP and all(w in _CUT_WORDS for w in core_stems[size:]):
+            return _LOOKUP[head]
+
+    return stemmed or s.strip().lower()
+
+
+@lru_cache(maxsize=8192)
+def clean_food_name(s: str | None) -> str | None:
+    """
+    Name to store for a food: "2 Tomatoes" -> "tomato", "Bacon" -> "bacon".
+
+    Like normalize_ingredient() but without INGREDIENT_ALIASES or cut
+    stripping, so distinct foods are never rewritten into each other.
+    """
+    if not isinstance(s, str):
+        return s
+
+    text = s.strip().lower()
+    if text in _NAME_LOOKUP:
+        return _NAME_LOOKUP[text]
+
+    words, core = _core_words(text)
+    for phrase in (_stem_phrase(words), _stem_phrase(core)):
+        if phrase in _NAME_LOOKUP:
+            return _NAME_LOOKUP[phrase]
+    return _stem_phrase(core) or text
+
+
+def defaults_food(name: str | None) -> str | None:
+    """
+    Known food whose static defaults (shelf life, category) apply to a
+    stored name: "bacon" -> "ham", "chicken breast" -> "chicken".
+    """
+    name = clean_food_name(name)
+    canonical = normalize_ingredient(name)
+    return RELATED_FOODS.get(name) or RELATED_FOODS.get(canonical) or canonical
@@ -0,0 +1,335 @@
+# instrumentation.py
+"""
+Lightweight hot-path instrumentation.
+
+    with timed("classify.forward"):
+        ...
+    @timed_fn("recipes.rank")
+    def split_and_rank_recipes(...): ...
+    inc("recipes.backend_fallback")
+
+Each metric is a latency histogram (fixed buckets, seconds) or a counter,
+keyed by name plus optional labels (timed("db.query", op="consume")).
+Disabled by default: timed() then returns a shared no-op context and
+wrap_connection() returns the connection untouched, so the cost is one flag
+check per call site. Enable with SMART_FRIDGE_METRICS=1 or enable().
+
+Exports:
+    export_prometheus()   Prometheus text exposition format
+    export_json()         {"histograms": [...], "counters": [...]}
+
+Opt-in profiling of a block (cProfile, or pyinstrument if installed):
+
+    with profile("classify.prof"):
+        classify_food("pictures/pizza.jpg")
+"""
+import functools
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Tuple
+
+import config
+
+# Upper bounds in seconds (+Inf is implicit)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+           0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_ENABLED = config.METRICS_ENABLED
+_LOCK = threading.Lock()
+_HISTOGRAMS: Dict[Tuple, "Histogram"] = {}
+_COUNTERS: Dict[Tuple, float] = {}
+
+
+def enable():
+    global _ENABLED
+    _ENABLED = True
+
+
+def disable():
+    global _ENABLED
+    _ENABLED = False
+
+
+def is_enabled() -> bool:
+    return _ENABLED
+
+
+def reset():
+    with _LOCK:
+        _HISTOGRAMS.clear()
+        _COUNTERS.clear()
+
+
+def _key(name: str, labels: dict) -> Tuple:
+    return (name, tuple(sorted(labels.items()))) if labels else (name, ())
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        i = 0
+        while i < len(BUCKETS) and seconds > BUCKETS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += seconds
+
+
+# ---------- recording ----------
+
+def observe(name: str, seconds: float, **labels):
+    if not _ENABLED:
+        return
+    key = _key(name, labels)
+    with _LOCK:
+        hist = _HISTOGRAMS.get(key)
+        if hist is None:
+            hist = _HISTOGRAMS[key] = Histogram()
+        hist.observe(seconds)
+
+
+def inc(name: str, value: float = 1, **labels):
+    if not _ENABLED:
+        return
+    key = _key(name, labels)
+    with _LOCK:
+        _COUNTERS[key] = _COUNTERS.get(key, 0) + value
+
+
+class _Timer:
+    __slots__ = ("name", "labels", "t0")
+
+    def __init__(self, name: str, labels: dict):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, time.perf_counter() - self.t0, **self.labels)
+        if exc_type is not None:
+            inc(self.name + ".errors", **self.labels)
+        return False
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopTimer()
+
+
+def timed(name: str, **labels):
+    """Context manager recording the block's latency under name."""
+    if not _ENABLED:
+        return _NOOP
+    return _Timer(name, labels)
+
+
+def timed_fn(name: str, **labels):
+    """Decorator version of timed()."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _ENABLED:
+                return fn(*args, **kwargs)
+            with _Timer(name, labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ---------- DB statements ----------
+
+class _TimedCursor:
+    """Cursor proxy timing execute/executemany as db.query{op=<caller>}."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, *args, **kwargs):
+        with _Timer("db.query", {"op": sys._getframe(1).f_code.co_name}):
+            return self._cursor.execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        with _Timer("db.query", {"op": sys._getframe(1).f_code.co_name}):
+            return self._cursor.executemany(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        self._cursor.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._cursor.__exit__(*exc)
+
+
+class _TimedConnection:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, *args, **kwargs):
+        return _TimedCursor(self._conn.cursor(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def wrap_connection(conn):
+    """Time every statement run on conn (no-op while disabled)."""
+    if not _ENABLED:
+        return conn
+    return _TimedConnection(conn)
+
+
+# ---------- export ----------
+
+def _prom_name(name: str) -> str:
+    return "smart_fridge_" + "".join(c if c.isalnum() else "_" for c in name)
+
+
+def _prom_labels(labels: Tuple, extra: str = "") -> str:
+    parts = [f'{k}="{str(v)}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def export_prometheus() -> str:
+    with _LOCK:
+        hists = [(k, list(h.counts), h.count, h.sum) for k, h in _HISTOGRAMS.items()]
+        counters = list(_COUNTERS.items())
+
+    lines = []
+    seen = set()
+    for (name, labels), counts, count, total in sorted(hists):
+        metric = _prom_name(name) + "_seconds"
+        if metric not in seen:
+            lines.append(f"# TYPE {metric} histogram")
+            seen.add(metric)
+        cumulative = 0
+        for bound, n in zip(BUCKETS + (float("inf"),), counts):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            le_label = 'le="' + le + '"'
+            lines.append(f"{metric}_bucket{_prom_labels(labels, le_label)} {cumulative}")
+        lines.append(f"{metric}_sum{_prom_labels(labels)} {total}")
+        lines.append(f"{metric}_count{_prom_labels(labels)} {count}")
+
+    for (name, labels), value in sorted(counters):
+        metric = _prom_name(name) + "_total"
+        if metric not in seen:
+            lines.append(f"# TYPE {metric} counter")
+            seen.add(metric)
+        lines.append(f"{metric}{_prom_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def _percentile(counts, count: int, q: float) -> float | None:
+    """Upper bucket bound containing the q-th quantile."""
+    if not count:
+        return None
+    target = q * count
+    cumulative = 0
+    for bound, n in zip(BUCKETS + (float("inf"),), counts):
+        cumulative += n
+        if cumulative >= target:
+            return bound
+    return float("inf")
+
+
+def snapshot() -> Dict:
+    with _LOCK:
+        hists = [(k, list(h.counts), h.count, h.sum) for k, h in _HISTOGRAMS.items()]
+        counters = list(_COUNTERS.items())
+
+    return {
+        "histograms": [
+            {
+                "name": name,
+                "labels": dict(labels),
+                "count": count,
+                "sum_seconds": total,
+                "mean_ms": round(total / count * 1000, 3) if count else None,
+                "p50_le_seconds": _percentile(counts, count, 0.5),
+                "p95_le_seconds": _percentile(counts, count, 0.95),
+                "buckets": dict(zip([str(b) for b in BUCKETS] + ["+Inf"], counts)),
+            }
+            for (name, labels), counts, count, total in sorted(hists)
+        ],
+        "counters": [
+            {"name": name, "labels": dict(labels), "value": value}
+            for (name, labels), value in sorted(counters)
+        ],
+    }
+
+
+def export_json() -> str:
+    return json.dumps(snapshot(), default=str)
+
+
+# ---------- profiling ----------
+
+@contextmanager
+def profile(output: str | None = None, engine: str = "cprofile", interval: float = 0.001):
+    """
+    Profile the enclosed block. engine="cprofile" writes pstats to output
+    (or prints the top 25 by cumulative time); engine="pyinstrument" samples
+    every `interval` seconds and writes HTML to output (or prints text).
+    """
+    if engine == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise RuntimeError("pyinstrument is not installed (pip install pyinstrument)") from None
+        profiler = Profiler(interval=interval)
+        profiler.start()
+        try:
+            yield profiler
+        finally:
+            profiler.stop()
+            if output:
+                with open(output, "w", encoding="utf-8") as f:
+                    f.write(profiler.output_html())
+            else:
+                print(profiler.output_text())
+        return
+
+    if engine != "cprofile":
+        raise ValueError(f"Unknown profiler engine {engine!r} (use 'cprofile' or 'pyinstrument')")
+
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if output:
+            profiler.dump_stats(output)
+        else:
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
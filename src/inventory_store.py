@@ -0,0 +1,497 @@
+# inventory_store.py
+"""
+Optional in-memory inventory engine for one fridge.
+
+Loads the fridge's rows from item_status_view once into __slots__ records
+and keeps these indexes:
+
+    by item_id      item_id -> InventoryItem
+    by food name    name -> [items], sorted by expiration (FIFO order)
+    by storage      storage -> {item_id: InventoryItem}
+    fridge expiry   sorted [(expiration_date, item_id)] of fridge items
+
+Once installed (get_inventory_store), smart_fridge_db serves get_all_items,
+the expiring/expired/freezer lists, get_fridge_items_for_llm, consume and
+delete_item for that fridge from memory.
+
+Writes:
+  - "through" (default): consume/delete commit to MySQL before returning.
+    consume subtracts in SQL (quantity = quantity - used, only if enough
+    is left), so concurrent consumes of one item never overwrite each other.
+  - "behind": consume/delete update memory at once and are flushed to MySQL
+    in batches (one transaction, executemany) by a background thread;
+    mutation listeners run after the flush commits. A failed batch goes
+    back on the queue (newer writes to the same item win) and is retried
+    with exponential backoff, up to MAX_RETRY_DELAY seconds apart.
+Adds always go through smart_fridge_db (the row needs its AUTO_INCREMENT id
+and the expiration trigger). The store follows every committed mutation via
+the mutation listener (skipping the events it publishes itself), so writes
+made by smart_fridge_db directly keep it in sync as well.
+"""
+import atexit
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, List
+
+import config
+import smart_fridge_db
+from fridge_logging import get_logger, log_op, fields
+from smart_fridge_db import (
+    DEFAULT_FRIDGE_ID,
+    get_connection,
+    add_mutation_listener,
+    remove_mutation_listener,
+    summarize_for_llm,
+)
+
+_LOG = get_logger("inventory")
+
+
+class InventoryItem:
+    """One item_status_view row (status is derived on read)."""
+
+    __slots__ = ("item_id", "fridge_id", "food_type_id", "food_name", "food_category",
+                 "quantity", "unit", "date_added", "expiration_date", "storage",
+                 "frozen_remaining_days", "location_slot", "added_by", "detection_label", "confidence_score",
+                 "image_path")
+
+    def __init__(self, row: Dict):
+        for field in self.__slots__:
+            setattr(self, field, row.get(field))
+
+    def sort_key(self):
+        exp = self.expiration_date
+        return (exp is None, exp or date.max, self.item_id)
+
+    def status(self, today: date) -> str:
+        # Same rules as item_status_view
+        if self.storage == "freezer":
+            return "frozen"
+        if self.expiration_date is None:
+            return "unknown"
+        if self.expiration_date < today:
+            return "expired"
+        if (self.expiration_date - today).days <= 2:
+            return "expiring soon"
+        return "fresh"
+
+    def to_dict(self, today: date) -> Dict:
+        row = {field: getattr(self, field) for field in self.__slots__}
+        row["status"] = self.status(today)
+        return row
+
+
+class InventoryStore:
+    MAX_RETRY_DELAY = 60.0
+
+    def __init__(self, fridge_id: int | None = None, write_mode: str = "through",
+                 flush_interval: float = 1.0):
+        if write_mode not in ("through", "behind"):
+            raise ValueError("write_mode must be 'through' or 'behind'")
+        self.fridge_id = DEFAULT_FRIDGE_ID if fridge_id is None else fridge_id
+        self.write_mode = write_mode
+        self.flush_interval = flush_interval
+
+        self._lock = threading.RLock()
+        self._by_id: Dict[int, InventoryItem] = {}
+        self._by_name: Dict[str, List[InventoryItem]] = {}
+        self._by_storage: Dict[str, Dict[int, InventoryItem]] = {}
+        self._fridge_expiry: List[tuple] = []
+
+        # Write-behind queue: item_id -> new quantity (0 = delete), plus the
+        # mutation events to publish once the batch is committed
+        self._pending: Dict[int, Decimal] = {}
+        self._pending_events: List[tuple] = []
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        # Set while this store publishes its own (already applied) events
+        self._publishing = threading.local()
+
+    # ---------- lifecycle ----------
+
+    def load(self):
+        """
+        (Re)load every row of this fridge from item_status_view. Writes
+        still queued for write-behind are applied on top of the loaded rows.
+        """
+        conn = get_connection()
+        try:
+            with conn.cursor(dictionary=True) as cur:
+                cur.execute("SELECT * FROM item_status_view WHERE fridge_id = %s;", (self.fridge_id,))
+                rows = cur.fetchall()
+        finally:
+            conn.close()
+
+        with self._lock:
+            self._by_id.clear()
+            self._by_name.clear()
+            self._by_storage.clear()
+            self._fridge_expiry.clear()
+            for row in rows:
+                self._index(InventoryItem(row))
+            for item_id, quantity in self._pending.items():
+                self._apply_quantity(item_id, quantity)
+
+    def start(self):
+        self.load()
+        add_mutation_listener(self._on_mutation)
+        if self.write_mode == "behind" and self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"inventory-store-{self.fridge_id}",
+                                            daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def stop(self):
+        remove_mutation_listener(self._on_mutation)
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    # ---------- indexes ----------
+
+    def _index(self, item: InventoryItem):
+        self._by_id[item.item_id] = item
+        insort(self._by_name.setdefault(item.food_name, []), item, key=InventoryItem.sort_key)
+        self._by_storage.setdefault(item.storage, {})[item.item_id] = item
+        if item.storage == "fridge" and item.expiration_date is not None:
+            insort(self._fridge_expiry, (item.expiration_date, item.item_id))
+
+    def _unindex(self, item_id: int) -> InventoryItem | None:
+        item = self._by_id.pop(item_id, None)
+        if item is None:
+            return None
+        same_name = self._by_name.get(item.food_name, [])
+        if item in same_name:
+            same_name.remove(item)
+        if not same_name:
+            self._by_name.pop(item.food_name, None)
+        self._by_storage.get(item.storage, {}).pop(item_id, None)
+        if item.storage == "fridge" and item.expiration_date is not None:
+            i = bisect_left(self._fridge_expiry, (item.expiration_date, item_id))
+            if i < len(self._fridge_expiry) and self._fridge_expiry[i] == (item.expiration_date, item_id):
+                del self._fridge_expiry[i]
+        return item
+
+    # ---------- reads (no DB access) ----------
+
+    def get_all_items(self) -> List[Dict]:
+        today = date.today()
+        with self._lock:
+            items = sorted(self._by_id.values(), key=InventoryItem.sort_key)
+            return [item.to_dict(today) for item in items]
+
+    def _fridge_range(self, lo: date | None, hi: date | None) -> List[Dict]:
+        today = date.today()
+        with self._lock:
+            start = 0 if lo is None else bisect_left(self._fridge_expiry, (lo,))
+            end = len(self._fridge_expiry) if hi is None else bisect_right(self._fridge_expiry, (hi, float("inf")))
+            return [self._by_id[item_id].to_dict(today) for _, item_id in self._fridge_expiry[start:end]]
+
+    def get_expiring_items(self, days: int = 2) -> List[Dict]:
+        today = date.today()
+        return self._fridge_range(today, today + timedelta(days=days))
+
+    def get_expired_items(self) -> List[Dict]:
+        return self._fridge_range(None, date.today() - timedelta(days=1))
+
+    def get_freezer_items(self) -> List[Dict]:
+        today = date.today()
+        with self._lock:
+            items = sorted(self._by_storage.get("freezer", {}).values(), key=lambda i: i.food_name)
+            return [item.to_dict(today) for item in items]
+
+    def get_fridge_items_for_llm(self) -> List[Dict]:
+        with self._lock:
+            rows = [{"food_name": i.food_name, "expiration_date": i.expiration_date,
+                     "storage": i.storage, "quantity": i.quantity}
+                    for i in self._by_id.values()]
+        return summarize_for_llm(rows)
+
+    def items_by_name(self, name: str) -> List[Dict]:
+        """Items of one food, soonest expiration first."""
+        today = date.today()
+        with self._lock:
+            return [item.to_dict(today) for item in self._by_name.get(name, [])]
+
+    # ---------- writes ----------
+
+    def consume(self, name: str, qty_used: float, item_id: int | None = None) -> str:
+        """Same contract as smart_fridge_db.consume (name already normalized)."""
+        with log_op(_LOG, "consume", fridge_id=self.fridge_id, name=name, quantity=qty_used,
+                    write_mode=self.write_mode) as op:
+            if qty_used <= 0:
+                raise ValueError("Consumed quantity must be positive.")
+
+            with self._lock:
+                items = self._by_name.get(name, [])
+                if not items:
+                    raise ValueError(f"'{name}' is not in your fridge.")
+                if item_id is None:
+                    if len(items) != 1:
+                        raise ValueError(
+                            f"Multiple '{name}' items exist. Specify item_id. "
+                            f"IDs available: " + ", ".join(str(i.item_id) for i in items)
+                        )
+                    item = items[0]
+                else:
+                    item = next((i for i in items if i.item_id == item_id), None)
+                    if item is None:
+                        raise ValueError(f"No '{name}' found with item_id={item_id}.")
+
+                current_qty = float(item.quantity)
+                unit = item.unit
+                if qty_used > current_qty:
+                    raise ValueError(
+                        f"Cannot consume {qty_used}{unit}; only {current_qty}{unit} available."
+                    )
+                new_qty = current_qty - qty_used
+                storage = item.storage
+
+                if self.write_mode == "behind":
+                    self._apply_quantity(item.item_id, new_qty)
+                    self._queue(item.item_id, new_qty, ("consume", dict(
+                        fridge_id=self.fridge_id, item_id=item.item_id, food_name=name, quantity=qty_used,
+                        remaining=new_qty, unit=unit, storage=storage)))
+
+            if self.write_mode == "through":
+                # Relative to whatever the row holds now, so a concurrent consume
+                # (here or in another process) can't be overwritten
+                new_qty = float(self._write_consume(item.item_id, qty_used, unit))
+                self._apply_quantity(item.item_id, new_qty)
+                self._publish([("consume", dict(fridge_id=self.fridge_id, item_id=item.item_id, food_name=name,
+                                                quantity=qty_used, remaining=new_qty, unit=unit,
+                                                storage=storage))])
+            result = "deleted" if new_qty <= 0 else "updated"
+
+            if result == "deleted":
+                op.done(f"Fully consumed and removed {name} (ID {item.item_id})",
+                        item_id=item.item_id, unit=unit, remaining=new_qty)
+            else:
+                op.done(f"Consumed {qty_used}{unit} of {name}. Remaining: {new_qty}{unit}.",
+                        item_id=item.item_id, unit=unit, remaining=new_qty)
+        return result
+
+    def delete_item(self, item_id: int, spoiled: bool = False) -> int:
+        with self._lock:
+            item = self._by_id.get(item_id)
+            if item is None:
+                return 0
+            event = ("delete", dict(fridge_id=self.fridge_id, item_id=item_id, food_name=item.food_name,
+                                    quantity=item.quantity, unit=item.unit, storage=item.storage,
+                                    spoiled=spoiled))
+            if self.write_mode == "behind":
+                self._unindex(item_id)
+                self._queue(item_id, Decimal(0), event)
+                return 1
+
+        deleted = self._write([(item_id, Decimal(0))])
+        with self._lock:
+            self._unindex(item_id)
+        if deleted:
+            self._publish([event])
+        return deleted
+
+    def _publish(self, events: List[tuple]):
+        self._publishing.active = True
+        try:
+            for event, details in events:
+                smart_fridge_db._notify_mutation(event, **details)
+        finally:
+            self._publishing.active = False
+
+    def _apply_quantity(self, item_id: int, quantity):
+        with self._lock:
+            if quantity is None or float(quantity) <= 0:
+                self._unindex(item_id)
+            elif item_id in self._by_id:
+                self._by_id[item_id].quantity = Decimal(str(quantity))
+
+    def _write(self, changes: List[tuple]) -> int:
+        """Apply [(item_id, new_quantity)] (0 = delete) in one transaction."""
+        deletes = [(item_id, self.fridge_id) for item_id, qty in changes if qty <= 0]
+        updates = [(qty, item_id, self.fridge_id) for item_id, qty in changes if qty > 0]
+        conn = get_connection()
+        try:
+            with conn.cursor() as cur:
+                affected = 0
+                if deletes:
+                    cur.executemany("DELETE FROM food_items WHERE item_id = %s AND fridge_id = %s;", deletes)
+                    affected += cur.rowcount
+                if updates:
+                    cur.executemany("UPDATE food_items SET quantity = %s WHERE item_id = %s AND fridge_id = %s;",
+                                    updates)
+                    affected += cur.rowcount
+            conn.commit()
+            return affected
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _write_consume(self, item_id: int, qty_used: float, unit: str) -> Decimal:
+        """
+        Take qty_used off the row in one transaction, deleting it when it
+        reaches 0. Returns the quantity left; ValueError if the row no longer
+        holds enough.
+        """
+        qty = Decimal(str(qty_used))
+        conn = get_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    UPDATE food_items SET quantity = quantity - %s
+                    WHERE item_id = %s AND fridge_id = %s AND quantity >= %s;
+                """, (qty, item_id, self.fridge_id, qty))
+                if not cur.rowcount:
+                    cur.execute("SELECT quantity FROM food_items WHERE item_id = %s AND fridge_id = %s;",
+                                (item_id, self.fridge_id))
+                    row = cur.fetchone()
+                    conn.rollback()
+                    self._load_item(item_id)
+                    if row is None:
+                        raise ValueError(f"Item {item_id} is no longer in your fridge.")
+                    raise ValueError(f"Cannot consume {qty_used}{unit}; only {float(row[0])}{unit} available.")
+                cur.execute("SELECT quantity FROM food_items WHERE item_id = %s;", (item_id,))
+                remaining = cur.fetchone()[0]
+                if remaining <= 0:
+                    cur.execute("DELETE FROM food_items WHERE item_id = %s;", (item_id,))
+            conn.commit()
+            return remaining
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    # ---------- write-behind ----------
+
+    def _queue(self, item_id: int, quantity, event: tuple):
+        self._pending[item_id] = Decimal(str(quantity))
+        self._pending_events.append(event)
+        self._wake.set()
+
+    def _run(self):
+        failures = 0
+        while not self._stop.is_set():
+            if failures:
+                self._stop.wait(min(self.flush_interval * 2 ** failures, self.MAX_RETRY_DELAY))
+            else:
+                self._wake.wait(timeout=self.flush_interval)
+                self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                failures += 1
+                _LOG.warning("Inventory flush failed for fridge %s (attempt %d), will retry: %s",
+                             self.fridge_id, failures, e,
+                             extra=fields(op="flush", fridge_id=self.fridge_id, attempt=failures))
+                continue
+            if failures:
+                # The queued writes are committed now; pick up whatever else
+                # changed in the DB while it was unreachable
+                failures = 0
+                try:
+                    self.load()
+                except Exception as e:
+                    _LOG.warning("Inventory reload failed for fridge %s: %s", self.fridge_id, e,
+                                 extra=fields(op="load", fridge_id=self.fridge_id))
+
+    def flush(self) -> int:
+        """Commit queued consume/delete writes, then publish their events."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                events, self._pending_events = self._pending_events, []
+            if not pending:
+                return 0
+            try:
+                self._write(list(pending.items()))
+            except Exception:
+                # Back on the queue, under anything queued for the same item since
+                with self._lock:
+                    for item_id, quantity in pending.items():
+                        self._pending.setdefault(item_id, quantity)
+                    self._pending_events[:0] = events
+                raise
+            self._publish(events)
+            return len(pending)
+
+    # ---------- sync with committed mutations ----------
+
+    def _on_mutation(self, event: str, details: dict):
+        if getattr(self._publishing, "active", False):
+            return
+        fridge_id = details.get("fridge_id")
+        if fridge_id not in (None, self.fridge_id):
+            return
+        if event == "clear":
+            self.load()
+        elif event == "add":
+            self._load_item(details["item_id"])
+        elif event == "consume":
+            self._apply_quantity(details["item_id"], details.get("remaining"))
+        elif event == "delete":
+            with self._lock:
+                self._unindex(details["item_id"])
+        elif event == "move":
+            # Storage and expiry were recomputed in SQL: re-read the rows
+            self._load_items(details["item_ids"])
+        elif "item_id" in details:
+            # Any other row change: re-read that row
+            self._load_item(details["item_id"])
+
+    def _load_item(self, item_id: int):
+        # One PK lookup: picks up trigger-computed columns (expiration_date)
+        self._load_items([item_id])
+
+    def _load_items(self, item_ids: List[int]):
+        if not item_ids:
+            return
+        conn = get_connection()
+        try:
+            with conn.cursor(dictionary=True) as cur:
+                placeholders = ", ".join(["%s"] * len(item_ids))
+                cur.execute(f"SELECT * FROM item_status_view WHERE item_id IN ({placeholders});",
+                            tuple(item_ids))
+                rows = {row["item_id"]: row for row in cur.fetchall()}
+        finally:
+            conn.close()
+        with self._lock:
+            for item_id in item_ids:
+                self._unindex(item_id)
+                row = rows.get(item_id)
+                if row is not None and row["fridge_id"] == self.fridge_id:
+                    self._index(InventoryItem(row))
+
+
+_STORES: Dict[int, InventoryStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_inventory_store(fridge_id: int | None = None, write_mode: str | None = None) -> InventoryStore:
+    """
+    Return the store for one fridge, loading it and routing that fridge's
+    smart_fridge_db reads/consume/delete through it on first use.
+    """
+    if fridge_id is None:
+        fridge_id = DEFAULT_FRIDGE_ID
+    with _STORES_LOCK:
+        store = _STORES.get(fridge_id)
+        if store is None:
+            if write_mode is None:
+                write_mode = "behind" if config.INVENTORY_STORE == "behind" else "through"
+            store = InventoryStore(fridge_id, write_mode)
+            store.start()
+            _STORES[fridge_id] = store
+            smart_fridge_db.set_inventory_store(fridge_id, store)
+    return store
@@ -109,7 +109,8 @@ def demo():
 
 
 
-    clear_database()
+    # Empties only this appliance's fridge (wipe_database() resets everything)
+    clear_database(DEFAULT_FRIDGE_ID)
 
 if __name__ == "__main__":
     demo()
@@ -0,0 +1,363 @@
+# meal_planner.py
+from bisect import bisect_right
+from datetime import date, timedelta
+from time import perf_counter
+from typing import List, Dict, Iterable
+
+from ingredient_normalizer import normalize_ingredient
+from instrumentation import timed_fn
+from recipe_rank import EXPIRY_WINDOW_DAYS
+
+
+def _weight(days_left: int | None) -> int:
+    """Urgency of one unit, on the same scale as expiry_score (0 = not soon)."""
+    return 0 if days_left is None else max(0, EXPIRY_WINDOW_DAYS - days_left)
+
+
+class _Candidate:
+    __slots__ = ("rank", "recipe", "foods", "need", "standalone")
+
+    def __init__(self, rank: int, recipe: Dict, foods: tuple, need: tuple):
+        self.rank = rank
+        self.recipe = recipe
+        self.foods = foods          # food indexes into the planner's lots
+        self.need = need            # quantity per food (same order)
+        self.standalone = 0
+
+
+class _Timeout(Exception):
+    pass
+
+
+class MealPlanner:
+    """
+    Choose N recipes for the next K days so that, together, they use as
+    much soon-to-expire food as possible.
+
+    split_and_rank_recipes scores every recipe on its own, so its top 5
+    may all use the same chicken. The planner instead simulates cooking:
+
+      - The inventory is a set of lots (one per item row) with a quantity
+        and days until expiry. Frozen and undated items never expire within
+        the plan, and expired items are unusable.
+      - Meal j is cooked on day j * K // N. Each of its available
+        ingredients takes portion units (default 1, as cook_recipe does)
+        from the lots still good that day, soonest-expiring first. A recipe
+        whose ingredients no longer have enough left can't be picked.
+      - Using a unit is worth max(0, EXPIRY_WINDOW_DAYS - days_left), the
+        same urgency expiry_score uses. The plan maximizes the total.
+
+    Search: a greedy plan (best marginal value per slot) is the incumbent.
+    Branch and bound then explores the best candidates. A subproblem is
+    (slot, recipes used, remaining lots), and a revisit that doesn't beat
+    the value already reached there is cut. The bound is the smaller of
+
+      - the sum of the best current marginal values, which can only shrink
+        as food is used, and
+      - a capacity relaxation: the k remaining slots on or before a lot's
+        last good day can take at most k * (largest portion of that food)
+        units of it, and at most as many units in total as the k hungriest
+        recipes, so the most urgent units within those caps bound what the
+        rest of the plan can earn.
+
+    Recipes with the same usable ingredient set are interchangeable, so
+    the best-ranked one stands for all of them. For each distinct slot day
+    the top candidate_limit candidates by standalone value on that day
+    are kept (a recipe that is weak today can be the best one for day 4),
+    and only their union is searched. optimal=True means the search
+    finished and no candidate with any value was cut; if time_budget_ms
+    runs out or candidates were cut, the best plan found is returned with
+    optimal=False.
+    """
+
+    def __init__(self, inventory: Iterable[Dict], portions: Dict[str, float] | None = None,
+                 today: date | None = None):
+        self.today = today or date.today()
+        self.portions = {normalize_ingredient(k): float(v) for k, v in (portions or {}).items()}
+
+        lots: Dict[str, List[tuple]] = {}
+        for row in inventory:
+            qty = float(row.get("quantity") or 0)
+            if qty <= 0:
+                continue
+            exp = row.get("expiration_date")
+            if row.get("storage") == "freezer" or exp is None:
+                days_left = None
+            else:
+                days_left = (exp - self.today).days
+                if days_left < 0:
+                    continue
+            lots.setdefault(normalize_ingredient(row["food_name"]), []).append((days_left, qty))
+
+        self._food_index: Dict[str, int] = {}
+        self._food_names: List[str] = []
+        self._lot_days: List[tuple] = []       # per food: days_left of each lot, soonest first
+        initial = []
+        for name, food_lots in lots.items():
+            food_lots.sort(key=lambda lot: (lot[0] is None, lot[0] or 0))
+            self._food_index[name] = len(self._lot_days)
+            self._food_names.append(name)
+            self._lot_days.append(tuple(d for d, _ in food_lots))
+            initial.append(tuple(q for _, q in food_lots))
+        self._initial = tuple(initial)
+
+    # ---------- simulation ----------
+
+    def _cook(self, state: tuple, cand: _Candidate, day: int):
+        """(value, new_state) of cooking cand on day, or None if something ran out."""
+        new_state = list(state)
+        value = 0.0
+        for food, need in zip(cand.foods, cand.need):
+            lot_days = self._lot_days[food]
+            qtys = list(new_state[food])
+            usable = sum(q for d, q in zip(lot_days, qtys) if d is None or d >= day)
+            if usable + 1e-9 < need:
+                return None
+            for i, d in enumerate(lot_days):
+                if need <= 0:
+                    break
+                if (d is not None and d < day) or qtys[i] <= 0:
+                    continue
+                take = min(need, qtys[i])
+                qtys[i] -= take
+                need -= take
+                value += take * _weight(d)
+            new_state[food] = tuple(qtys)
+        return value, tuple(new_state)
+
+    @staticmethod
+    def _caps(cands: List[_Candidate], slots: int) -> tuple:
+        """
+        (food -> largest portion any candidate takes, unit_caps) where
+        unit_caps[k] is the most units k meals can take (the k hungriest).
+        """
+        max_need: Dict[int, float] = {}
+        for cand in cands:
+            for food, need in zip(cand.foods, cand.need):
+                max_need[food] = max(max_need.get(food, 0.0), need)
+        sizes = sorted((sum(c.need) for c in cands), reverse=True)
+        return max_need, [sum(sizes[:k]) for k in range(slots + 1)]
+
+    def _capacity_bound(self, state: tuple, days_left: List[int],
+                        max_need: Dict[int, float], unit_caps: List[float]) -> float:
+        """
+        Upper bound on what meals on the remaining slot days can earn. A lot
+        good until day d only feeds the k slots on or before d, so those take
+        at most k * (largest portion) units of that food and unit_caps[k]
+        units overall. The caps are nested by d, so filling them with the
+        most urgent units first is optimal for the relaxation.
+        """
+        units = []
+        for food in max_need:
+            for d, q in zip(self._lot_days[food], state[food]):
+                # Lots are soonest-expiring first, so weights only go down
+                if d is None or _weight(d) == 0:
+                    break
+                if q > 0 and d >= days_left[0]:
+                    units.append((d, food, q))
+        units.sort()
+
+        total, used, used_food = 0.0, 0.0, {}
+        for d, food, qty in units:
+            slots = bisect_right(days_left, d)
+            take = min(qty,
+                       max_need[food] * slots - used_food.get(food, 0.0),
+                       unit_caps[slots] - used)
+            if take <= 0:
+                continue
+            total += take * _weight(d)
+            used += take
+            used_food[food] = used_food.get(food, 0.0) + take
+        return total
+
+    def _candidates(self, ranked_recipes: List[Dict]) -> List[_Candidate]:
+        by_foods: Dict[tuple, _Candidate] = {}
+        for rank, recipe in enumerate(ranked_recipes):
+            names = {normalize_ingredient(i) for i in recipe.get("ingredients_available") or []}
+            foods = tuple(sorted(self._food_index[n] for n in names if n in self._food_index))
+            if not foods or foods in by_foods:
+                continue
+            need = tuple(self.portions.get(self._food_names[f], 1.0) for f in foods)
+            cand = _Candidate(rank, recipe, foods, need)
+            cooked = self._cook(self._initial, cand, 0)
+            if cooked is None:
+                continue
+            cand.standalone = cooked[0]
+            by_foods[foods] = cand
+        return list(by_foods.values())
+
+    def _value_on(self, cand: _Candidate, day: int) -> float:
+        """Standalone value of cooking cand first, on `day` (0 if it can't be cooked then)."""
+        if day == 0:
+            return cand.standalone
+        cooked = self._cook(self._initial, cand, day)
+        return 0.0 if cooked is None else cooked[0]
+
+    def _shortlist(self, cands: List[_Candidate], days: List[int], limit: int) -> tuple:
+        """
+        (union of the top `limit` candidates by standalone value on each day,
+         number of candidates worth anything on some day).
+        """
+        chosen: Dict[int, tuple] = {}         # rank -> (best value on any day, cand)
+        useful = set()
+        for day in days:
+            values = [(self._value_on(c, day), c) for c in cands]
+            values = [(v, c) for v, c in values if v > 0]
+            useful.update(c.rank for _, c in values)
+            values.sort(key=lambda vc: (-vc[0], vc[1].rank))
+            for value, cand in values[:limit]:
+                if value > chosen.get(cand.rank, (0.0,))[0]:
+                    chosen[cand.rank] = (value, cand)
+        ordered = [c for _, c in sorted(chosen.values(), key=lambda vc: (-vc[0], vc[1].rank))]
+        return ordered, len(useful)
+
+    # ---------- search ----------
+
+    def _greedy(self, cands, slot_days) -> tuple:
+        state, used, picks, total = self._initial, 0, [], 0.0
+        for day in slot_days:
+            best = None
+            for i, cand in enumerate(cands):
+                if used >> i & 1:
+                    continue
+                cooked = self._cook(state, cand, day)
+                if cooked is not None and cooked[0] > 0 and (best is None or cooked[0] > best[1]):
+                    best = (i, cooked[0], cooked[1])
+            if best is None:
+                break
+            i, value, state = best
+            used |= 1 << i
+            picks.append(i)
+            total += value
+        return total, tuple(picks)
+
+    def _search(self, cands, slot_days, deadline, incumbent) -> tuple:
+        best = [incumbent[0], incumbent[1]]
+        seen: Dict[tuple, float] = {}
+        values: Dict[tuple, float] = {}        # (cand, day, its foods' lots) -> value
+        slots = len(slot_days)
+        max_need, unit_caps = self._caps(cands, slots)
+
+        def visit(slot, used, state, acc, picks):
+            if perf_counter() > deadline:
+                raise _Timeout
+            if acc > best[0] + 1e-9:
+                best[0], best[1] = acc, picks
+            if slot == slots:
+                return
+            key = (slot, used, state)
+            if seen.get(key, -1.0) >= acc:
+                return
+            seen[key] = acc
+
+            day = slot_days[slot]
+            children = []
+            for i, cand in enumerate(cands):
+                if used >> i & 1:
+                    continue
+                # A recipe's value depends only on its own foods' lots
+                vkey = (i, day, tuple(state[f] for f in cand.foods))
+                value = values.get(vkey)
+                if value is None:
+                    cooked = self._cook(state, cand, day)
+                    value = values[vkey] = 0.0 if cooked is None else cooked[0]
+                if value > 0:
+                    children.append((value, i))
+            if not children:
+                return
+            children.sort(key=lambda c: (-c[0], cands[c[1]].rank))
+            left = slots - slot
+            bound = acc + min(sum(c[0] for c in children[:left]),
+                              self._capacity_bound(state, slot_days[slot:], max_need, unit_caps))
+            if bound <= best[0] + 1e-9:
+                return
+            rest = sum(c[0] for c in children[:left - 1])
+            for value, i in children:
+                if acc + value + rest <= best[0] + 1e-9:
+                    break             # values are sorted, so no later child can do better
+                new_state = self._cook(state, cands[i], day)[1]
+                visit(slot + 1, used | 1 << i, new_state, acc + value, picks + (i,))
+
+        try:
+            visit(0, 0, self._initial, 0.0, ())
+            optimal = True
+        except _Timeout:
+            optimal = False
+        return best[0], best[1], optimal
+
+    def plan(self, ranked_recipes: List[Dict], meals: int = 5, days: int | None = None,
+             candidate_limit: int = 16, time_budget_ms: float = 80.0) -> Dict:
+        """
+        Returns {"meals": [{"day", "date", "title", "recipe", "uses", "score"}, ...],
+                 "score", "bound", "optimal", "elapsed_ms"}.
+
+        bound is an upper bound on the best possible score over all the
+        recipes (not just the searched ones); score / bound is how close
+        the plan is guaranteed to be when optimal is False.
+
+        uses maps food -> quantity taken and can be passed to
+        smart_fridge_db.cook_recipe(recipe, quantities=uses). If fewer than
+        `meals` recipes save any soon-to-expire food, the remaining slots are
+        filled with the best-ranked recipes that are still cookable.
+        """
+        t0 = perf_counter()
+        days = days or meals
+        slot_days = [j * days // meals for j in range(meals)]
+
+        cands = self._candidates(ranked_recipes)
+        searched, useful = self._shortlist(cands, sorted(set(slot_days)), candidate_limit)
+
+        # Upper bound over every candidate, searched or not
+        max_need, unit_caps = self._caps(cands, meals)
+        top = sorted((c.standalone for c in cands), reverse=True)
+        bound = min(sum(top[:meals]), self._capacity_bound(self._initial, slot_days, max_need, unit_caps))
+
+        incumbent = self._greedy(searched, slot_days)
+        score, picks, finished = self._search(searched, slot_days, t0 + time_budget_ms / 1000.0, incumbent)
+        optimal = (finished and len(searched) == useful) or score >= bound - 1e-9
+
+        # Replay the chosen order, then fill empty slots with cookable recipes
+        chosen = [searched[i] for i in picks]
+        chosen_ranks = {c.rank for c in chosen}
+        fillers = iter(sorted((c for c in cands if c.rank not in chosen_ranks), key=lambda c: c.rank))
+        state, plan = self._initial, []
+        for slot, day in enumerate(slot_days):
+            cand = chosen[slot] if slot < len(chosen) else None
+            cooked = self._cook(state, cand, day) if cand else None
+            while cooked is None:
+                cand = next(fillers, None)
+                if cand is None:
+                    break
+                cooked = self._cook(state, cand, day)
+            if cooked is None:
+                break
+            before, (value, state) = state, cooked
+            uses = {self._food_names[f]: round(sum(before[f]) - sum(state[f]), 6) for f in cand.foods}
+            plan.append({
+                "day": day,
+                "date": self.today + timedelta(days=day),
+                "title": cand.recipe.get("title", ""),
+                "recipe": cand.recipe,
+                "uses": uses,
+                "score": round(value, 3),
+            })
+
+        return {
+            "meals": plan,
+            "score": round(sum(m["score"] for m in plan), 3),
+            "bound": round(bound, 3),
+            "optimal": optimal,
+            "elapsed_ms": round((perf_counter() - t0) * 1000, 2),
+        }
+
+
+@timed_fn("recipes.plan")
+def plan_meals(ranked_recipes: List[Dict], inventory: Iterable[Dict], meals: int = 5,
+               days: int | None = None, portions: Dict[str, float] | None = None,
+               candidate_limit: int = 16, time_budget_ms: float = 80.0) -> Dict:
+    """
+    Meal plan over ranked recipes (split_and_rank_recipes output) and the
+    fridge's item rows (get_all_items). See MealPlanner.
+    """
+    return MealPlanner(inventory, portions).plan(ranked_recipes, meals, days,
+                                                 candidate_limit, time_budget_ms)
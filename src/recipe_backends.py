@@ -0,0 +1,191 @@
+# recipe_backends.py
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import List, Dict
+
+import config
+from fridge_logging import get_logger, fields
+from instrumentation import inc, timed
+from recipe_corpus import RECIPE_CORPUS
+from recipe_index import RecipeIndex
+from recipe_store import RecipeCorpus, get_corpus
+
+_LOG = get_logger("recipes")
+
+
+class RecipeBackend:
+    """
+    Interface for anything that can turn fridge items into raw recipes.
+
+    generate() receives [{"name": str, "expires_in_days": int}, ...] and
+    returns [{"title": str, "ingredients": [str, ...], "steps": [str, ...]}, ...]
+    (the same shape generate_recipes_with_gemini returns). Ranking is done
+    afterwards by recipe_rank, so backends don't need to sort.
+    """
+
+    name = "base"
+
+    def generate(self, fridge_items: List[Dict], max_recipes: int) -> List[Dict]:
+        raise NotImplementedError
+
+
+class GeminiRecipeBackend(RecipeBackend):
+    """Recipes generated by Gemini (network + GEMINI_API_KEY required)."""
+
+    name = "gemini"
+
+    def __init__(self, harvest: bool = True):
+        # Save every answer into the recipe corpus (recipe_store.py)
+        self.harvest = harvest
+
+    def generate(self, fridge_items: List[Dict], max_recipes: int) -> List[Dict]:
+        # Import here so the local backend never needs the Gemini client
+        from recipe_llm_gemini import generate_recipes_with_gemini
+        recipes = generate_recipes_with_gemini(fridge_items, max_recipes)
+        if recipes and self.harvest:
+            try:
+                added = get_corpus().add(recipes, source="gemini")
+                inc("recipes.harvested", added)
+            except Exception as e:
+                # The answer is still good; only the corpus misses out
+                _LOG.warning("Could not save Gemini recipes to the corpus: %s", e,
+                             extra=fields(op="harvest"))
+        return recipes
+
+
+class LocalRecipeBackend(RecipeBackend):
+    """
+    Offline backend: searches a bundled recipe corpus by ingredient overlap
+    with the fridge inventory. Deterministic for a given inventory.
+    """
+
+    name = "local"
+
+    def __init__(self, corpus: List[Dict] | None = None):
+        self.corpus = corpus if corpus is not None else RECIPE_CORPUS
+        # Index is built once; each request only applies the inventory diff
+        self._index = RecipeIndex(self.corpus)
+        self._lock = threading.Lock()
+
+    def generate(self, fridge_items: List[Dict], max_recipes: int) -> List[Dict]:
+        with self._lock:
+            self._index.set_fridge(fridge_items)
+            # Most overlapping first, then most urgent, then corpus order
+            ids = self._index.top_k(max_recipes, by="overlap")
+        return [self.corpus[rid] for rid in ids]
+
+
+class CorpusRecipeBackend(RecipeBackend):
+    """
+    Offline backend over the recipe corpus: the bundled recipes plus every
+    recipe saved from earlier Gemini answers. Same ranking as the local
+    backend.
+    """
+
+    name = "corpus"
+
+    def __init__(self, corpus: RecipeCorpus | None = None):
+        self.corpus = corpus or get_corpus()
+
+    def generate(self, fridge_items: List[Dict], max_recipes: int) -> List[Dict]:
+        return self.corpus.search(fridge_items, max_recipes)[0]
+
+
+class CorpusFirstRecipeBackend(RecipeBackend):
+    """
+    Serve recipes from the corpus when it covers the inventory well enough
+    (RecipeCorpus.search coverage >= min_coverage) and only ask `llm`
+    otherwise. With the default harvesting Gemini backend the corpus
+    grows with every LLM call, so calls get rarer over time.
+    """
+
+    def __init__(self, llm: RecipeBackend, corpus: RecipeCorpus | None = None,
+                 min_coverage: float | None = None):
+        self.llm = llm
+        self.corpus = corpus or get_corpus()
+        self.min_coverage = config.RECIPE_CORPUS_MIN_COVERAGE if min_coverage is None else min_coverage
+        self.name = f"corpus>{llm.name}"
+
+    def generate(self, fridge_items: List[Dict], max_recipes: int) -> List[Dict]:
+        try:
+            recipes, coverage = self.corpus.search(fridge_items, max_recipes)
+        except Exception as e:
+            _LOG.warning("Recipe corpus unavailable (%s), asking %s", e, self.llm.name,
+                         extra=fields(op="corpus_search", backend=self.llm.name))
+            inc("recipes.corpus", result="error")
+            return self.llm.generate(fridge_items, max_recipes)
+
+        if coverage >= self.min_coverage:
+            inc("recipes.corpus", result="hit")
+            return recipes
+
+        inc("recipes.corpus", result="miss")
+        with timed("recipes.generate", backend=self.llm.name):
+            return self.llm.generate(fridge_items, max_recipes) or recipes
+
+
+# Shared worker so a hanging LLM call never blocks the caller past the timeout
+_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="recipe-backend")
+
+
+class FallbackRecipeBackend(RecipeBackend):
+    """
+    Try `primary` with a timeout; on timeout, error or an empty answer use
+    `fallback` instead.
+    """
+
+    def __init__(self, primary: RecipeBackend, fallback: RecipeBackend,
+                 timeout: float | None = None):
+        self.primary = primary
+        self.fallback = fallback
+        self.timeout = config.LLM_TIMEOUT_SECONDS if timeout is None else timeout
+        self.name = f"{primary.name}+{fallback.name}"
+
+    def generate(self, fridge_items: List[Dict], max_recipes: int) -> List[Dict]:
+        future = _EXECUTOR.submit(self.primary.generate, fridge_items, max_recipes)
+        try:
+            recipes = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            _LOG.warning("%s timed out after %ss, using %s recipes",
+                         self.primary.name, self.timeout, self.fallback.name,
+                         extra=fields(op="generate", backend=self.primary.name, reason="timeout"))
+            inc("recipes.fallback", reason="timeout")
+            recipes = []
+        except Exception as e:
+            _LOG.warning("%s failed (%s), using %s recipes", self.primary.name, e, self.fallback.name,
+                         extra=fields(op="generate", backend=self.primary.name, reason="error"))
+            inc("recipes.fallback", reason="error")
+            recipes = []
+
+        if recipes:
+            return recipes
+        with timed("recipes.generate", backend=self.fallback.name):
+            return self.fallback.generate(fridge_items, max_recipes)
+
+
+_BACKENDS: Dict[str, RecipeBackend] = {}
+
+
+def get_backend(name: str | None = None) -> RecipeBackend:
+    """
+    Return the (cached) backend for `name` (defaults to config.RECIPE_BACKEND).
+
+      - "local"  -> LocalRecipeBackend (bundled recipes only)
+      - "corpus" -> CorpusRecipeBackend (bundled + saved Gemini recipes)
+      - "gemini" -> the corpus first; Gemini only when the corpus covers
+                    the inventory poorly, falling back to the corpus
+    """
+    name = (name or config.RECIPE_BACKEND).strip().lower()
+
+    if name not in _BACKENDS:
+        if name == "local":
+            _BACKENDS[name] = LocalRecipeBackend()
+        elif name == "corpus":
+            _BACKENDS[name] = CorpusRecipeBackend()
+        elif name == "gemini":
+            _BACKENDS[name] = CorpusFirstRecipeBackend(
+                FallbackRecipeBackend(GeminiRecipeBackend(), get_backend("corpus")))
+        else:
+            raise ValueError(f"Unknown recipe backend {name!r}. Use 'gemini', 'corpus' or 'local'.")
+
+    return _BACKENDS[name]
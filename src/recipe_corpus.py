@@ -0,0 +1,282 @@
+# recipe_corpus.py
+# Small bundled recipe corpus for the offline recipe backend.
+# Ingredient names use the same spelling as SHELF_LIFE_DAYS / FOOD_CATEGORIES
+# so they line up with the names stored in food_types.
+
+RECIPE_CORPUS = [
+    {
+        "title": "Chicken and Tomato Skillet",
+        "ingredients": ["chicken", "tomato", "onion", "olive oil", "garlic"],
+        "steps": [
+            "Slice the chicken and season with salt and pepper.",
+            "Brown the chicken in olive oil, then remove from the pan.",
+            "Soften onion and garlic, add chopped tomato and simmer 10 minutes.",
+            "Return the chicken and cook until done.",
+        ],
+    },
+    {
+        "title": "Cheese Omelette",
+        "ingredients": ["eggs", "cheese", "butter", "milk"],
+        "steps": [
+            "Whisk eggs with a splash of milk.",
+            "Melt butter in a pan and pour in the eggs.",
+            "Add grated cheese, fold and serve.",
+        ],
+    },
+    {
+        "title": "Fluffy Pancakes",
+        "ingredients": ["milk", "eggs", "butter", "flour", "sugar"],
+        "steps": [
+            "Mix flour and sugar, then whisk in milk and eggs.",
+            "Cook ladlefuls of batter in buttered pan until bubbles form.",
+            "Flip and cook until golden.",
+        ],
+    },
+    {
+        "title": "Banana Strawberry Smoothie",
+        "ingredients": ["banana", "strawberry", "yogurt", "milk"],
+        "steps": [
+            "Add everything to a blender.",
+            "Blend until smooth and serve cold.",
+        ],
+    },
+    {
+        "title": "Beef and Potato Hash",
+        "ingredients": ["beef", "potato", "onion", "eggs"],
+        "steps": [
+            "Dice potatoes and fry until crisp.",
+            "Add chopped beef and onion and cook through.",
+            "Top with fried eggs.",
+        ],
+    },
+    {
+        "title": "Pan-Fried Fish with Lemon",
+        "ingredients": ["fish", "butter", "lemon", "potato"],
+        "steps": [
+            "Boil potatoes until tender.",
+            "Fry fish fillets in butter for 3-4 minutes per side.",
+            "Squeeze lemon over the fish and serve with potatoes.",
+        ],
+    },
+    {
+        "title": "Garden Salad",
+        "ingredients": ["lettuce", "tomato", "cucumber", "carrot", "olive oil"],
+        "steps": [
+            "Wash and chop all vegetables.",
+            "Toss with olive oil, salt and pepper.",
+        ],
+    },
+    {
+        "title": "Ham and Cheese Toastie",
+        "ingredients": ["ham", "cheese", "bread", "butter"],
+        "steps": [
+            "Butter the bread on the outside.",
+            "Fill with ham and cheese.",
+            "Toast in a pan until golden on both sides.",
+        ],
+    },
+    {
+        "title": "Sausage and Onion Bake",
+        "ingredients": ["sausage", "onion", "potato", "carrot"],
+        "steps": [
+            "Chop vegetables into chunks and spread on a tray.",
+            "Add sausages and roast at 200°C for 35 minutes.",
+        ],
+    },
+    {
+        "title": "Fruit Salad",
+        "ingredients": ["apple", "banana", "orange", "grapes", "strawberry"],
+        "steps": [
+            "Chop all fruit into bite-sized pieces.",
+            "Mix in a bowl and chill before serving.",
+        ],
+    },
+    {
+        "title": "Yogurt Parfait",
+        "ingredients": ["yogurt", "strawberry", "banana", "honey"],
+        "steps": [
+            "Layer yogurt and sliced fruit in a glass.",
+            "Drizzle with honey.",
+        ],
+    },
+    {
+        "title": "Leftover Fried Rice Upgrade",
+        "ingredients": ["cooked rice", "eggs", "carrot", "onion", "soy sauce"],
+        "steps": [
+            "Fry onion and diced carrot until soft.",
+            "Add cooked rice and stir-fry until hot.",
+            "Push aside, scramble eggs, then mix everything with soy sauce.",
+        ],
+    },
+    {
+        "title": "Chicken Caesar Wrap",
+        "ingredients": ["chicken", "lettuce", "cheese", "mayonnaise", "tortilla"],
+        "steps": [
+            "Cook and slice the chicken.",
+            "Spread mayonnaise on a tortilla and add lettuce, chicken and cheese.",
+            "Roll up tightly and cut in half.",
+        ],
+    },
+    {
+        "title": "Loaded Burger Bowl",
+        "ingredients": ["hamburger", "lettuce", "tomato", "cheese", "ketchup"],
+        "steps": [
+            "Reheat the hamburger patty and slice it.",
+            "Arrange over lettuce with tomato and cheese.",
+            "Finish with ketchup.",
+        ],
+    },
+    {
+        "title": "Pizza Frittata",
+        "ingredients": ["pizza", "eggs", "cheese"],
+        "steps": [
+            "Cut leftover pizza into squares and place in an oven dish.",
+            "Pour over beaten eggs and top with cheese.",
+            "Bake at 180°C for 20 minutes.",
+        ],
+    },
+    {
+        "title": "Steak and Potato Salad",
+        "ingredients": ["steak", "potato", "lettuce", "onion", "mayonnaise"],
+        "steps": [
+            "Boil and cool the potatoes, then mix with mayonnaise.",
+            "Slice leftover steak thinly.",
+            "Serve steak and potato salad over lettuce with sliced onion.",
+        ],
+    },
+    {
+        "title": "Spaghetti Bolognese Bake",
+        "ingredients": ["spaghetti bolognese", "cheese", "tomato"],
+        "steps": [
+            "Put leftover spaghetti bolognese into an oven dish.",
+            "Top with sliced tomato and grated cheese.",
+            "Bake at 190°C until bubbling.",
+        ],
+    },
+    {
+        "title": "Chicken Wing Salad",
+        "ingredients": ["chicken wings", "lettuce", "cucumber", "carrot"],
+        "steps": [
+            "Reheat the wings and pull the meat off the bone.",
+            "Toss with lettuce, cucumber and grated carrot.",
+        ],
+    },
+    {
+        "title": "Loaded French Fries",
+        "ingredients": ["french fries", "cheese", "onion", "sausage"],
+        "steps": [
+            "Crisp the fries in a hot oven.",
+            "Fry sliced sausage and onion.",
+            "Pile onto the fries and melt cheese on top.",
+        ],
+    },
+    {
+        "title": "Egg Fried Rice",
+        "ingredients": ["fried rice", "eggs", "onion"],
+        "steps": [
+            "Reheat the fried rice in a wok.",
+            "Scramble eggs in the wok and fold through with sliced onion.",
+        ],
+    },
+    {
+        "title": "Caesar Salad Sandwich",
+        "ingredients": ["caesar salad", "bread", "chicken"],
+        "steps": [
+            "Toast the bread.",
+            "Fill with leftover caesar salad and sliced chicken.",
+        ],
+    },
+    {
+        "title": "Sushi Rice Bowl",
+        "ingredients": ["sushi", "cucumber", "soy sauce"],
+        "steps": [
+            "Break up leftover sushi into a bowl.",
+            "Top with sliced cucumber and soy sauce.",
+        ],
+    },
+    {
+        "title": "Milkshake",
+        "ingredients": ["ice cream", "milk", "banana"],
+        "steps": [
+            "Blend ice cream, milk and banana until smooth.",
+        ],
+    },
+    {
+        "title": "Tomato Soup",
+        "ingredients": ["tomato", "onion", "carrot", "butter", "milk"],
+        "steps": [
+            "Soften onion and carrot in butter.",
+            "Add chopped tomatoes and simmer 20 minutes.",
+            "Blend with a splash of milk.",
+        ],
+    },
+    {
+        "title": "Potato and Onion Soup",
+        "ingredients": ["potato", "onion", "butter", "milk"],
+        "steps": [
+            "Cook onion in butter until soft.",
+            "Add diced potato and water, simmer until tender.",
+            "Blend with milk and season.",
+        ],
+    },
+    {
+        "title": "Carrot and Cucumber Slaw",
+        "ingredients": ["carrot", "cucumber", "mayonnaise", "apple"],
+        "steps": [
+            "Grate carrot, cucumber and apple.",
+            "Mix with mayonnaise and season.",
+        ],
+    },
+    {
+        "title": "Beef Burgers",
+        "ingredients": ["beef", "onion", "eggs", "bread", "lettuce", "tomato", "ketchup"],
+        "steps": [
+            "Mix minced beef with chopped onion and egg, shape into patties.",
+            "Grill 4 minutes per side.",
+            "Serve in bread with lettuce, tomato and ketchup.",
+        ],
+    },
+    {
+        "title": "Watermelon Cucumber Salad",
+        "ingredients": ["watermelon", "cucumber", "cheese"],
+        "steps": [
+            "Cube watermelon and cucumber.",
+            "Crumble cheese over the top.",
+        ],
+    },
+    {
+        "title": "Fish Tacos",
+        "ingredients": ["fish", "lettuce", "tomato", "mayonnaise", "tortilla"],
+        "steps": [
+            "Fry seasoned fish and flake into pieces.",
+            "Fill tortillas with lettuce, tomato and fish.",
+            "Top with mayonnaise.",
+        ],
+    },
+    {
+        "title": "Orange Juice Glazed Chicken",
+        "ingredients": ["chicken", "juice", "orange", "soy sauce"],
+        "steps": [
+            "Brown the chicken pieces.",
+            "Add orange juice, orange zest and soy sauce.",
+            "Simmer until the sauce is sticky and the chicken is cooked.",
+        ],
+    },
+    {
+        "title": "Grape and Cheese Plate",
+        "ingredients": ["grapes", "cheese", "apple"],
+        "steps": [
+            "Slice cheese and apple.",
+            "Arrange on a plate with grapes.",
+        ],
+    },
+    {
+        "title": "Creamy Scrambled Eggs",
+        "ingredients": ["eggs", "butter", "milk", "bread"],
+        "steps": [
+            "Whisk eggs with milk.",
+            "Cook slowly in butter, stirring constantly.",
+            "Serve on toasted bread.",
+        ],
+    },
+]
@@ -0,0 +1,199 @@
+# recipe_index.py
+import heapq
+from collections import Counter
+from typing import List, Dict, Iterable
+
+from ingredient_normalizer import normalize_ingredient
+from recipe_rank import EXPIRY_WINDOW_DAYS
+
+
+def _contribution(expires_in_days: int) -> int:
+    """Same per-ingredient urgency as split_and_rank_recipes."""
+    return max(0, EXPIRY_WINDOW_DAYS - expires_in_days)
+
+
+class RecipeIndex:
+    """
+    Inverted ingredient index over a (large) list of recipes.
+
+    Built once per recipe list:
+      - ingredient key -> bit position
+      - ingredient key -> [(recipe_id, occurrences), ...]   (posting list)
+      - recipe_id      -> ingredient bitset (int)
+
+    The fridge state lives inside the index. add_item()/remove_item() only
+    touch the recipes in that ingredient's posting list, so a single fridge
+    change costs O(recipes using that ingredient) instead of a full re-rank.
+
+    Scores are identical to split_and_rank_recipes():
+      expiry_score = sum over matched ingredient occurrences of
+                     max(0, EXPIRY_WINDOW_DAYS - expires_in_days)
+    """
+
+    def __init__(self, recipes: Iterable[Dict]):
+        self.recipes: List[Dict] = list(recipes)
+
+        self._bit: Dict[str, int] = {}
+        self._keys: List[str] = []                # bit -> ingredient key
+        self._postings: Dict[str, List[tuple]] = {}
+        self._recipe_bits: List[int] = []
+
+        for rid, r in enumerate(self.recipes):
+            self._encode(rid, r)
+
+        # ---- fridge state (mutated incrementally) ----
+        self._fridge_days: Dict[str, int] = {}
+        self._fridge_bits = 0
+        self._scores = [0] * len(self.recipes)
+        self._overlap = [0] * len(self.recipes)   # matched ingredient occurrences
+
+    def __len__(self):
+        return len(self.recipes)
+
+    def _encode(self, rid: int, r: Dict):
+        keys = [normalize_ingredient(ing) for ing in (r.get("ingredients", []) or [])]
+        bits = 0
+        for key, count in Counter(keys).items():
+            bit = self._bit.get(key)
+            if bit is None:
+                bit = self._bit[key] = len(self._keys)
+                self._keys.append(key)
+            bits |= 1 << bit
+            self._postings.setdefault(key, []).append((rid, count))
+        self._recipe_bits.append(bits)
+
+    def add_recipe(self, recipe: Dict) -> int:
+        """Append a recipe, scored against the current fridge. Returns its id."""
+        rid = len(self.recipes)
+        self.recipes.append(recipe)
+        self._encode(rid, recipe)
+        score = overlap = 0
+        for key, count in Counter(normalize_ingredient(i) for i in recipe.get("ingredients", []) or []).items():
+            days = self._fridge_days.get(key)
+            if days is not None:
+                score += count * _contribution(days)
+                overlap += count
+        self._scores.append(score)
+        self._overlap.append(overlap)
+        return rid
+
+    # ---------- Fridge updates ----------
+
+    def add_item(self, name: str, expires_in_days: int):
+        """Add a fridge item (or update its expires_in_days) and re-score affected recipes."""
+        key = normalize_ingredient(name)
+        old_days = self._fridge_days.get(key)
+        if old_days == expires_in_days:
+            return
+
+        postings = self._postings.get(key, ())
+        new_c = _contribution(expires_in_days)
+
+        if old_days is None:
+            for rid, count in postings:
+                self._scores[rid] += count * new_c
+                self._overlap[rid] += count
+        else:
+            delta = new_c - _contribution(old_days)
+            if delta:
+                for rid, count in postings:
+                    self._scores[rid] += count * delta
+
+        self._fridge_days[key] = expires_in_days
+        bit = self._bit.get(key)
+        if bit is not None:
+            self._fridge_bits |= 1 << bit
+
+    def remove_item(self, name: str):
+        """Remove a fridge item (fully consumed) and re-score affected recipes."""
+        key = normalize_ingredient(name)
+        old_days = self._fridge_days.pop(key, None)
+        if old_days is None:
+            return
+
+        old_c = _contribution(old_days)
+        for rid, count in self._postings.get(key, ()):
+            self._scores[rid] -= count * old_c
+            self._overlap[rid] -= count
+
+        bit = self._bit.get(key)
+        if bit is not None:
+            self._fridge_bits &= ~(1 << bit)
+
+    def set_fridge(self, fridge_items: List[Dict]):
+        """
+        Sync the index with a full fridge snapshot
+        ([{"name": str, "expires_in_days": int}, ...]).
+
+        Only the difference to the current state is applied.
+        """
+        target: Dict[str, int] = {}
+        for i in fridge_items:
+            target[normalize_ingredient(i["name"])] = i["expires_in_days"]   # last one wins, like split_and_rank_recipes
+
+        for key in [k for k in self._fridge_days if k not in target]:
+            self.remove_item(key)
+        for key, days in target.items():
+            self.add_item(key, days)
+
+    # ---------- Queries ----------
+
+    def candidates(self) -> set:
+        """Recipe ids that use at least one fridge ingredient."""
+        out = set()
+        for key in self._fridge_days:
+            for rid, _ in self._postings.get(key, ()):
+                out.add(rid)
+        return out
+
+    def top_k(self, k: int, by: str = "expiry_score") -> List[int]:
+        """
+        Return the ids of the k best recipes using a heap (no full sort).
+
+        by="expiry_score": same order as split_and_rank_recipes (ties keep
+                           recipe order); considers every recipe.
+        by="overlap":      most matched ingredients first, then expiry_score;
+                           only recipes with at least one match.
+        """
+        scores = self._scores
+        overlap = self._overlap
+
+        if by == "expiry_score":
+            return heapq.nlargest(k, range(len(self.recipes)),
+                                  key=lambda rid: (scores[rid], -rid))
+        if by == "overlap":
+            return heapq.nlargest(k, self.candidates(),
+                                  key=lambda rid: (overlap[rid], scores[rid], -rid))
+        raise ValueError(f"Unknown ranking {by!r}. Use 'expiry_score' or 'overlap'.")
+
+    def matched_keys(self, rid: int) -> List[str]:
+        """Ingredient keys of one recipe that are in the fridge."""
+        have = self._recipe_bits[rid] & self._fridge_bits
+        return [self._keys[bit] for bit in range(have.bit_length()) if have >> bit & 1]
+
+    def enrich(self, rid: int) -> Dict:
+        """Build the split_and_rank_recipes() dict for one recipe from its bitset."""
+        r = self.recipes[rid]
+        all_ings = r.get("ingredients", []) or []
+        have = self._recipe_bits[rid] & self._fridge_bits
+
+        available = []
+        missing = []
+        for ing in all_ings:
+            if have >> self._bit[normalize_ingredient(ing)] & 1:
+                available.append(ing)
+            else:
+                missing.append(ing)
+
+        return {
+            "title": r.get("title", ""),
+            "ingredients": all_ings,
+            "steps": r.get("steps", []),
+            "ingredients_available": available,
+            "ingredients_missing": missing,
+            "expiry_score": self._scores[rid],
+        }
+
+    def rank(self, k: int, by: str = "expiry_score") -> List[Dict]:
+        """Top-k recipes, enriched like split_and_rank_recipes()."""
+        return [self.enrich(rid) for rid in self.top_k(k, by=by)]
@@ -1,32 +1,55 @@
 # recipe_llm_gemini.py
 import os
 import json
-from typing import List, Dict
+from typing import List, Dict, Tuple
 
-import google.generativeai as genai
-from config import GEMINI_API_KEY
+from config import GEMINI_API_KEY, LLM_PROMPT_TOKEN_BUDGET
+from fridge_logging import get_logger, log_op
+from instrumentation import timed, timed_fn
 
-# Configure global API key
-genai.configure(api_key=GEMINI_API_KEY)
+_LOG = get_logger("recipes")
 
-# Force JSON output so it's easy to parse
-generation_config = genai.GenerationConfig(
-    temperature=0.7,
-    response_mime_type="application/json",  # return JSON as text
-)
+GEMINI_MODEL_NAME = "models/gemini-2.5-flash"
 
-# This is exactly the model you asked for:
-model = genai.GenerativeModel(
-    "models/gemini-2.5-flash",
-    generation_config=generation_config,
-)
+# The client is configured on first use (see _get_model), not at import, so
+# importing this module never touches the network or requires an API key.
+_MODEL = None
+
+
+def _get_model():
+    """
+    Configure the Gemini client once and cache the GenerativeModel in globals.
+    """
+    global _MODEL
+
+    if _MODEL is None:
+        if not GEMINI_API_KEY:
+            raise RuntimeError("GEMINI_API_KEY not set in environment")
+
+        import google.generativeai as genai
+
+        # Configure global API key
+        genai.configure(api_key=GEMINI_API_KEY)
+
+        # Force JSON output so it's easy to parse
+        generation_config = genai.GenerationConfig(
+            temperature=0.7,
+            response_mime_type="application/json",  # return JSON as text
+        )
+
+        _MODEL = genai.GenerativeModel(
+            GEMINI_MODEL_NAME,
+            generation_config=generation_config,
+        )
+
+    return _MODEL
 
 SYSTEM_PROMPT = """
 You are a recipe generator for a smart fridge.
 
 The input you receive will contain:
-- FRIDGE_ITEMS: a JSON array of objects, each:
-    { "name": string, "expires_in_days": integer }
+- FRIDGE_ITEMS: a table with one ingredient per line, "name,expires_in_days",
+  most urgent first.
 - MAX_RECIPES: an integer.
 
 Your tasks:
@@ -58,18 +81,60 @@ Important:
 """
 
 
-def _build_prompt(fridge_items: List[Dict], max_recipes: int) -> str:
+# Rough chars-per-token ratio for English/CSV text; only used for budgeting
+_CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (no tokenizer round trip)."""
+    return -(-len(text) // _CHARS_PER_TOKEN)
+
+
+@timed_fn("llm.build_prompt")
+def _build_prompt(fridge_items: List[Dict], max_recipes: int,
+                  token_budget: int | None = None) -> Tuple[str, Dict]:
     """
     Build a single text prompt that includes the system instructions + data.
+
+    Fridge items are sent as a compact "name,expires_in_days" table, most
+    urgent first. Items are added until the prompt reaches token_budget
+    (default config.LLM_PROMPT_TOKEN_BUDGET); the least urgent ones (e.g.
+    365-day freezer items) are dropped first.
+
+    Returns (prompt, stats) with items_total / items_sent / items_dropped,
+    prompt_chars, prompt_tokens_est and token_budget.
     """
-    return (
-        SYSTEM_PROMPT
-        + "\n\nFRIDGE_ITEMS:\n"
-        + json.dumps(fridge_items, indent=2)
-        + f"\n\nMAX_RECIPES: {max_recipes}\n"
-        + "\nReturn ONLY the JSON object described above."
+    if token_budget is None:
+        token_budget = LLM_PROMPT_TOKEN_BUDGET
+
+    head = SYSTEM_PROMPT.strip() + "\n\nFRIDGE_ITEMS:\n"
+    tail = (
+        f"\nMAX_RECIPES: {max_recipes}\n"
+        + "Return ONLY the JSON object described above."
     )
 
+    used = estimate_tokens(head) + estimate_tokens(tail)
+    lines = []
+    for item in sorted(fridge_items, key=lambda i: i["expires_in_days"]):
+        line = f"{item['name'].replace(',', ' ')},{item['expires_in_days']}\n"
+        cost = estimate_tokens(line)
+        if lines and used + cost > token_budget:
+            break
+        lines.append(line)
+        used += cost
+
+    prompt = head + "".join(lines) + tail
+
+    stats = {
+        "items_total": len(fridge_items),
+        "items_sent": len(lines),
+        "items_dropped": len(fridge_items) - len(lines),
+        "prompt_chars": len(prompt),
+        "prompt_tokens_est": estimate_tokens(prompt),
+        "token_budget": token_budget,
+    }
+    return prompt, stats
+
 
 def generate_recipes_with_gemini(
     fridge_items: List[Dict],
@@ -88,11 +153,22 @@ def generate_recipes_with_gemini(
           },
           ...
         ]
+
+    Every request is logged (op="gemini_request") with the prompt stats
+    from _build_prompt, duration_ms and, when the API reports it,
+    prompt_tokens; failed requests too, including ones that outlive the
+    caller's timeout.
     """
-    prompt = _build_prompt(fridge_items, max_recipes)
+    prompt, stats = _build_prompt(fridge_items, max_recipes)
+    model = _get_model()
 
     # Single-turn text generation
-    response = model.generate_content(prompt)
+    with log_op(_LOG, "gemini_request", **stats) as op, timed("llm.generate_content"):
+        response = model.generate_content(prompt)
+        usage = getattr(response, "usage_metadata", None)
+        op.done(f"Gemini request: {stats['items_sent']}/{stats['items_total']} items, "
+                f"~{stats['prompt_tokens_est']} prompt tokens",
+                prompt_tokens=getattr(usage, "prompt_token_count", None))
 
     # response.text should already be valid JSON (because of response_mime_type)
     try:
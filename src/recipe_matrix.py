@@ -0,0 +1,113 @@
+# recipe_matrix.py
+from collections import Counter
+from typing import List, Dict, Iterable
+
+import numpy as np
+
+from ingredient_normalizer import normalize_ingredient
+from recipe_rank import EXPIRY_WINDOW_DAYS
+
+
+class RecipeMatrix:
+    """
+    NumPy scoring over a large recipe corpus.
+
+    Recipes are encoded once as a sparse recipe x ingredient matrix in CSR
+    form (indptr / indices / data, data = occurrences of the ingredient in the
+    recipe). The fridge becomes a dense ingredient x 2 matrix:
+
+        column 0: 1 if the ingredient is in the fridge
+        column 1: max(0, EXPIRY_WINDOW_DAYS - expires_in_days)
+
+    One sparse product M @ F then yields the available-ingredient count and
+    the expiry_score of every recipe; missing = total - available. Scores are
+    exactly those of split_and_rank_recipes() (integer arithmetic), and
+    rank() keeps its tie order.
+    """
+
+    def __init__(self, recipes: Iterable[Dict]):
+        self.recipes: List[Dict] = list(recipes)
+        self._col: Dict[str, int] = {}
+
+        indptr = [0]
+        indices = []
+        data = []
+        for r in self.recipes:
+            keys = [normalize_ingredient(ing) for ing in (r.get("ingredients", []) or [])]
+            for key, count in Counter(keys).items():
+                indices.append(self._col.setdefault(key, len(self._col)))
+                data.append(count)
+            indptr.append(len(indices))
+
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.data = np.asarray(data, dtype=np.int64)
+
+        # Row id of every non-zero, so the product is a single bincount per column
+        self._rows = np.repeat(np.arange(len(self.recipes), dtype=np.int64),
+                               np.diff(self.indptr))
+        self.totals = np.bincount(self._rows, weights=self.data,
+                                  minlength=len(self.recipes)).astype(np.int64)
+
+    def __len__(self):
+        return len(self.recipes)
+
+    def fridge_matrix(self, fridge_items: List[Dict]) -> np.ndarray:
+        """Encode the fridge as the ingredient x 2 (present, urgency) matrix."""
+        vec = np.zeros((len(self._col), 2), dtype=np.int64)
+        for i in fridge_items:
+            col = self._col.get(normalize_ingredient(i["name"]))
+            if col is None:
+                continue
+            vec[col, 0] = 1
+            vec[col, 1] = max(0, EXPIRY_WINDOW_DAYS - i["expires_in_days"])
+        return vec
+
+    def score(self, fridge_items: List[Dict]):
+        """
+        Return (available_counts, missing_counts, expiry_scores), one int64
+        array entry per recipe.
+        """
+        n = len(self.recipes)
+        vec = self.fridge_matrix(fridge_items)
+
+        # Sparse (recipes x ingredients) @ dense (ingredients x 2)
+        nz = self.data[:, None] * vec[self.indices]
+        available = np.bincount(self._rows, weights=nz[:, 0], minlength=n)
+        scores = np.bincount(self._rows, weights=nz[:, 1], minlength=n)
+
+        # bincount works in float64; values are small integers so this is exact
+        available = np.rint(available).astype(np.int64)
+        scores = np.rint(scores).astype(np.int64)
+        return available, self.totals - available, scores
+
+    def rank(self, fridge_items: List[Dict], top_k: int | None = None) -> List[Dict]:
+        """Same output (and order) as split_and_rank_recipes(recipes, fridge_items, top_k)."""
+        _, _, scores = self.score(fridge_items)
+        order = np.argsort(-scores, kind="stable")
+        if top_k is not None:
+            order = order[:top_k]
+
+        fridge_names = {normalize_ingredient(i["name"]) for i in fridge_items}
+        out = []
+        for rid in order.tolist():
+            r = self.recipes[rid]
+            all_ings = r.get("ingredients", []) or []
+            available = []
+            missing = []
+            for ing in all_ings:
+                if normalize_ingredient(ing) in fridge_names:
+                    available.append(ing)
+                else:
+                    missing.append(ing)
+            out.append(
+                {
+                    "title": r.get("title", ""),
+                    "ingredients": all_ings,
+                    "steps": r.get("steps", []),
+                    "ingredients_available": available,
+                    "ingredients_missing": missing,
+                    "expiry_score": int(scores[rid]),
+                }
+            )
+        return out
@@ -1,12 +1,19 @@
 # recipe_rank.py
+import heapq
 from typing import List, Dict
 
+from ingredient_normalizer import normalize_ingredient
+from instrumentation import timed_fn
+
 EXPIRY_WINDOW_DAYS = 7  # tweak if you want
 
 
+@timed_fn("recipes.rank")
 def split_and_rank_recipes(
     recipes: List[Dict],
     fridge_items: List[Dict],
+    top_k: int | None = None,
+    mode: str = "python",
 ) -> List[Dict]:
     """
     Enrich recipes with:
@@ -14,8 +21,25 @@ def split_and_rank_recipes(
       - ingredients_missing
       - expiry_score
     and sort by expiry_score desc.
+
+    Ingredient and fridge names are compared after normalize_ingredient(),
+    so "2 Eggs" matches "eggs" and "chicken breast" matches "chicken".
+
+    If top_k is given, only the best top_k recipes are returned, selected
+    with a heap instead of a full sort. For ranking thousands of corpus
+    recipes repeatedly, use recipe_index.RecipeIndex instead.
+
+    mode="numpy" scores with one sparse matrix product (recipe_matrix); the
+    result is identical. Keep a RecipeMatrix around to re-rank the same
+    corpus on every inventory change without re-encoding it.
     """
-    name_to_days = {i["name"].lower(): i["expires_in_days"] for i in fridge_items}
+    if mode == "numpy":
+        from recipe_matrix import RecipeMatrix
+        return RecipeMatrix(recipes).rank(fridge_items, top_k=top_k)
+    if mode != "python":
+        raise ValueError(f"Unknown scoring mode {mode!r}. Use 'python' or 'numpy'.")
+
+    name_to_days = {normalize_ingredient(i["name"]): i["expires_in_days"] for i in fridge_items}
     fridge_names = set(name_to_days.keys())
 
     enriched = []
@@ -27,7 +51,7 @@ def split_and_rank_recipes(
         missing = []
 
         for ing in all_ings:
-            key = ing.lower()
+            key = normalize_ingredient(ing)
             if key in fridge_names:
                 available.append(ing)
             else:
@@ -35,7 +59,7 @@ def split_and_rank_recipes(
 
         score = 0
         for ing in available:
-            d = name_to_days.get(ing.lower())
+            d = name_to_days.get(normalize_ingredient(ing))
             if d is None:
                 continue
             contribution = max(0, EXPIRY_WINDOW_DAYS - d)
@@ -52,5 +76,8 @@ def split_and_rank_recipes(
             }
         )
 
+    if top_k is not None:
+        return heapq.nlargest(top_k, enriched, key=lambda r: r["expiry_score"])
+
     enriched.sort(key=lambda r: r["expiry_score"], reverse=True)
     return enriched
@@ -1,28 +1,57 @@
 # recipes_service.py
 from typing import List, Dict
 
-from smart_fridge_db import get_fridge_items_for_llm
-from recipe_llm_gemini import generate_recipes_with_gemini
+from smart_fridge_db import get_all_items, get_fridge_items_for_llm, resolve_fridge_id
+from recipe_backends import RecipeBackend, get_backend
 from recipe_rank import split_and_rank_recipes  # your local logic
+from meal_planner import plan_meals
 
 
 def get_recipe_suggestions_for_user(
     user_id: int = None,
     max_recipes: int = 10,
+    backend: RecipeBackend | str | None = None,
+    fridge_id: int | None = None,
 ) -> List[Dict]:
     """
-    1) Read fridge items from DB.
-    2) Ask Gemini (2.5 Flash) to generate recipes (title, ingredients, steps).
+    1) Read fridge items from DB (fridge_id, else the user's first fridge).
+    2) Ask the recipe backend to generate recipes (title, ingredients, steps).
+       Default is config.RECIPE_BACKEND; Gemini falls back to the local
+       corpus on timeout or error.
     3) Split into available/missing + compute expiry_score.
     4) Return recipes sorted by expiry_score.
     """
-    fridge_items = get_fridge_items_for_llm(user_id)
+    fridge_items = get_fridge_items_for_llm(user_id, fridge_id)
     if not fridge_items:
         return []
 
-    raw_recipes = generate_recipes_with_gemini(fridge_items, max_recipes)
+    if not isinstance(backend, RecipeBackend):
+        backend = get_backend(backend)
+
+    raw_recipes = backend.generate(fridge_items, max_recipes)
     if not raw_recipes:
         return []
 
     ranked = split_and_rank_recipes(raw_recipes, fridge_items)
     return ranked
+
+
+def get_meal_plan_for_user(
+    user_id: int = None,
+    meals: int = 5,
+    days: int | None = None,
+    max_recipes: int = 50,
+    backend: RecipeBackend | str | None = None,
+    fridge_id: int | None = None,
+) -> Dict:
+    """
+    Like get_recipe_suggestions_for_user, but returns a plan of `meals`
+    recipes over the next `days` days (default: one per day) chosen
+    together to use up soon-to-expire food (see meal_planner.MealPlanner).
+    """
+    fridge_id = resolve_fridge_id(user_id, fridge_id)
+    ranked = get_recipe_suggestions_for_user(max_recipes=max_recipes, backend=backend,
+                                             fridge_id=fridge_id)
+    if not ranked:
+        return {"meals": [], "score": 0, "bound": 0, "optimal": True, "elapsed_ms": 0.0}
+    return plan_meals(ranked, get_all_items(fridge_id), meals=meals, days=days)
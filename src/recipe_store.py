@@ -0,0 +1,212 @@
+# recipe_store.py
+"""
+Persistent recipe corpus.
+
+Every recipe Gemini generates is saved (title, normalized ingredients,
+steps) in the recipes / recipe_ingredients tables, so later suggestions
+can be served locally. A recipe is stored once per (normalized title,
+ingredient set); recipe_ingredients is indexed by ingredient.
+
+RecipeCorpus keeps the bundled recipe_corpus plus the stored recipes in one
+in-memory RecipeIndex. search() also reports how well that corpus covers
+the current inventory, which CorpusFirstRecipeBackend (recipe_backends.py)
+uses to decide whether the LLM needs to be asked at all.
+"""
+import hashlib
+import json
+import re
+import threading
+from typing import List, Dict, Tuple
+
+from fridge_logging import get_logger, fields
+from ingredient_normalizer import normalize_ingredient
+from instrumentation import timed
+from recipe_corpus import RECIPE_CORPUS
+from recipe_index import RecipeIndex
+from recipe_rank import EXPIRY_WINDOW_DAYS
+from smart_fridge_db import get_connection
+
+_LOG = get_logger("recipes")
+
+
+def title_key(title: str) -> str:
+    """"Spicy  Tomato-Pasta!" -> "spicy tomato pasta"."""
+    return " ".join(re.sub(r"[^\w]+", " ", (title or "").lower()).split())
+
+
+def normalize_recipe(recipe: Dict) -> Dict | None:
+    """
+    {"title", "ingredients", "steps"} with normalized, de-duplicated
+    ingredients (first occurrence order), or None if it has no title or
+    no ingredients.
+    """
+    title = " ".join(str(recipe.get("title") or "").split())
+    ingredients = []
+    for ing in recipe.get("ingredients") or []:
+        key = normalize_ingredient(str(ing))
+        if key and key not in ingredients:
+            ingredients.append(key)
+    if not title or not ingredients:
+        return None
+    steps = [str(s).strip() for s in recipe.get("steps") or [] if str(s).strip()]
+    return {"title": title, "ingredients": ingredients, "steps": steps}
+
+
+def recipe_key(recipe: Dict) -> Tuple[str, str]:
+    """Dedupe key of a normalized recipe: (title key, ingredient set hash)."""
+    ingredient_set = "\n".join(sorted(recipe["ingredients"]))
+    return title_key(recipe["title"]), hashlib.sha1(ingredient_set.encode("utf-8")).hexdigest()
+
+
+# ---------- DB ----------
+
+def save_recipes(recipes: List[Dict], source: str = "gemini") -> List[Dict]:
+    """
+    Normalize and store recipes in one transaction, skipping any whose
+    (title, ingredient set) is already stored. Returns the normalized
+    recipes that were new.
+    """
+    pending = {}
+    for r in recipes:
+        n = normalize_recipe(r)
+        if n is not None:
+            pending.setdefault(recipe_key(n), n)
+    if not pending:
+        return []
+
+    saved = []
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            for (t_key, i_key), r in pending.items():
+                cur.execute("""
+                    INSERT IGNORE INTO recipes (title, title_key, ingredient_key, steps, source, created_at)
+                    VALUES (%s, %s, %s, %s, %s, NOW());
+                """, (r["title"], t_key, i_key, json.dumps(r["steps"]), source))
+                if not cur.rowcount:
+                    continue
+                recipe_id = cur.lastrowid
+                cur.executemany("""
+                    INSERT INTO recipe_ingredients (recipe_id, position, ingredient)
+                    VALUES (%s, %s, %s);
+                """, [(recipe_id, pos, ing) for pos, ing in enumerate(r["ingredients"])])
+                saved.append(r)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return saved
+
+
+def load_recipes() -> List[Dict]:
+    """Every stored recipe as {"title", "ingredients", "steps"}, oldest first."""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT recipe_id, title, steps FROM recipes ORDER BY recipe_id;")
+            by_id = {rid: {"title": title, "ingredients": [], "steps": json.loads(steps or "[]")}
+                     for rid, title, steps in cur.fetchall()}
+            cur.execute("""
+                SELECT recipe_id, ingredient FROM recipe_ingredients
+                ORDER BY recipe_id, position;
+            """)
+            for rid, ingredient in cur.fetchall():
+                if rid in by_id:
+                    by_id[rid]["ingredients"].append(ingredient)
+    finally:
+        conn.close()
+    return list(by_id.values())
+
+
+# ---------- in-memory corpus ----------
+
+class RecipeCorpus:
+    """
+    Bundled + stored recipes behind one RecipeIndex. The stored recipes are
+    loaded on first use; add() persists new recipes and indexes them right
+    away, so a harvested recipe can be served on the very next request.
+    """
+
+    def __init__(self, bundled: List[Dict] | None = None):
+        self._bundled = RECIPE_CORPUS if bundled is None else bundled
+        self._index: RecipeIndex | None = None
+        self._keys = set()
+        self._lock = threading.Lock()
+
+    def _load(self) -> RecipeIndex:
+        if self._index is None:
+            with timed("recipes.corpus_load"):
+                stored = load_recipes()
+            recipes = []
+            for r in list(self._bundled) + stored:
+                n = normalize_recipe(r)
+                if n is not None and recipe_key(n) not in self._keys:
+                    self._keys.add(recipe_key(n))
+                    recipes.append(r)
+            self._index = RecipeIndex(recipes)
+            _LOG.info("Recipe corpus: %d bundled + %d stored", len(self._bundled), len(stored),
+                      extra=fields(op="corpus_load", bundled=len(self._bundled), stored=len(stored)))
+        return self._index
+
+    def __len__(self):
+        with self._lock:
+            return len(self._load())
+
+    def add(self, recipes: List[Dict], source: str = "gemini") -> int:
+        """Persist + index recipes that aren't in the corpus yet. Returns how many were new."""
+        with self._lock:
+            self._load()
+            fresh = [r for r in recipes
+                     if (n := normalize_recipe(r)) is not None and recipe_key(n) not in self._keys]
+        if not fresh:
+            return 0
+        # The DB write runs without the lock so searches aren't blocked on it;
+        # INSERT IGNORE keeps concurrent adds of the same recipe to one row
+        saved = save_recipes(fresh, source)
+        with self._lock:
+            for r in saved:
+                if recipe_key(r) not in self._keys:
+                    self._keys.add(recipe_key(r))
+                    self._index.add_recipe(r)
+        return len(saved)
+
+    def search(self, fridge_items: List[Dict], max_recipes: int) -> Tuple[List[Dict], float]:
+        """
+        (recipes, coverage) for the inventory: the max_recipes most
+        overlapping corpus recipes (same order as LocalRecipeBackend) and
+        a 0..1 coverage score:
+
+            share of the inventory's soon-to-expire foods (all foods if none
+            is) used by at least one returned recipe
+          x share of the max_recipes slots that could be filled
+        """
+        with self._lock:
+            index = self._load()
+            index.set_fridge(fridge_items)
+            ids = index.top_k(max_recipes, by="overlap")
+            covered = set()
+            for rid in ids:
+                covered.update(index.matched_keys(rid))
+            recipes = [index.recipes[rid] for rid in ids]
+
+        foods = {normalize_ingredient(i["name"]): i["expires_in_days"] for i in fridge_items}
+        focus = {k for k, days in foods.items() if days < EXPIRY_WINDOW_DAYS} or set(foods)
+        if not focus or not max_recipes:
+            return recipes, 1.0
+        coverage = len(focus & covered) / len(focus) * min(1.0, len(ids) / max_recipes)
+        return recipes, round(coverage, 4)
+
+
+_CORPUS: RecipeCorpus | None = None
+_CORPUS_LOCK = threading.Lock()
+
+
+def get_corpus() -> RecipeCorpus:
+    """Process-wide RecipeCorpus (created on first use)."""
+    global _CORPUS
+    with _CORPUS_LOCK:
+        if _CORPUS is None:
+            _CORPUS = RecipeCorpus()
+        return _CORPUS
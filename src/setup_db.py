@@ -1,6 +1,29 @@
 import os
 import mysql.connector
 
+from food_catalog import sync_food_types
+
+# Seeded owner/fridge; existing single-fridge rows are migrated into it
+DEFAULT_USER_ID = 1
+DEFAULT_FRIDGE_ID = 1
+
+
+def _column_exists(cur, database: str, table: str, column: str) -> bool:
+    cur.execute("""
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND COLUMN_NAME = %s;
+    """, (database, table, column))
+    return cur.fetchone()[0] > 0
+
+
+def _column_type(cur, database: str, table: str, column: str) -> str | None:
+    cur.execute("""
+        SELECT COLUMN_TYPE FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND COLUMN_NAME = %s;
+    """, (database, table, column))
+    row = cur.fetchone()
+    return row[0] if row else None
+
 
 def ensure_schema(
     host: str = None,
@@ -12,6 +35,10 @@ def ensure_schema(
     """
     Ensure the smart_fridge database and schema exist.
     Safe to run multiple times.
+
+    Also bulk-upserts the food catalog into food_types, and migrates
+    older tables (adds fridge_id and re-keys the hot indexes, adds
+    frozen_remaining_days).
     """
 
     # --- Read config / env ---
@@ -70,11 +97,43 @@ def ensure_schema(
             """)
 
             # ----------------------------------------------------------
-            # food_items
+            # users / fridges (one user can own several fridges)
+            # ----------------------------------------------------------
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS users (
+                    user_id INT AUTO_INCREMENT PRIMARY KEY,
+                    name VARCHAR(100) NOT NULL UNIQUE
+                ) ENGINE=InnoDB;
+            """)
+
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS fridges (
+                    fridge_id INT AUTO_INCREMENT PRIMARY KEY,
+                    user_id INT NOT NULL,
+                    name VARCHAR(100) NOT NULL DEFAULT 'fridge',
+
+                    CONSTRAINT fk_fridges_user
+                        FOREIGN KEY (user_id)
+                        REFERENCES users(user_id)
+                        ON DELETE CASCADE
+                        ON UPDATE CASCADE,
+
+                    INDEX idx_fridges_user (user_id)
+                ) ENGINE=InnoDB;
+            """)
+
+            cur.execute("INSERT IGNORE INTO users (user_id, name) VALUES (%s, 'default');",
+                        (DEFAULT_USER_ID,))
+            cur.execute("INSERT IGNORE INTO fridges (fridge_id, user_id, name) VALUES (%s, %s, 'default');",
+                        (DEFAULT_FRIDGE_ID, DEFAULT_USER_ID))
+
+            # ----------------------------------------------------------
+            # food_items (fridge_id leads every hot index)
             # ----------------------------------------------------------
             cur.execute("""
                 CREATE TABLE IF NOT EXISTS food_items (
                     item_id INT AUTO_INCREMENT PRIMARY KEY,
+                    fridge_id INT NOT NULL DEFAULT 1,
                     food_type_id INT NOT NULL,
                     quantity DECIMAL(8,2) DEFAULT 1.00,
                     unit VARCHAR(20) DEFAULT 'pcs',
@@ -86,6 +145,8 @@ def ensure_schema(
                     location_slot VARCHAR(50),
                     added_by ENUM('user','camera','barcode') DEFAULT 'user',
                     storage ENUM('fridge','freezer') NOT NULL DEFAULT 'fridge',
+                    -- shelf life left when frozen; the clock is paused until it thaws
+                    frozen_remaining_days INT DEFAULT NULL,
 
                     CONSTRAINT fk_food_items_type
                         FOREIGN KEY (food_type_id)
@@ -93,8 +154,190 @@ def ensure_schema(
                         ON DELETE CASCADE
                         ON UPDATE CASCADE,
 
-                    INDEX idx_expiration_date (expiration_date),
-                    INDEX idx_storage (storage)
+                    CONSTRAINT fk_food_items_fridge
+                        FOREIGN KEY (fridge_id)
+                        REFERENCES fridges(fridge_id)
+                        ON DELETE CASCADE
+                        ON UPDATE CASCADE,
+
+                    INDEX idx_fridge_expiration (fridge_id, expiration_date),
+                    INDEX idx_fridge_storage (fridge_id, storage),
+                    INDEX idx_fridge_type (fridge_id, food_type_id)
+                ) ENGINE=InnoDB;
+            """)
+
+            # Migrate single-fridge tables: every existing row joins the default fridge
+            if not _column_exists(cur, database, "food_items", "fridge_id"):
+                cur.execute("""
+                    ALTER TABLE food_items
+                        ADD COLUMN fridge_id INT NOT NULL DEFAULT 1 AFTER item_id,
+                        ADD CONSTRAINT fk_food_items_fridge
+                            FOREIGN KEY (fridge_id) REFERENCES fridges(fridge_id)
+                            ON DELETE CASCADE ON UPDATE CASCADE,
+                        ADD INDEX idx_fridge_expiration (fridge_id, expiration_date),
+                        ADD INDEX idx_fridge_storage (fridge_id, storage),
+                        ADD INDEX idx_fridge_type (fridge_id, food_type_id),
+                        DROP INDEX idx_expiration_date,
+                        DROP INDEX idx_storage;
+                """)
+
+            if not _column_exists(cur, database, "food_items", "frozen_remaining_days"):
+                cur.execute("""
+                    ALTER TABLE food_items
+                        ADD COLUMN frozen_remaining_days INT DEFAULT NULL AFTER storage;
+                """)
+                # Items already frozen keep their food's full shelf life for when they thaw
+                cur.execute("""
+                    UPDATE food_items i
+                    JOIN food_types t ON i.food_type_id = t.food_type_id
+                    SET i.frozen_remaining_days = t.average_shelf_life_days
+                    WHERE i.storage = 'freezer';
+                """)
+
+            # ----------------------------------------------------------
+            # inventory_events (append-only history, written in batches
+            # by event_log.py; no FK so history outlives deleted rows)
+            # ----------------------------------------------------------
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS inventory_events (
+                    event_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                    fridge_id INT NOT NULL DEFAULT 1,
+                    event_type ENUM('add','consume','expire','delete','discard','move') NOT NULL,
+                    item_id INT NOT NULL,
+                    food_name VARCHAR(100) NOT NULL,
+                    quantity DECIMAL(8,2) DEFAULT NULL,
+                    remaining_quantity DECIMAL(8,2) DEFAULT NULL,
+                    unit VARCHAR(20) DEFAULT NULL,
+                    storage ENUM('fridge','freezer') DEFAULT NULL,
+                    event_time DATETIME NOT NULL,
+                    expire_item_id INT AS (IF(event_type = 'expire', item_id, NULL)) STORED,
+
+                    INDEX idx_events_item (item_id),
+                    INDEX idx_events_fridge_time (fridge_id, event_time),
+                    INDEX idx_events_food_time (food_name, event_time),
+                    UNIQUE INDEX uq_events_expire (expire_item_id)
+                ) ENGINE=InnoDB;
+            """)
+
+            if not _column_exists(cur, database, "inventory_events", "fridge_id"):
+                cur.execute("""
+                    ALTER TABLE inventory_events
+                        ADD COLUMN fridge_id INT NOT NULL DEFAULT 1 AFTER event_id,
+                        ADD INDEX idx_events_fridge_time (fridge_id, event_time);
+                """)
+
+            # 'discard' (thrown away as spoiled) and 'move' (fridge <-> freezer)
+            # feed the shelf-life model; appending ENUM values is metadata-only
+            if "'move'" not in (_column_type(cur, database, "inventory_events", "event_type") or ""):
+                cur.execute("""
+                    ALTER TABLE inventory_events
+                        MODIFY COLUMN event_type
+                            ENUM('add','consume','expire','delete','discard','move') NOT NULL;
+                """)
+
+            # At most one 'expire' per item (the scheduler re-reports expired
+            # items after every restart). Older logs may hold repeats: keep
+            # the first and rebuild the rollup they were counted into.
+            expire_dupes = 0
+            if not _column_exists(cur, database, "inventory_events", "expire_item_id"):
+                cur.execute("""
+                    DELETE e FROM inventory_events e
+                    JOIN (SELECT item_id, MIN(event_id) AS first_id
+                          FROM inventory_events WHERE event_type = 'expire'
+                          GROUP BY item_id) f ON f.item_id = e.item_id
+                    WHERE e.event_type = 'expire' AND e.event_id > f.first_id;
+                """)
+                expire_dupes = cur.rowcount
+                cur.execute("""
+                    ALTER TABLE inventory_events
+                        ADD COLUMN expire_item_id INT AS (IF(event_type = 'expire', item_id, NULL)) STORED,
+                        ADD UNIQUE INDEX uq_events_expire (expire_item_id);
+                """)
+
+            # ----------------------------------------------------------
+            # inventory_weekly_rollup (per fridge / week / food / event
+            # type, maintained by event_log.py on every flush)
+            # ----------------------------------------------------------
+            rebuild_rollup = False
+            cur.execute("SHOW TABLES LIKE 'inventory_weekly_rollup';")
+            if cur.fetchone() and not _column_exists(cur, database, "inventory_weekly_rollup", "fridge_id"):
+                # Derived data: re-key it and rebuild from the raw events below
+                cur.execute("DROP TABLE inventory_weekly_rollup;")
+                rebuild_rollup = True
+
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS inventory_weekly_rollup (
+                    fridge_id INT NOT NULL DEFAULT 1,
+                    week_start DATE NOT NULL,
+                    food_name VARCHAR(100) NOT NULL,
+                    event_type ENUM('add','consume','expire','delete','discard') NOT NULL,
+                    event_count INT NOT NULL DEFAULT 0,
+                    total_quantity DECIMAL(12,2) NOT NULL DEFAULT 0,
+
+                    PRIMARY KEY (fridge_id, week_start, food_name, event_type),
+                    INDEX idx_rollup_fridge_type_week (fridge_id, event_type, week_start)
+                ) ENGINE=InnoDB;
+            """)
+
+            if "'discard'" not in (_column_type(cur, database, "inventory_weekly_rollup", "event_type") or ""):
+                cur.execute("""
+                    ALTER TABLE inventory_weekly_rollup
+                        MODIFY COLUMN event_type
+                            ENUM('add','consume','expire','delete','discard') NOT NULL;
+                """)
+
+            if expire_dupes and not rebuild_rollup:
+                cur.execute("DELETE FROM inventory_weekly_rollup;")
+                rebuild_rollup = True
+
+            if rebuild_rollup:
+                cur.execute("""
+                    INSERT INTO inventory_weekly_rollup
+                        (fridge_id, week_start, food_name, event_type, event_count, total_quantity)
+                    SELECT fridge_id,
+                           DATE_SUB(DATE(event_time), INTERVAL WEEKDAY(event_time) DAY),
+                           food_name, event_type, COUNT(*), COALESCE(SUM(quantity), 0)
+                    FROM inventory_events
+                    WHERE event_type <> 'move'
+                      AND NOT (event_type = 'discard' AND item_id IN (
+                          SELECT expire_item_id FROM inventory_events WHERE expire_item_id IS NOT NULL))
+                    GROUP BY 1, 2, 3, 4;
+                """)
+
+            # ----------------------------------------------------------
+            # recipes (corpus of saved Gemini recipes, recipe_store.py):
+            # one row per normalized title + ingredient set, ingredients
+            # in their own table indexed by ingredient
+            # ----------------------------------------------------------
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS recipes (
+                    recipe_id INT AUTO_INCREMENT PRIMARY KEY,
+                    title VARCHAR(255) NOT NULL,
+                    title_key VARCHAR(255) NOT NULL,
+                    ingredient_key CHAR(40) NOT NULL,
+                    steps JSON NOT NULL,
+                    source VARCHAR(20) NOT NULL DEFAULT 'gemini',
+                    created_at DATETIME NOT NULL,
+
+                    UNIQUE KEY uq_recipes_title_ingredients (title_key, ingredient_key)
+                ) ENGINE=InnoDB;
+            """)
+
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS recipe_ingredients (
+                    recipe_id INT NOT NULL,
+                    position SMALLINT NOT NULL,
+                    ingredient VARCHAR(100) NOT NULL,
+
+                    PRIMARY KEY (recipe_id, position),
+
+                    CONSTRAINT fk_recipe_ingredients_recipe
+                        FOREIGN KEY (recipe_id)
+                        REFERENCES recipes(recipe_id)
+                        ON DELETE CASCADE
+                        ON UPDATE CASCADE,
+
+                    INDEX idx_recipe_ingredients_ingredient (ingredient, recipe_id)
                 ) ENGINE=InnoDB;
             """)
 
@@ -105,6 +348,7 @@ def ensure_schema(
                 CREATE OR REPLACE VIEW item_status_view AS
                 SELECT
                     i.item_id,
+                    i.fridge_id,
                     t.food_type_id,
                     t.name AS food_name,
                     t.category AS food_category,
@@ -120,6 +364,7 @@ def ensure_schema(
                         ELSE 'fresh'
                     END AS status,
                     i.storage,
+                    i.frozen_remaining_days,
                     i.location_slot,
                     i.added_by,
                     i.detection_label,
@@ -132,5 +377,10 @@ def ensure_schema(
 
         conn.commit()
 
+        # ----------------------------------------------------------
+        # food_types seed (one batch upsert from food_catalog)
+        # ----------------------------------------------------------
+        sync_food_types(conn)
+
     finally:
         conn.close()
@@ -0,0 +1,215 @@
+# shelf_life_model.py
+"""
+Shelf-life model learned from the inventory event log.
+
+A "discard" (delete_item(..., spoiled=True)) says the food actually went
+off, and so does a plain delete of an item that had already expired (an
+"expire" event was logged for it first): people throw out spoiled food
+with the normal Delete button too. Eating it up (consume to 0) or a plain
+delete before the date ends the observation without saying anything about
+spoilage, so those items are right-censored: their time counts as exposure
+but not as a failure. An "expire" event on its own is not a failure; it
+fires when the model's own date passes.
+
+Time is counted only while the item is in the fridge: a "move" to the
+freezer pauses the item's clock and a move back resumes it. Items added
+straight to the freezer start paused.
+
+Per food, the fridge shelf life is the mean of an exponential lifetime with
+censoring and a prior worth PRIOR_WEIGHT spoiled items:
+
+    estimate = (PRIOR_WEIGHT * prior + exposure_days) / (PRIOR_WEIGHT + discards)
+
+where prior is the static SHELF_LIFE_DAYS value (7 for unknown foods). The
+estimate is kept within [prior / 2, prior * 2], so a few odd observations
+can't produce unsafe or useless dates, and it never goes above prior until
+MIN_DISCARDS failures have been seen: censored items alone only ever push
+the estimate up, so without evidence of spoilage the static value stands. Freezer items have no expiry date,
+so only (food, "fridge") is learned.
+
+Refits are incremental: only events after the last processed event_id are
+read, on a background thread. Lookups are a single dict hit on the served
+table, so the insert hot path stays O(1).
+"""
+import threading
+from typing import Dict, Tuple
+
+from ingredient_normalizer import defaults_food
+from shelf_life_data import SHELF_LIFE_DAYS
+import smart_fridge_db
+from fridge_logging import get_logger, fields
+from smart_fridge_db import get_connection
+
+DEFAULT_SHELF_LIFE_DAYS = 7
+
+_LOG = get_logger("shelf_life")
+
+
+def static_shelf_life(name: str) -> int:
+    """The hardcoded value (SHELF_LIFE_DAYS, else its defaults_food's, 7 days if unknown)."""
+    return SHELF_LIFE_DAYS.get(name) or SHELF_LIFE_DAYS.get(defaults_food(name), DEFAULT_SHELF_LIFE_DAYS)
+
+
+def _days(start, end) -> float:
+    return max((end - start).total_seconds(), 0) / 86400
+
+
+class ShelfLifeModel:
+    PRIOR_WEIGHT = 3
+    MIN_DISCARDS = 3          # failures needed before the estimate may exceed the prior
+    BATCH_SIZE = 5000
+
+    def __init__(self, refit_interval: float = 3600.0):
+        self.refit_interval = refit_interval
+
+        # Served table: (food_name, storage) -> days. Replaced, never mutated,
+        # so readers need no lock.
+        self._table: Dict[Tuple[str, str], int] = {}
+
+        # Fitting state (only touched under _fit_lock)
+        self._fit_lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], list] = {}     # key -> [discards, exposure_days]
+        # item_id -> [key, exposure_days, in fridge since | None, expired]
+        self._open: Dict[int, list] = {}
+        self._watermark = 0                                # last event_id processed
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---------- serving ----------
+
+    def shelf_life_days(self, name: str, storage: str = "fridge") -> int:
+        days = self._table.get((name, storage))
+        return days if days is not None else static_shelf_life(name)
+
+    def table(self) -> Dict[Tuple[str, str], int]:
+        return dict(self._table)
+
+    # ---------- fitting ----------
+
+    def refit(self) -> int:
+        """Consume new events from inventory_events. Returns events processed."""
+        with self._fit_lock:
+            processed = 0
+            touched = set()
+            while True:
+                rows = self._fetch_events(self._watermark)
+                for event_id, event_type, item_id, food_name, storage, remaining, event_time in rows:
+                    self._watermark = event_id
+
+                    if event_type == "add":
+                        since = event_time if (storage or "fridge") == "fridge" else None
+                        self._open[item_id] = [(food_name, "fridge"), 0.0, since, False]
+                        continue
+
+                    item = self._open.get(item_id)
+                    if item is None:
+                        continue
+                    key, exposure, since, expired = item
+
+                    if event_type == "expire":
+                        item[3] = True
+                        continue
+
+                    if event_type == "move":
+                        if storage == "fridge" and since is None:
+                            item[2] = event_time
+                        elif storage != "fridge" and since is not None:
+                            item[1] = exposure + _days(since, event_time)
+                            item[2] = None
+                        continue
+
+                    finished = event_type in ("delete", "discard") or \
+                        (event_type == "consume" and remaining is not None and float(remaining) <= 0)
+                    if not finished:
+                        continue
+
+                    del self._open[item_id]
+                    spoiled = event_type == "discard" or (event_type == "delete" and expired)
+                    if since is not None:
+                        exposure += _days(since, event_time)
+                    elif spoiled:
+                        continue          # spoiled in the freezer: says nothing about the fridge
+                    stats = self._stats.setdefault(key, [0, 0.0])
+                    stats[0] += spoiled
+                    stats[1] += exposure
+                    touched.add(key)
+
+                processed += len(rows)
+                if len(rows) < self.BATCH_SIZE:
+                    break
+
+            if touched:
+                table = dict(self._table)
+                for key in touched:
+                    table[key] = self._estimate(key)
+                self._table = table
+
+            return processed
+
+    def _estimate(self, key: Tuple[str, str]) -> int:
+        prior = static_shelf_life(key[0])
+        if prior <= 0:
+            return prior          # e.g. ice cream: never meant to live in the fridge
+        failures, exposure = self._stats[key]
+        est = (self.PRIOR_WEIGHT * prior + exposure) / (self.PRIOR_WEIGHT + failures)
+        low = max(1, prior / 2)
+        high = max(1, prior * 2) if failures >= self.MIN_DISCARDS else prior
+        return int(round(min(max(est, low), high)))
+
+    def _fetch_events(self, after_event_id: int):
+        conn = get_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT event_id, event_type, item_id, food_name, storage,
+                           remaining_quantity, event_time
+                    FROM inventory_events
+                    WHERE event_id > %s
+                    ORDER BY event_id
+                    LIMIT %s;
+                """, (after_event_id, self.BATCH_SIZE))
+                return cur.fetchall()
+        finally:
+            conn.close()
+
+    # ---------- background refit ----------
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="shelf-life-model", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refit()
+            except Exception as e:
+                _LOG.warning("Shelf-life refit failed: %s", e, extra=fields(op="refit"))
+            self._stop.wait(self.refit_interval)
+
+
+_MODEL = None
+_MODEL_LOCK = threading.Lock()
+
+
+def get_shelf_life_model() -> ShelfLifeModel:
+    """
+    Return the process-wide model, starting background refits on first use
+    and making smart_fridge_db use it for new items.
+    """
+    global _MODEL
+    with _MODEL_LOCK:
+        if _MODEL is None:
+            _MODEL = ShelfLifeModel()
+            _MODEL.start()
+            smart_fridge_db.set_shelf_life_model(_MODEL)
+    return _MODEL
@@ -0,0 +1,256 @@
+# shopping_list.py
+import re
+from typing import List, Dict, Iterable, Tuple
+
+from ingredient_normalizer import normalize_ingredient
+
+# Measured units -> (base unit, factor); anything else is a count ("pcs")
+_MEASURED_UNITS = {
+    "mg": ("g", 0.001), "g": ("g", 1.0), "gram": ("g", 1.0), "grams": ("g", 1.0),
+    "kg": ("g", 1000.0), "oz": ("g", 28.3495), "lb": ("g", 453.592), "lbs": ("g", 453.592),
+    "ml": ("ml", 1.0), "cl": ("ml", 10.0), "dl": ("ml", 100.0),
+    "l": ("ml", 1000.0), "litre": ("ml", 1000.0), "liter": ("ml", 1000.0),
+    "litres": ("ml", 1000.0), "liters": ("ml", 1000.0),
+}
+_COUNT_UNITS = {"pc", "pcs", "piece", "pieces", "x"}
+# Units that neither convert to g / ml nor count pieces of the food
+_OTHER_UNITS = {
+    "cup", "cups", "tbsp", "tsp", "tablespoon", "tablespoons", "teaspoon", "teaspoons",
+    "can", "cans", "tin", "tins", "jar", "jars", "pack", "packs", "packet", "packets",
+    "bunch", "bunches", "clove", "cloves", "slice", "slices", "stick", "sticks",
+    "bottle", "bottles", "pinch", "dash", "handful",
+}
+
+# "2 eggs", "200g flour", "1.5 l milk", "1 1/2 cups rice"
+_AMOUNT_RE = re.compile(r"^\s*(\d+/\d+|\d+(?:[.,]\d+)?(?:\s+\d+/\d+)?)\s*([a-z]+)?\b", re.IGNORECASE)
+
+Key = Tuple[str, str | None]      # (food, "g" | "ml" | None for portions / pieces)
+
+
+def _number(text: str) -> float:
+    total = 0.0
+    for part in text.replace(",", ".").split():
+        num, _, den = part.partition("/")
+        total += float(num) / float(den) if den else float(num)
+    return total
+
+
+def parse_amount(ingredient: str) -> Tuple[float | None, str | None]:
+    """
+    Leading amount of an ingredient string as (amount, unit): unit is "g" or
+    "ml" for measured amounts (converted), None for a count of pieces.
+    (None, None) when there is no amount or its unit can't be used
+    ("2 cups rice"); the ingredient then needs one portion.
+    """
+    match = _AMOUNT_RE.match(str(ingredient))
+    if match is None:
+        return None, None
+    amount = _number(match.group(1))
+    word = (match.group(2) or "").lower()
+    if word in _MEASURED_UNITS:
+        base, factor = _MEASURED_UNITS[word]
+        return amount * factor, base
+    if word in _OTHER_UNITS:
+        return None, None
+    return amount, None            # "2 eggs", "3 pcs eggs"
+
+
+class ShoppingList:
+    """
+    What to buy to cook a selection of ranked recipes
+    (split_and_rank_recipes output).
+
+    Each distinct ingredient of a recipe is matched through the ingredient
+    normalizer, so "2 Eggs" in one recipe and "egg" in another add up to one
+    line. The amount a recipe needs comes from the ingredient text: "2 Eggs"
+    is 2 pieces, "200g flour" is 200 g, "1.5 l milk" is 1500 ml. Without a
+    usable amount ("flour", "2 cups rice") the recipe needs one portion
+    (portions[food] if given, in the unit the food is stocked in, as
+    cook_recipe takes) and the line is a count of portions. portions also
+    overrides amounts written in the text.
+
+    The food still good in the inventory (get_all_items rows, expired ones
+    ignored) is subtracted, so an ingredient that is available for each
+    recipe on its own but not for all of them together is listed too. Stock
+    in g / kg / ml / l is converted and subtracted from amounts in g / ml;
+    stock in pieces is subtracted from pieces and portions. When the two
+    can't be compared (grams needed, pieces on hand) any stock on hand
+    covers the need.
+
+    Recipes are selected by identity (the dict passed in), so two different
+    recipes with the same title are both counted. select()/deselect() only
+    touch the ingredients of that one recipe; the DB and the recipe backend
+    are never queried again.
+    """
+
+    def __init__(self, inventory: Iterable[Dict] = (), portions: Dict[str, float] | None = None):
+        self.portions = {normalize_ingredient(k): float(v) for k, v in (portions or {}).items()}
+        self._have: Dict[str, float] = {}          # food -> count-unit quantity
+        self._measured: Dict[str, tuple] = {}      # food -> (base unit, quantity)
+        self._units: Dict[str, str] = {}
+        self._need: Dict[Key, float] = {}
+        self._labels: Dict[Key, str] = {}          # key -> ingredient text first seen
+        self._users: Dict[Key, List[str]] = {}     # key -> titles of selected recipes
+        # id(recipe) -> (recipe, {key: amount}); holding the recipe keeps its id unique
+        self._selected: Dict[int, tuple] = {}
+        self._buy: Dict[Key, float] = {}
+        self.set_inventory(inventory)
+
+    def set_inventory(self, inventory: Iterable[Dict]):
+        """Replace the on-hand quantities (e.g. after the inventory changed)."""
+        self._have.clear()
+        self._measured.clear()
+        self._units.clear()
+        for row in inventory:
+            if row.get("status") == "expired":
+                continue
+            food = normalize_ingredient(row["food_name"])
+            unit = (row.get("unit") or "pcs").strip().lower()
+            quantity = float(row.get("quantity") or 0)
+            if unit in _MEASURED_UNITS:
+                base, factor = _MEASURED_UNITS[unit]
+                have_unit, have = self._measured.get(food, (base, 0.0))
+                # A second kind of measure for one food (g and ml) can't be added up
+                if have_unit == base:
+                    self._measured[food] = (base, have + quantity * factor)
+            else:
+                self._have[food] = self._have.get(food, 0.0) + quantity
+                self._units.setdefault(food, row.get("unit") or "pcs")
+        for key in list(self._need):
+            self._update(key)
+
+    # ---------- selection ----------
+
+    def _on_hand(self, key: Key) -> tuple:
+        """(quantity, unit) the need of key is compared against."""
+        food, unit = key
+        measured = self._measured.get(food)
+        if unit is not None:
+            return (measured[1] if measured and measured[0] == unit else 0.0), unit
+        if measured is not None and (food in self.portions or food not in self._have):
+            return measured[1], measured[0]
+        return self._have.get(food, 0.0), self._units.get(food)
+
+    def _update(self, key: Key):
+        food, unit = key
+        measured = self._measured.get(food)
+        have, have_unit = self._on_hand(key)
+        if unit is None and measured is not None and have_unit == measured[0] and food not in self.portions:
+            # Grams or millilitres can't be subtracted from a count of portions
+            short = 0.0 if have > 0 else self._need.get(key, 0.0)
+        elif unit is not None and not have and (food in self._have or measured is not None):
+            # Needed by weight/volume, on hand in pieces (or the other measure)
+            short = 0.0
+        else:
+            short = self._need.get(key, 0.0) - have
+        if short > 1e-9:
+            self._buy[key] = round(short, 6)
+        else:
+            self._buy.pop(key, None)
+
+    def _needs(self, recipe: Dict) -> Dict[Key, tuple]:
+        """{key: (amount, ingredient text)} for one recipe's distinct ingredients."""
+        needs: Dict[Key, tuple] = {}
+        seen = set()
+        for ingredient in recipe.get("ingredients", []) or []:
+            food = normalize_ingredient(ingredient)
+            if food in seen:
+                continue
+            seen.add(food)
+            amount, unit = parse_amount(ingredient)
+            if food in self.portions or amount is None:
+                amount, unit = self.portions.get(food, 1.0), None
+            needs[(food, unit)] = (amount, ingredient)
+        return needs
+
+    def select(self, recipe: Dict) -> bool:
+        """Add a recipe's ingredients; False if this recipe is already selected."""
+        if id(recipe) in self._selected:
+            return False
+        title = recipe.get("title", "")
+        needs: Dict[Key, float] = {}
+        for key, (amount, ingredient) in self._needs(recipe).items():
+            needs[key] = amount
+            self._labels.setdefault(key, ingredient)
+            self._need[key] = self._need.get(key, 0.0) + amount
+            self._users.setdefault(key, []).append(title)
+            self._update(key)
+        self._selected[id(recipe)] = (recipe, needs)
+        return True
+
+    def deselect(self, recipe: Dict | str) -> bool:
+        """
+        Remove a recipe (or the first selected one with that title);
+        False if it wasn't selected.
+        """
+        if isinstance(recipe, str):
+            key = next((k for k, (r, _) in self._selected.items() if r.get("title", "") == recipe), None)
+        else:
+            key = id(recipe)
+        entry = self._selected.pop(key, None)
+        if entry is None:
+            return False
+        selected, needs = entry
+        title = selected.get("title", "")
+        for need_key, amount in needs.items():
+            remaining = self._need[need_key] - amount
+            self._users[need_key].remove(title)
+            if self._users[need_key]:
+                self._need[need_key] = remaining
+            else:
+                del self._need[need_key], self._users[need_key], self._labels[need_key]
+            self._update(need_key)
+        return True
+
+    def set_selection(self, recipes: Iterable[Dict]):
+        """Select exactly these recipes, applying only the difference."""
+        wanted = {id(r): r for r in recipes}
+        for key in [k for k in self._selected if k not in wanted]:
+            self.deselect(self._selected[key][0])
+        for key, recipe in wanted.items():
+            if key not in self._selected:
+                self.select(recipe)
+
+    @property
+    def selected(self) -> List[str]:
+        """Titles of the selected recipes, in selection order."""
+        return [recipe.get("title", "") for recipe, _ in self._selected.values()]
+
+    # ---------- result ----------
+
+    def items(self) -> List[Dict]:
+        """
+        [{"name", "ingredient", "buy", "need", "have", "unit", "recipes"}, ...]
+        for every food that runs short, in the order it was first needed.
+        unit is the unit need / have / buy are in: "g" / "ml" for measured
+        amounts or stock, else the inventory's count unit (None if there is
+        none: a count of portions or pieces). A food needed both by weight
+        and by count gets one line for each.
+        """
+        out = []
+        for key, need in self._need.items():
+            if key not in self._buy:
+                continue
+            have, unit = self._on_hand(key)
+            out.append({
+                "name": key[0],
+                "ingredient": self._labels[key],
+                "buy": self._buy[key],
+                "need": round(need, 6),
+                "have": round(have, 6),
+                "unit": unit,
+                "recipes": list(self._users[key]),
+            })
+        return out
+
+    def __len__(self):
+        return len(self._buy)
+
+
+def build_shopping_list(recipes: Iterable[Dict], inventory: Iterable[Dict],
+                        portions: Dict[str, float] | None = None) -> List[Dict]:
+    """One-shot ShoppingList(inventory, portions) over recipes; see ShoppingList.items()."""
+    shopping = ShoppingList(inventory, portions)
+    for recipe in recipes:
+        shopping.select(recipe)
+    return shopping.items()
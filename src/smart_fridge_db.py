@@ -1,42 +1,326 @@
+import threading
+import time
+from collections import OrderedDict
 import mysql.connector
+import mysql.connector.pooling
 import config
 from datetime import date, timedelta
 from shelf_life_data import SHELF_LIFE_DAYS 
-from food_categories import FOOD_CATEGORIES
+from ingredient_normalizer import clean_food_name, defaults_food, normalize_ingredient
+import food_catalog
+from instrumentation import inc, timed, wrap_connection
+from fridge_logging import get_logger, log_op, fields
 from typing import List, Dict
 
+_LOG = get_logger("db")
+
+
+# Fridge used when callers don't pass one (single-fridge setups never need to)
+DEFAULT_FRIDGE_ID = config.FRIDGE_ID
+
+
 def normalize_str(s: str | None) -> str | None:
     return s.strip().lower() if isinstance(s, str) else s
 
 
+def normalize_food_name(name: str | None) -> str | None:
+    """
+    Name to store for a food ("Tomatoes" -> "tomato", "2 eggs" -> "eggs").
+    Aliases are not folded ("bacon" stays "bacon"); recipe matching applies
+    them with normalize_ingredient().
+    """
+    return clean_food_name(name)
+
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def init_pool(pool_size: int | None = None):
+    """
+    Switch get_connection() to a shared connection pool (used by
+    long-running processes such as fridge_server.py). conn.close() on a
+    pooled connection returns it to the pool, so callers don't change.
+    """
+    global _POOL
+    pool_size = pool_size or config.MYSQL_POOL_SIZE or 5
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = mysql.connector.pooling.MySQLConnectionPool(
+                pool_name="smart_fridge",
+                pool_size=pool_size,
+                host=config.MYSQL_HOST,
+                port=config.MYSQL_PORT,
+                user=config.MYSQL_USER,
+                password=config.MYSQL_PASSWORD,
+                database=config.MYSQL_DB,
+            )
+    return _POOL
+
+
 def get_connection():
-    """Create a new DB connection."""
-    return mysql.connector.connect(
-        host=config.MYSQL_HOST,
-        port=config.MYSQL_PORT,
-        user=config.MYSQL_USER,
-        password=config.MYSQL_PASSWORD,
-        database=config.MYSQL_DB,
-    )
+    """
+    Return a DB connection (from the pool if one is configured). With
+    instrumentation enabled every statement on it is timed as db.query.
+    """
+    if _POOL is None and config.MYSQL_POOL_SIZE:
+        init_pool()
+    with timed("db.connect", pooled=_POOL is not None):
+        if _POOL is not None:
+            conn = _POOL.get_connection()
+        else:
+            conn = mysql.connector.connect(
+                host=config.MYSQL_HOST,
+                port=config.MYSQL_PORT,
+                user=config.MYSQL_USER,
+                password=config.MYSQL_PASSWORD,
+                database=config.MYSQL_DB,
+            )
+    return wrap_connection(conn)
+
+# ---------- Mutation listeners ----------
+
+_MUTATION_LISTENERS = []
+
+
+def add_mutation_listener(fn):
+    """
+    Register fn(event, details) to be called after every committed inventory
+    mutation. event is one of "add", "consume", "delete", "move", "clear";
+    details is a dict with fridge_id (None for the "clear" of wipe_database())
+    and item_id ("move" has item_ids instead; "clear" has neither).
+    """
+    if fn not in _MUTATION_LISTENERS:
+        _MUTATION_LISTENERS.append(fn)
+
+
+def remove_mutation_listener(fn):
+    if fn in _MUTATION_LISTENERS:
+        _MUTATION_LISTENERS.remove(fn)
+
+
+def _notify_mutation(event: str, **details):
+    # Invalidate cached reads before anyone (e.g. the scheduler) re-reads
+    _bump_inventory_version(details.get("fridge_id"))
+    for fn in list(_MUTATION_LISTENERS):
+        try:
+            fn(event, details)
+        except Exception as e:
+            # A broken listener must never undo or fail a committed write
+            _LOG.warning("Mutation listener %s failed: %s", getattr(fn, "__name__", fn), e,
+                         extra=fields(op="notify", event=event))
+
+# ---------- In-memory inventory ----------
+
+# fridge_id -> inventory_store.InventoryStore, installed by
+# inventory_store.get_inventory_store(). A fridge with a store serves its
+# reads (and consume/delete) from memory instead of item_status_view.
+_STORES: Dict[int, object] = {}
+
+
+def set_inventory_store(fridge_id: int, store):
+    if store is None:
+        _STORES.pop(fridge_id, None)
+    else:
+        _STORES[fridge_id] = store
+
+# ---------- Read cache ----------
+#
+# Reads of item_status_view are cached per (function, fridge, args, today)
+# and tagged with the fridge's inventory version at the time of the read.
+# Every committed mutation bumps the version (in _notify_mutation) and drops
+# that fridge's entries, so an entry is served only while nothing in that
+# fridge has changed; a read that races a mutation is stored under the old
+# version and simply misses next time. The date is part of the key because
+# expiry status depends on it.
+#
+# Mutations made by other processes are invisible here, so the cache is off
+# unless SMART_FRIDGE_READ_CACHE=1, and entries older than
+# config.READ_CACHE_TTL seconds are never served. Past
+# _READ_CACHE_MAX_ENTRIES the least recently used entry is evicted.
+
+_VERSION_LOCK = threading.Lock()
+_GLOBAL_VERSION = 0                  # bumped by wipe_database()
+_FRIDGE_VERSIONS: Dict[int, int] = {}
+_READ_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()  # key -> (version, stored at, rows), LRU order
+_READ_CACHE_MAX_ENTRIES = 256
+
+
+def inventory_version(fridge_id: int | None = None) -> tuple:
+    """Monotonic version of one fridge's contents (changes on every mutation)."""
+    if fridge_id is None:
+        fridge_id = DEFAULT_FRIDGE_ID
+    return _GLOBAL_VERSION, _FRIDGE_VERSIONS.get(fridge_id, 0)
+
+
+def _bump_inventory_version(fridge_id: int | None):
+    global _GLOBAL_VERSION
+    with _VERSION_LOCK:
+        if fridge_id is None:
+            _GLOBAL_VERSION += 1
+            _READ_CACHE.clear()
+        else:
+            _FRIDGE_VERSIONS[fridge_id] = _FRIDGE_VERSIONS.get(fridge_id, 0) + 1
+            # Key is (op, *args, fridge_id, date)
+            for key in [k for k in _READ_CACHE if k[-2] == fridge_id]:
+                del _READ_CACHE[key]
+
+
+def _read_through(key: tuple, fridge_id: int, load):
+    """Return load() (a list of dicts), served from the cache while the fridge is unchanged."""
+    if not config.READ_CACHE_ENABLED:
+        return load()
+
+    version = inventory_version(fridge_id)
+    key = key + (fridge_id, date.today())
+    now = time.monotonic()
+    with _VERSION_LOCK:
+        hit = _READ_CACHE.get(key)
+        if hit is not None and hit[0] == version and now - hit[1] < config.READ_CACHE_TTL:
+            _READ_CACHE.move_to_end(key)
+        else:
+            hit = None
+    if hit is not None:
+        inc("db.read_cache", result="hit", op=key[0])
+        rows = hit[2]
+    else:
+        inc("db.read_cache", result="miss", op=key[0])
+        rows = load()
+        with _VERSION_LOCK:
+            _READ_CACHE[key] = (version, now, rows)
+            _READ_CACHE.move_to_end(key)
+            while len(_READ_CACHE) > _READ_CACHE_MAX_ENTRIES:
+                _READ_CACHE.popitem(last=False)
+    # Callers may mutate what they get back; the cached rows stay pristine
+    return [dict(row) for row in rows]
+
+
+def clear_read_cache():
+    with _VERSION_LOCK:
+        _READ_CACHE.clear()
+
+# ---------- Shelf life ----------
+
+# Learned model (shelf_life_model.ShelfLifeModel), installed by
+# shelf_life_model.get_shelf_life_model(); None -> static SHELF_LIFE_DAYS.
+_SHELF_LIFE_MODEL = None
+
+
+def set_shelf_life_model(model):
+    global _SHELF_LIFE_MODEL
+    _SHELF_LIFE_MODEL = model
+
+
+def lookup_shelf_life(name: str, storage: str = "fridge") -> int:
+    """Shelf life in days for a new item (O(1) dict lookup either way)."""
+    if _SHELF_LIFE_MODEL is not None:
+        return _SHELF_LIFE_MODEL.shelf_life_days(name, storage)
+    return SHELF_LIFE_DAYS.get(name) or SHELF_LIFE_DAYS.get(defaults_food(name), 7)
+
+# ---------- Users / fridges ----------
+
+# user_id -> first fridge_id; ownership never moves, so this never goes stale
+_USER_FRIDGE: Dict[int, int] = {}
+# fridge ids seen in the fridges table; fridges are never deleted
+_KNOWN_FRIDGES = set()
+
+
+def create_user(name: str) -> int:
+    """Create a user and return its id."""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("INSERT INTO users (name) VALUES (%s);", (name.strip(),))
+            conn.commit()
+            return cur.lastrowid
+    finally:
+        conn.close()
+
+
+def create_fridge(user_id: int, name: str = "fridge") -> int:
+    """Create a fridge owned by user_id and return its id."""
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("INSERT INTO fridges (user_id, name) VALUES (%s, %s);", (user_id, name.strip()))
+            conn.commit()
+            return cur.lastrowid
+    finally:
+        conn.close()
+
+
+def get_fridges_for_user(user_id: int) -> List[Dict]:
+    """[{"fridge_id", "name"}, ...] for one user, oldest first."""
+    conn = get_connection()
+    try:
+        with conn.cursor(dictionary=True) as cur:
+            cur.execute("""
+                SELECT fridge_id, name FROM fridges
+                WHERE user_id = %s ORDER BY fridge_id;
+            """, (user_id,))
+            return cur.fetchall()
+    finally:
+        conn.close()
+
+
+def fridge_exists(fridge_id: int) -> bool:
+    """True if fridge_id is a row in fridges (positive answers are cached)."""
+    if fridge_id in _KNOWN_FRIDGES:
+        return True
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1 FROM fridges WHERE fridge_id = %s;", (fridge_id,))
+            found = cur.fetchone() is not None
+    finally:
+        conn.close()
+    if found:
+        _KNOWN_FRIDGES.add(fridge_id)
+    return found
+
+
+def resolve_fridge_id(user_id: int | None = None, fridge_id: int | None = None) -> int:
+    """
+    Pick the fridge for a request: an explicit fridge_id wins, then the
+    user's first fridge, then DEFAULT_FRIDGE_ID.
+    """
+    if fridge_id is not None:
+        return fridge_id
+    if user_id is None:
+        return DEFAULT_FRIDGE_ID
+    if user_id not in _USER_FRIDGE:
+        fridges = get_fridges_for_user(user_id)
+        if not fridges:
+            raise ValueError(f"User {user_id} has no fridge.")
+        _USER_FRIDGE[user_id] = fridges[0]["fridge_id"]
+    return _USER_FRIDGE[user_id]
 
 # ---------- Food type helpers ----------
 
 def get_food_type_id_by_name(name: str):
     """Return food_type_id for a given name, or None if not found."""
-    name = normalize_str(name)
+    name = normalize_food_name(name)
+    ftid = food_catalog.food_type_id(name)
+    if ftid is not None:
+        return ftid
+
     conn = get_connection()
     try:
         with conn.cursor() as cur:
             cur.execute("SELECT food_type_id FROM food_types WHERE name=%s;", (name,))
             row = cur.fetchone()
-            return row[0] if row else None
     finally:
         conn.close()
 
+    if row is None:
+        return None
+    food_catalog.remember_food_type_id(name, row[0])
+    return row[0]
+
 def create_food_type(name: str, category: str = None, average_shelf_life_days: int = None,
                      calories_per_100g: float = None, notes: str = None) -> int:
     """Create a new food type and return its id."""
-    name = normalize_str(name)
+    name = normalize_food_name(name)
     conn = get_connection()
     try:
         with conn.cursor() as cur:
@@ -45,18 +329,27 @@ def create_food_type(name: str, category: str = None, average_shelf_life_days: i
                 VALUES (%s, %s, %s, %s, %s);
             """, (name, category, average_shelf_life_days, calories_per_100g, notes))
             conn.commit()
-            return cur.lastrowid
+            ftid = cur.lastrowid
     finally:
         conn.close()
 
+    food_catalog.remember_food_type_id(name, ftid)
+    return ftid
+
 def get_or_create_food_type_id(name: str, category: str = None, average_shelf_life_days: int = None) -> int:
-    """Fetch id for a food type by name, or create it if missing."""
-    name = normalize_str(name)
+    """
+    Fetch id for a food type by name, or create it if missing.
+
+    Catalog foods are synced to food_types at startup (ensure_schema), so
+    for them this is a dict hit with no DB round trip.
+    """
+    name = normalize_food_name(name)
     ftid = get_food_type_id_by_name(name)
 
-    # --- If category not manually provided, try dictionary ---
+    # --- If category not manually provided, try the catalog ---
     if category is None:
-        category = FOOD_CATEGORIES.get(name, "other")
+        record = food_catalog.get(name) or food_catalog.get(defaults_food(name))
+        category = record.category if record else "other"
 
     if ftid is not None:
         return ftid
@@ -64,35 +357,87 @@ def get_or_create_food_type_id(name: str, category: str = None, average_shelf_li
 
 # ---------- Item operations ----------
 
+# The last parameter is food_type_id again: a frozen item banks its food's
+# full shelf life in frozen_remaining_days for when it is moved to the fridge.
+_INSERT_ITEM_SQL = """
+    INSERT INTO food_items
+        (fridge_id, food_type_id, quantity, unit, date_added, expiration_date,
+         detection_label, confidence_score, image_path, location_slot,
+         added_by, storage, frozen_remaining_days)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
+            IF(storage = 'freezer',
+               (SELECT average_shelf_life_days FROM food_types WHERE food_type_id = %s), NULL));
+"""
+
+
 def add_item(food_type_id: int, quantity: float = 1, unit: str = 'pcs',
              added_by: str = 'user', detection_label: str = None,
              confidence: float = None, date_added: date = None,
              expiration_date=None, location_slot: str = None,
-             image_path: str = None, storage: str = 'fridge') -> int:      # ← NEW param
+             image_path: str = None, storage: str = 'fridge',
+             fridge_id: int = None) -> int:
     if date_added is None:
         date_added = date.today()
+    if fridge_id is None:
+        fridge_id = DEFAULT_FRIDGE_ID
     conn = get_connection()
     try:
         with conn.cursor() as cur:
-            cur.execute("""
-                INSERT INTO food_items
-                    (food_type_id, quantity, unit, date_added, expiration_date,
-                     detection_label, confidence_score, image_path, location_slot,
-                     added_by, storage)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s);
-            """, (food_type_id, quantity, unit, date_added, expiration_date,
+            cur.execute(_INSERT_ITEM_SQL, (fridge_id, food_type_id, quantity, unit, date_added, expiration_date,
                   detection_label, confidence, image_path, location_slot,
-                  added_by, storage))
+                  added_by, storage, food_type_id))
             conn.commit()
-            return cur.lastrowid
+            item_id = cur.lastrowid
+    finally:
+        conn.close()
+
+    _notify_mutation("add", fridge_id=fridge_id, item_id=item_id, food_type_id=food_type_id,
+                     food_name=detection_label,
+                     quantity=quantity, unit=unit, storage=storage,
+                     date_added=date_added, expiration_date=expiration_date)
+    return item_id
+
+def add_items(items: List[Dict], fridge_id: int = None) -> List[int]:
+    """
+    Insert several items in one transaction (all or nothing). Each dict
+    takes add_item's keyword arguments (food_type_id is required). Returns
+    the new item_ids in input order.
+    """
+    if fridge_id is None:
+        fridge_id = DEFAULT_FRIDGE_ID
+    today = date.today()
+    rows = [dict({"quantity": 1, "unit": "pcs", "added_by": "user", "storage": "fridge",
+                  "date_added": today}, **item) for item in items]
+
+    item_ids = []
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            for row in rows:
+                cur.execute(_INSERT_ITEM_SQL, (fridge_id, row["food_type_id"], row["quantity"], row["unit"],
+                      row["date_added"], row.get("expiration_date"), row.get("detection_label"),
+                      row.get("confidence"), row.get("image_path"), row.get("location_slot"),
+                      row["added_by"], row["storage"], row["food_type_id"]))
+                item_ids.append(cur.lastrowid)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
     finally:
         conn.close()
 
+    for item_id, row in zip(item_ids, rows):
+        _notify_mutation("add", fridge_id=fridge_id, item_id=item_id,
+                         food_type_id=row["food_type_id"], food_name=row.get("detection_label"),
+                         quantity=row["quantity"], unit=row["unit"], storage=row["storage"],
+                         date_added=row["date_added"], expiration_date=row.get("expiration_date"))
+    return item_ids
+
 def add_item_by_name(name: str, quantity: float = 1, unit: str = 'pcs',
                      added_by: str = 'user', detection_label: str = None,
                      confidence: float = None, category: str = None,
                      average_shelf_life_days: int = None, storage: str = 'fridge', **kwargs) -> int:  # ← NEW
-    name = normalize_str(name)
+    name = normalize_food_name(name)
     storage = normalize_str(storage)
     unit = normalize_str(unit)
     ftid = get_or_create_food_type_id(name, category=category,
@@ -101,110 +446,261 @@ def add_item_by_name(name: str, quantity: float = 1, unit: str = 'pcs',
                     detection_label=detection_label or name, confidence=confidence,
                     storage=storage, **kwargs)
 
-def get_all_items():
-    """Return all items with computed status (via view) as dicts."""
+def get_all_items(fridge_id: int = None):
+    """Return all items of one fridge with computed status (via view) as dicts."""
+    if fridge_id is None:
+        fridge_id = DEFAULT_FRIDGE_ID
+    if fridge_id in _STORES:
+        return _STORES[fridge_id].get_all_items()
+    return _read_through(("get_all_items",), fridge_id, lambda: _load_all_items(fridge_id))
+
+
+def _load_all_items(fridge_id: int):
     conn = get_connection()
     try:
         with conn.cursor(dictionary=True) as cur:
-            cur.execute("SELECT * FROM item_status_view ORDER BY expiration_date IS NULL, expiration_date;")
+            cur.execute("""
+                SELECT * FROM item_status_view
+                WHERE fridge_id = %s
+                ORDER BY expiration_date IS NULL, expiration_date;
+            """, (fridge_id,))
             return cur.fetchall()
     finally:
         conn.close()
 
 
-def get_expiring_items(days: int = 2):
+def get_expiring_items(days: int = 2, fridge_id: int = None):
     """Return items expiring within next 'days' days (fridge only)."""
+    if fridge_id is None:
+        fridge_id = DEFAULT_FRIDGE_ID
+    if fridge_id in _STORES:
+        return _STORES[fridge_id].get_expiring_items(days)
+    return _read_through(("get_expiring_items", days), fridge_id,
+                         lambda: _load_expiring_items(days, fridge_id))
+
+
+def _load_expiring_items(days: int, fridge_id: int):
     conn = get_connection()
     try:
         with conn.cursor(dictionary=True) as cur:
             cur.execute("""
                 SELECT *
                 FROM item_status_view
-                WHERE storage = 'fridge'
+                WHERE fridge_id = %s
+                  AND storage = 'fridge'
                   AND expiration_date IS NOT NULL
                   AND DATEDIFF(expiration_date, CURDATE()) BETWEEN 0 AND %s
                 ORDER BY expiration_date;
-            """, (days,))
+            """, (fridge_id, days))
             return cur.fetchall()
     finally:
         conn.close()
 
-def get_expired_items():
+def get_expired_items(fridge_id: int = None):
     """Return expired items (fridge only)."""
+    if fridge_id is None:
+        fridge_id = DEFAULT_FRIDGE_ID
+    if fridge_id in _STORES:
+        return _STORES[fridge_id].get_expired_items()
+    return _read_through(("get_expired_items",), fridge_id, lambda: _load_expired_items(fridge_id))
+
+
+def _load_expired_items(fridge_id: int):
     conn = get_connection()
     try:
         with conn.cursor(dictionary=True) as cur:
             cur.execute("""
                 SELECT *
                 FROM item_status_view
-                WHERE storage = 'fridge'
+                WHERE fridge_id = %s
+                  AND storage = 'fridge'
                   AND expiration_date IS NOT NULL
                   AND DATEDIFF(expiration_date, CURDATE()) < 0 
                 ORDER BY expiration_date;
-            """)
+            """, (fridge_id,))
             return cur.fetchall()
     finally:
         conn.close()
 
 
-def delete_item(item_id: int) -> int:
-    """Delete an item by id. Returns number of rows affected."""
+def delete_item(item_id: int, fridge_id: int = None, spoiled: bool = False) -> int:
+    """
+    Delete an item by id (within one fridge). Returns number of rows affected.
+
+    spoiled=True means it was thrown away because it went off; the event log
+    records that as a "discard", the only event the shelf-life model counts
+    as the food's actual end of life.
+    """
+    if fridge_id is None:
+        fridge_id = DEFAULT_FRIDGE_ID
+    if fridge_id in _STORES:
+        return _STORES[fridge_id].delete_item(item_id, spoiled)
     conn = get_connection()
     try:
-        with conn.cursor() as cur:
-            cur.execute("DELETE FROM food_items WHERE item_id=%s;", (item_id,))
+        with conn.cursor(dictionary=True) as cur:
+            # Snapshot the row (same connection) so listeners know what was removed
+            cur.execute("""
+                SELECT food_name, quantity, unit, storage
+                FROM item_status_view WHERE item_id=%s AND fridge_id=%s;
+            """, (item_id, fridge_id))
+            row = cur.fetchone()
+            cur.execute("DELETE FROM food_items WHERE item_id=%s AND fridge_id=%s;", (item_id, fridge_id))
             conn.commit()
-            return cur.rowcount
+            deleted = cur.rowcount
     finally:
         conn.close()
 
-def clear_database():
-    """Deletes all rows from food_items and food_types."""
+    if deleted and row:
+        _notify_mutation("delete", fridge_id=fridge_id, item_id=item_id, food_name=row["food_name"],
+                         quantity=row["quantity"], unit=row["unit"],
+                         storage=row["storage"], spoiled=spoiled)
+    return deleted
+
+STORAGES = ("fridge", "freezer")
+
+# Food's default shelf life, for rows that have no date to go by
+_TYPE_SHELF_LIFE_SQL = ("(SELECT t.average_shelf_life_days FROM food_types t "
+                        "WHERE t.food_type_id = food_items.food_type_id)")
+
+# Moving pauses or resumes the expiry clock in the same statement. A
+# single-table UPDATE assigns left to right, so each expression reads the
+# columns it needs before they are overwritten.
+_MOVE_SET_SQL = {
+    "freezer": f"""
+        frozen_remaining_days = GREATEST(
+            COALESCE(DATEDIFF(expiration_date, CURDATE()), {_TYPE_SHELF_LIFE_SQL}, 0), 0),
+        expiration_date = NULL,
+        storage = 'freezer'
+    """,
+    "fridge": f"""
+        expiration_date = DATE_ADD(CURDATE(), INTERVAL
+            COALESCE(frozen_remaining_days, {_TYPE_SHELF_LIFE_SQL}, 0) DAY),
+        frozen_remaining_days = NULL,
+        storage = 'fridge'
+    """,
+}
+
+
+def _move_sql(to_storage: str, count: int) -> str:
+    placeholders = ", ".join(["%s"] * count)
+    return (f"UPDATE food_items SET {_MOVE_SET_SQL[to_storage]} "
+            f"WHERE fridge_id = %s AND storage <> '{to_storage}' AND item_id IN ({placeholders});")
+
+
+def move_items(item_ids: List[int], to_storage: str, fridge_id: int | None = None) -> int:
+    """
+    Move items between fridge and freezer in one UPDATE, keeping each row
+    (and its date_added).
+
+    Freezing banks the shelf life left (days until expiration_date, or the
+    food's shelf life if it had none) in frozen_remaining_days and clears
+    expiration_date, so the clock is paused while frozen. Moving back to the
+    fridge sets expiration_date to today + the banked days. Items already in
+    to_storage or in another fridge are skipped. Returns the number moved.
+    """
+    to_storage = normalize_str(to_storage)
+    if to_storage not in STORAGES:
+        raise ValueError(f"Unknown storage {to_storage!r} (use one of {STORAGES}).")
+    if fridge_id is None:
+        fridge_id = DEFAULT_FRIDGE_ID
+    item_ids = list(dict.fromkeys(int(i) for i in item_ids))
+    if not item_ids:
+        return 0
+    if fridge_id in _STORES:
+        # Queued write-behind deletes must land before their rows are re-read
+        _STORES[fridge_id].flush()
+
     conn = get_connection()
     try:
         with conn.cursor() as cur:
-            cur.execute("SET FOREIGN_KEY_CHECKS = 0;")
-            cur.execute("TRUNCATE TABLE food_items;")
-            cur.execute("TRUNCATE TABLE food_types;")
-            cur.execute("SET FOREIGN_KEY_CHECKS = 1;")
+            cur.execute(_move_sql(to_storage, len(item_ids)), (fridge_id, *item_ids))
+            moved = cur.rowcount
         conn.commit()
-        print("🧹 Database cleared.")
+    except Exception:
+        conn.rollback()
+        raise
     finally:
         conn.close()
 
-def get_freezer_items():
+    if moved:
+        _notify_mutation("move", fridge_id=fridge_id, item_ids=item_ids, storage=to_storage)
+    _LOG.info("Moved %d item(s) to the %s", moved, to_storage,
+              extra=fields(op="move_items", fridge_id=fridge_id, moved=moved, storage=to_storage))
+    return moved
+
+def clear_database(fridge_id: int = None):
+    """
+    Deletes every item of one fridge (default: DEFAULT_FRIDGE_ID). Other
+    fridges and the food types are kept; wipe_database() empties everything.
+    """
+    if fridge_id is None:
+        fridge_id = DEFAULT_FRIDGE_ID
+    with log_op(_LOG, "clear_database", fridge_id=fridge_id) as op:
+        conn = get_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("DELETE FROM food_items WHERE fridge_id = %s;", (fridge_id,))
+                deleted = cur.rowcount
+            conn.commit()
+            op.done(f"Fridge {fridge_id} cleared", deleted=deleted)
+        finally:
+            conn.close()
+
+    _notify_mutation("clear", fridge_id=fridge_id)
+
+
+def wipe_database():
+    """
+    Deletes all rows from food_items and food_types, for every fridge.
+    Only for resetting a development / demo database.
+    """
+    with log_op(_LOG, "wipe_database") as op:
+        conn = get_connection()
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SET FOREIGN_KEY_CHECKS = 0;")
+                # DELETE, not TRUNCATE: item ids must never be reused, the
+                # event log and shelf-life model key history by item_id
+                cur.execute("DELETE FROM food_items;")
+                cur.execute("TRUNCATE TABLE food_types;")
+                cur.execute("SET FOREIGN_KEY_CHECKS = 1;")
+            conn.commit()
+            # Re-seed catalog foods so cached food_type_ids stay valid
+            food_catalog.sync_food_types(conn)
+            op.done("Database wiped")
+        finally:
+            conn.close()
+
+    _notify_mutation("clear", fridge_id=None)
+
+def get_freezer_items(fridge_id: int = None):
+    if fridge_id is None:
+        fridge_id = DEFAULT_FRIDGE_ID
+    if fridge_id in _STORES:
+        return _STORES[fridge_id].get_freezer_items()
+    return _read_through(("get_freezer_items",), fridge_id, lambda: _load_freezer_items(fridge_id))
+
+
+def _load_freezer_items(fridge_id: int):
     conn = get_connection()
     try:
         with conn.cursor(dictionary=True) as cur:
-            cur.execute("SELECT * FROM item_status_view WHERE storage='freezer' ORDER BY food_name;")
+            cur.execute("""
+                SELECT * FROM item_status_view
+                WHERE fridge_id = %s AND storage='freezer' ORDER BY food_name;
+            """, (fridge_id,))
             return cur.fetchall()
     finally:
         conn.close()
 
-def add_item_simple(
-    name: str,
-    quantity: float = 1,
-    unit: str = "pcs",
-    expiration_date: str | date | None = None,
-    storage: str = "fridge",
-    location_slot: str | None = None,
-) -> int:
+def _food_type_and_expiry(name: str, storage: str, expiration_date: str | date | None):
     """
-    Add a food item by name only.
-    Auto-calculates expiration date if omitted (uses shelf-life dictionary).
+    Food type id (created with its learned/default shelf life if new) and
+    the expiration date for a new item of a normalized name: the given date,
+    else today + shelf life in the fridge; always None in the freezer.
     """
-    name = normalize_str(name)
-    storage = normalize_str(storage)
-    unit = normalize_str(unit)
-
-
-
-
-    from datetime import date
-    from smart_fridge_db import get_or_create_food_type_id, add_item
-
-    # Look up or create the food type and its default shelf life
-    shelf_life = SHELF_LIFE_DAYS.get(name, 7)
+    # Look up or create the food type and its (learned or default) shelf life
+    shelf_life = lookup_shelf_life(name, storage)
     food_type_id = get_or_create_food_type_id(
         name,
         average_shelf_life_days=shelf_life
@@ -222,23 +718,47 @@ def add_item_simple(
 
     if storage == "freezer":
         expiration_date = None
+    return food_type_id, expiration_date
 
-    # Insert into DB
-    item_id = add_item(
-        food_type_id=food_type_id,
-        quantity=quantity,
-        unit=unit,
-        expiration_date=expiration_date,
-        detection_label=name,
-        added_by="user",
-        storage=storage,
-        location_slot=location_slot
-    )
 
-    print(
-        f"✅ Added {quantity} {unit} of {name} ({storage})"
-        f"{' expiring on ' + str(expiration_date) if expiration_date else ''}"
-    )
+def add_item_simple(
+    name: str,
+    quantity: float = 1,
+    unit: str = "pcs",
+    expiration_date: str | date | None = None,
+    storage: str = "fridge",
+    location_slot: str | None = None,
+    fridge_id: int | None = None,
+) -> int:
+    """
+    Add a food item by name only.
+    Auto-calculates expiration date if omitted (uses shelf-life dictionary).
+    """
+    name = normalize_food_name(name)
+    storage = normalize_str(storage)
+    unit = normalize_str(unit)
+
+    with log_op(_LOG, "add_item_simple", name=name, storage=storage) as op:
+        food_type_id, expiration_date = _food_type_and_expiry(name, storage, expiration_date)
+
+        # Insert into DB
+        item_id = add_item(
+            food_type_id=food_type_id,
+            quantity=quantity,
+            unit=unit,
+            expiration_date=expiration_date,
+            detection_label=name,
+            added_by="user",
+            storage=storage,
+            location_slot=location_slot,
+            fridge_id=fridge_id,
+        )
+
+        op.done(
+            f"Added {quantity} {unit} of {name} ({storage})"
+            f"{' expiring on ' + str(expiration_date) if expiration_date else ''}",
+            item_id=item_id, quantity=quantity, unit=unit, expiration_date=expiration_date,
+        )
 
     return item_id
 
@@ -251,12 +771,15 @@ def add_item_by_image(
     expiration_date: str | date | None = None,
     storage: str = "fridge",                 # 'fridge' | 'freezer'
     location_slot: str | None = None,
+    fridge_id: int | None = None,
 ) -> int:
     """
     Add an item using only an image (plus basic quantity/unit/storage).
 
     Steps:
-      1. Runs classify_food(image_path) -> (name, confidence)
+      0. Copies the image into the content-addressed image_store (dedup by
+         SHA-256, thumbnail + 256x256 tensor made once per distinct image)
+      1. Runs classify_food on the stored tensor -> (name, confidence)
       2. Uses that name to look up/create a food_type with a default shelf life.
       3. If no expiration_date is given:
            - fridge  -> today + shelf_life
@@ -264,63 +787,128 @@ def add_item_by_image(
       4. Inserts the row via add_item, storing:
            - detection_label = predicted name
            - confidence      = model confidence
-           - image_path      = given image_path
+           - image_path      = stored original (stable, content-addressed)
            - added_by        = "camera"
     """
 
 
     # Import here to avoid circular imports
     from food_classifier import classify_food
+    import image_store
+
+    with log_op(_LOG, "add_item_by_image", image_path=image_path) as op:
+        # 0) Store once; classification reads the predecoded tensor
+        stored = image_store.ingest(image_path)
+
+        # 1) Classify the image
+        predicted_name, predicted_conf = classify_food(stored.tensor)
+        record = food_catalog.by_classifier_label(predicted_name)
+        label = record.name if record else (normalize_food_name(predicted_name) or "unknown")
+        storage = normalize_str(storage)
+        unit = normalize_str(unit)
+
+        # 2) Shelf life and food type
+        shelf_life = lookup_shelf_life(label, storage)
+        ftid = get_or_create_food_type_id(
+            label,
+            average_shelf_life_days=shelf_life
+        )
 
-    # 1) Classify the image
-    predicted_name, predicted_conf = classify_food(image_path)
-    label = normalize_str(predicted_name) or "unknown"
-    storage = normalize_str(storage)
-    unit = normalize_str(unit)
-
-    # 2) Shelf life and food type
-    shelf_life = SHELF_LIFE_DAYS.get(label, 7)
-    ftid = get_or_create_food_type_id(
-        label,
-        average_shelf_life_days=shelf_life
-    )
+        # 3) Normalize expiration_date
+        if expiration_date is None:
+            if storage == "freezer":
+                exp_dt = None
+            else:
+                exp_dt = date.today() + timedelta(days=shelf_life)
+        else:
+            exp_dt = date.fromisoformat(expiration_date) if isinstance(expiration_date, str) else expiration_date
 
-    # 3) Normalize expiration_date
-    if expiration_date is None:
         if storage == "freezer":
             exp_dt = None
-        else:
-            exp_dt = date.today() + timedelta(days=shelf_life)
-    else:
-        exp_dt = date.fromisoformat(expiration_date) if isinstance(expiration_date, str) else expiration_date
 
-    if storage == "freezer":
-        exp_dt = None
-
-    # 4) Insert into DB
-    item_id = add_item(
-    food_type_id=ftid,
-    quantity=quantity,
-    unit=unit,
-    expiration_date=exp_dt,
-    detection_label=label,
-    confidence=predicted_conf,
-    image_path=image_path,
-    location_slot=location_slot,
-    added_by="camera",
-    storage=storage,
-)
-
-    # ---- CLEAN PRINT (assumes classifier always works) ----
-    if exp_dt:
-        print(f"✅ Added {quantity} {unit} of {label} ({storage}) expiring on {exp_dt}")
-    else:
-        print(f"✅ Added {quantity} {unit} of {label} ({storage})")
+        # 4) Insert into DB
+        item_id = add_item(
+            food_type_id=ftid,
+            quantity=quantity,
+            unit=unit,
+            expiration_date=exp_dt,
+            detection_label=label,
+            confidence=predicted_conf,
+            image_path=stored.original,
+            location_slot=location_slot,
+            added_by="camera",
+            storage=storage,
+            fridge_id=fridge_id,
+        )
+
+        op.done(
+            f"Added {quantity} {unit} of {label} ({storage})"
+            f"{' expiring on ' + str(exp_dt) if exp_dt else ''}",
+            item_id=item_id, name=label, confidence=predicted_conf, quantity=quantity,
+            unit=unit, storage=storage, expiration_date=exp_dt,
+        )
 
     return item_id
 
 
-def consume(name: str, qty_used: float, item_id: int | None = None) -> str:
+def add_items_by_photo(
+    image_path: str,
+    quantity: float = 1,
+    unit: str = "pcs",
+    storage: str = "fridge",
+    min_confidence: float = 60.0,
+    fridge_id: int | None = None,
+) -> List[int]:
+    """
+    Add every food found in one photo (e.g. a whole shelf).
+
+    Runs food_classifier.detect_foods on the stored original (one batched
+    forward pass over all crops), then inserts one row per detection in a
+    single transaction, each with location_slot taken from where it was
+    found ("top-left", "middle-center", ...). Returns the new item_ids
+    (empty if nothing was recognized confidently enough).
+    """
+    from food_classifier import detect_foods
+    import image_store
+
+    stored = image_store.ingest(image_path)
+    detections = detect_foods(stored.original, min_confidence=min_confidence)
+    storage = normalize_str(storage)
+    unit = normalize_str(unit)
+
+    rows = []
+    for det in detections:
+        record = food_catalog.by_classifier_label(det["label"])
+        label = record.name if record else (normalize_food_name(det["label"]) or "unknown")
+        shelf_life = lookup_shelf_life(label, storage)
+        rows.append({
+            "food_type_id": get_or_create_food_type_id(label, average_shelf_life_days=shelf_life),
+            "quantity": quantity,
+            "unit": unit,
+            "expiration_date": None if storage == "freezer" else date.today() + timedelta(days=shelf_life),
+            "detection_label": label,
+            "confidence": det["confidence"],
+            "image_path": stored.original,
+            "location_slot": det["location_slot"],
+            "added_by": "camera",
+            "storage": storage,
+        })
+
+    if not rows:
+        _LOG.warning("No food recognized in the photo",
+                     extra=fields(op="add_items_by_photo", image_path=image_path))
+        return []
+
+    with log_op(_LOG, "add_items_by_photo", image_path=image_path) as op:
+        item_ids = add_items(rows, fridge_id=fridge_id)
+        op.done(f"Added {len(item_ids)} items from photo: "
+                + ", ".join(f"{r['detection_label']} ({r['location_slot']})" for r in rows),
+                item_ids=item_ids)
+    return item_ids
+
+
+def consume(name: str, qty_used: float, item_id: int | None = None,
+            fridge_id: int | None = None) -> str:
     """
     Consume (use/eat) a quantity of a food item.
 
@@ -331,6 +919,7 @@ def consume(name: str, qty_used: float, item_id: int | None = None) -> str:
                               If None:
                                 - if there is exactly ONE item with this name → we use it
                                 - if there are MULTIPLE items → we raise an error asking for item_id
+        fridge_id (int | None): Fridge to consume from (default: DEFAULT_FRIDGE_ID).
 
     Returns:
         str: "deleted"  if the item was fully consumed and removed from DB
@@ -340,115 +929,376 @@ def consume(name: str, qty_used: float, item_id: int | None = None) -> str:
         ValueError: if qty_used is invalid, item not found, or more was requested than available.
     """
 
-    name = normalize_str(name)
-
-    # --- Basic validation on qty_used ---
-    if qty_used <= 0:
-        raise ValueError("Consumed quantity must be positive.")
-
-    # ------------------------------------------------------------------
-    # 1) FIRST PHASE: READ-ONLY SELECT (using first DB connection)
-    # ------------------------------------------------------------------
-    # We open a connection only to read from item_status_view and then
-    # CLOSE IT COMPLETELY before doing any write queries.
-    # This avoids "Commands out of sync" errors from MySQL.
-    # ------------------------------------------------------------------
-    conn = get_connection()
-    try:
-        # dictionary=True → rows are dicts: row["item_id"], row["quantity"], etc.
-        with conn.cursor(dictionary=True) as cur:
-            # Get all rows for this food name, ordered by soonest expiration first.
-            cur.execute("""
-                SELECT item_id, quantity, unit, expiration_date
-                FROM item_status_view
-                WHERE food_name = %s
-                ORDER BY expiration_date ASC;
-            """, (name,))
-            items = cur.fetchall()
-    finally:
-        # Close the first connection entirely after reading.
-        conn.close()
-
-    # If there are no items at all with this name, we can't consume anything.
-    if not items:
-        raise ValueError(f"'{name}' is not in your fridge.")
-
-    # ------------------------------------------------------------------
-    # 2) DECIDE WHICH ROW TO CONSUME FROM
-    # ------------------------------------------------------------------
-
-    # If item_id is NOT provided:
-    if item_id is None:
-        # If there is exactly one matching item, it's safe to auto-pick it.
-        if len(items) == 1:
-            item = items[0]
+    name = normalize_food_name(name)
+    if fridge_id is None:
+        fridge_id = DEFAULT_FRIDGE_ID
+    if fridge_id in _STORES:
+        return _STORES[fridge_id].consume(name, qty_used, item_id)
+
+    with log_op(_LOG, "consume", name=name, quantity=qty_used, fridge_id=fridge_id) as op:
+        # --- Basic validation on qty_used ---
+        if qty_used <= 0:
+            raise ValueError("Consumed quantity must be positive.")
+
+        # ------------------------------------------------------------------
+        # 1) FIRST PHASE: READ-ONLY SELECT (using first DB connection)
+        # ------------------------------------------------------------------
+        # We open a connection only to read from item_status_view and then
+        # CLOSE IT COMPLETELY before doing any write queries.
+        # This avoids "Commands out of sync" errors from MySQL.
+        # ------------------------------------------------------------------
+        conn = get_connection()
+        try:
+            # dictionary=True → rows are dicts: row["item_id"], row["quantity"], etc.
+            with conn.cursor(dictionary=True) as cur:
+                # Get all rows for this food name, ordered by soonest expiration first.
+                cur.execute("""
+                    SELECT item_id, quantity, unit, expiration_date, storage
+                    FROM item_status_view
+                    WHERE fridge_id = %s AND food_name = %s
+                    ORDER BY expiration_date ASC;
+                """, (fridge_id, name))
+                items = cur.fetchall()
+        finally:
+            # Close the first connection entirely after reading.
+            conn.close()
+
+        # If there are no items at all with this name, we can't consume anything.
+        if not items:
+            raise ValueError(f"'{name}' is not in your fridge.")
+
+        # ------------------------------------------------------------------
+        # 2) DECIDE WHICH ROW TO CONSUME FROM
+        # ------------------------------------------------------------------
+
+        # If item_id is NOT provided:
+        if item_id is None:
+            # If there is exactly one matching item, it's safe to auto-pick it.
+            if len(items) == 1:
+                item = items[0]
+            else:
+                # Ambiguous: multiple items with same name.
+                # We force the caller to specify item_id to avoid consuming wrong row.
+                raise ValueError(
+                    f"Multiple '{name}' items exist. Specify item_id. "
+                    f"IDs available: " + ", ".join(str(i['item_id']) for i in items)
+                )
         else:
-            # Ambiguous: multiple items with same name.
-            # We force the caller to specify item_id to avoid consuming wrong row.
+            # If item_id IS provided, we search among the fetched rows for that exact id.
+            matching = [i for i in items if i["item_id"] == item_id]
+            if not matching:
+                # No row with that id + name combination.
+                raise ValueError(f"No '{name}' found with item_id={item_id}.")
+            item = matching[0]
+
+        # Extract current quantity and its unit from the chosen row.
+        current_qty = float(item["quantity"])
+        unit = item["unit"]
+        item_id = item["item_id"]  # ensure we use the exact id from DB
+
+        # ------------------------------------------------------------------
+        # 3) VALIDATE THAT WE ARE NOT EATING MORE THAN WE HAVE
+        # ------------------------------------------------------------------
+        if qty_used > current_qty:
             raise ValueError(
-                f"Multiple '{name}' items exist. Specify item_id. "
-                f"IDs available: " + ", ".join(str(i['item_id']) for i in items)
+                f"Cannot consume {qty_used}{unit}; only {current_qty}{unit} available."
             )
-    else:
-        # If item_id IS provided, we search among the fetched rows for that exact id.
-        matching = [i for i in items if i["item_id"] == item_id]
-        if not matching:
-            # No row with that id + name combination.
-            raise ValueError(f"No '{name}' found with item_id={item_id}.")
-        item = matching[0]
-
-    # Extract current quantity and its unit from the chosen row.
-    current_qty = float(item["quantity"])
-    unit = item["unit"]
-    item_id = item["item_id"]  # ensure we use the exact id from DB
-
-    # ------------------------------------------------------------------
-    # 3) VALIDATE THAT WE ARE NOT EATING MORE THAN WE HAVE
-    # ------------------------------------------------------------------
-    if qty_used > current_qty:
-        raise ValueError(
-            f"Cannot consume {qty_used}{unit}; only {current_qty}{unit} available."
-        )
-
-    # ------------------------------------------------------------------
-    # 4) SECOND PHASE: WRITE OPERATION (new DB connection)
-    # ------------------------------------------------------------------
-    # We open a NEW connection for the DELETE/UPDATE.
-    # This separation (read-connection vs write-connection) avoids the
-    # "Commands out of sync" problems MySQL sometimes has when you do
-    # SELECT then DELETE/UPDATE on the same connection/cursor.
-    # ------------------------------------------------------------------
-    conn2 = get_connection()
-    try:
-        with conn2.cursor() as cur2:
-
-            # ---- Case A: we consumed exactly the entire quantity ----
-            if qty_used == current_qty:
-                # Delete the row completely from food_items.
-                cur2.execute("DELETE FROM food_items WHERE item_id = %s", (item_id,))
-                conn2.commit()
-                print(f"🗑️ Fully consumed and removed {name} (ID {item_id})")
-                return "deleted"
-
-            # ---- Case B: partial consumption, we just reduce the quantity ----
-            new_qty = current_qty - qty_used
-            cur2.execute("""
-                UPDATE food_items
-                SET quantity = %s
-                WHERE item_id = %s
-            """, (new_qty, item_id))
-            conn2.commit()
-
-            print(f"🍽️ Consumed {qty_used}{unit} of {name}. Remaining: {new_qty}{unit}.")
-            return "updated"
-
-    finally:
-        # Always close the second connection, even if an exception occurs.
-        conn2.close()
 
+        # ------------------------------------------------------------------
+        # 4) SECOND PHASE: WRITE OPERATION (new DB connection)
+        # ------------------------------------------------------------------
+        # We open a NEW connection for the DELETE/UPDATE.
+        # This separation (read-connection vs write-connection) avoids the
+        # "Commands out of sync" problems MySQL sometimes has when you do
+        # SELECT then DELETE/UPDATE on the same connection/cursor.
+        # ------------------------------------------------------------------
+        conn2 = get_connection()
+        try:
+            with conn2.cursor() as cur2:
+
+                # ---- Case A: we consumed exactly the entire quantity ----
+                if qty_used == current_qty:
+                    # Delete the row completely from food_items.
+                    cur2.execute("DELETE FROM food_items WHERE item_id = %s", (item_id,))
+                    conn2.commit()
+                    op.done(f"Fully consumed and removed {name} (ID {item_id})",
+                            item_id=item_id, unit=unit, remaining=0.0)
+                    new_qty = 0.0
+                    result = "deleted"
+
+                # ---- Case B: partial consumption, we just reduce the quantity ----
+                else:
+                    new_qty = current_qty - qty_used
+                    cur2.execute("""
+                        UPDATE food_items
+                        SET quantity = %s
+                        WHERE item_id = %s
+                    """, (new_qty, item_id))
+                    conn2.commit()
+
+                    op.done(f"Consumed {qty_used}{unit} of {name}. Remaining: {new_qty}{unit}.",
+                            item_id=item_id, unit=unit, remaining=new_qty)
+                    result = "updated"
+
+        finally:
+            # Always close the second connection, even if an exception occurs.
+            conn2.close()
+
+    _notify_mutation("consume", fridge_id=fridge_id, item_id=item_id, food_name=name,
+                     quantity=qty_used, remaining=new_qty, unit=unit,
+                     storage=item["storage"])
+    return result
+
+
+# ---------- Unit of work ----------
+
+class InventorySession:
+    """
+    Several inventory changes on one (pooled) connection in one transaction:
+
+        with inventory_session(fridge_id) as s:
+            s.consume("eggs", 2)
+            s.move(item_id, "freezer")
+            s.add("milk", 1, "l")
+
+    Statements run immediately, so later steps see earlier ones, and each
+    distinct statement is prepared once per session. The block commits on
+    normal exit and rolls back on any exception. Mutation listeners (read
+    cache, scheduler, event log, inventory store) are notified only after
+    the commit.
+    """
 
+    def __init__(self, fridge_id: int | None = None):
+        self.fridge_id = DEFAULT_FRIDGE_ID if fridge_id is None else fridge_id
+        self._conn = None
+        self._cursors = {}       # SQL text -> prepared cursor
+        self._events = []        # (event, details), published after commit
+
+    def __enter__(self):
+        store = _STORES.get(self.fridge_id)
+        if store is not None:
+            # A write-behind store may hold consumes the transaction must see
+            store.flush()
+        self._conn = get_connection()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        committed = False
+        try:
+            if exc_type is None:
+                self._conn.commit()
+                committed = True
+        finally:
+            try:
+                if not committed:
+                    self._conn.rollback()
+                for cur in self._cursors.values():
+                    cur.close()
+            finally:
+                self._cursors.clear()
+                self._conn.close()
+                self._conn = None
+
+        events, self._events = self._events, []
+        for event, details in events:
+            _notify_mutation(event, **details)
+        return False
+
+    def _execute(self, sql: str, params: tuple = ()):
+        cur = self._cursors.get(sql)
+        if cur is None:
+            cur = self._cursors[sql] = self._conn.cursor(prepared=True)
+        cur.execute(sql, params)
+        return cur
+
+    def _items_named(self, *names: str) -> List[tuple]:
+        """(item_id, quantity, unit, storage, name) rows of these foods, locked, soonest expiry first."""
+        cur = self._execute(f"""
+            SELECT i.item_id, i.quantity, i.unit, i.storage, t.name
+            FROM food_items i JOIN food_types t ON i.food_type_id = t.food_type_id
+            WHERE i.fridge_id = %s AND t.name IN ({", ".join(["%s"] * len(names))})
+            ORDER BY i.expiration_date IS NULL, i.expiration_date, i.item_id
+            FOR UPDATE;
+        """, (self.fridge_id, *names))
+        return cur.fetchall()
+
+    def _alias_names(self, name: str) -> List[str]:
+        """Other stored food names in this fridge that are aliases of name ("chicken" -> chicken breast)."""
+        key = normalize_ingredient(name)
+        cur = self._execute("""
+            SELECT DISTINCT t.name
+            FROM food_items i JOIN food_types t ON i.food_type_id = t.food_type_id
+            WHERE i.fridge_id = %s;
+        """, (self.fridge_id,))
+        return sorted(row[0] for row in cur.fetchall() if row[0] != name and normalize_ingredient(row[0]) == key)
+
+    def _take(self, row: tuple, qty_used: float) -> float:
+        item_id, quantity, unit, storage, name = row
+        new_qty = float(quantity) - qty_used
+        if new_qty <= 0:
+            new_qty = 0.0
+            self._execute("DELETE FROM food_items WHERE item_id = %s;", (item_id,))
+        else:
+            self._execute("UPDATE food_items SET quantity = %s WHERE item_id = %s;", (new_qty, item_id))
+        self._events.append(("consume", dict(fridge_id=self.fridge_id, item_id=item_id, food_name=name,
+                                             quantity=qty_used, remaining=new_qty, unit=unit,
+                                             storage=storage)))
+        return new_qty
+
+    def add(self, name: str, quantity: float = 1, unit: str = "pcs",
+            expiration_date: str | date | None = None, storage: str = "fridge",
+            location_slot: str | None = None, added_by: str = "user") -> int:
+        """Same as add_item_simple, inside the transaction. Returns the new item_id."""
+        name = normalize_food_name(name)
+        storage = normalize_str(storage)
+        unit = normalize_str(unit)
+        food_type_id, expiration_date = _food_type_and_expiry(name, storage, expiration_date)
+        date_added = date.today()
+        cur = self._execute(_INSERT_ITEM_SQL, (self.fridge_id, food_type_id, quantity, unit, date_added,
+                                               expiration_date, name, None, None, location_slot,
+                                               added_by, storage, food_type_id))
+        item_id = cur.lastrowid
+        self._events.append(("add", dict(fridge_id=self.fridge_id, item_id=item_id,
+                                         food_type_id=food_type_id, food_name=name,
+                                         quantity=quantity, unit=unit, storage=storage,
+                                         date_added=date_added, expiration_date=expiration_date)))
+        return item_id
+
+    def consume(self, name: str, qty_used: float, item_id: int | None = None) -> str:
+        """Same contract as smart_fridge_db.consume ("deleted" | "updated")."""
+        name = normalize_food_name(name)
+        if qty_used <= 0:
+            raise ValueError("Consumed quantity must be positive.")
+        items = self._items_named(name)
+        if not items:
+            raise ValueError(f"'{name}' is not in your fridge.")
+        if item_id is None:
+            if len(items) != 1:
+                raise ValueError(
+                    f"Multiple '{name}' items exist. Specify item_id. "
+                    f"IDs available: " + ", ".join(str(i[0]) for i in items)
+                )
+            row = items[0]
+        else:
+            row = next((i for i in items if i[0] == item_id), None)
+            if row is None:
+                raise ValueError(f"No '{name}' found with item_id={item_id}.")
 
-def get_fridge_items_for_llm(user_id: int | None = None) -> List[Dict]:
+        current_qty, unit = float(row[1]), row[2]
+        if qty_used > current_qty:
+            raise ValueError(
+                f"Cannot consume {qty_used}{unit}; only {current_qty}{unit} available."
+            )
+        return "deleted" if self._take(row, qty_used) == 0 else "updated"
+
+    def consume_fefo(self, name: str, qty_used: float, match_aliases: bool = False) -> float:
+        """
+        Consume qty_used of a food across its items, soonest-expiring first
+        (no item_id needed). Returns the quantity left of that food.
+
+        Items stored under exactly this name are used first. Only with
+        match_aliases, and only if those are not enough, items stored under
+        an alias of the same food follow (a recipe's "chicken" takes from
+        "chicken breast"), as in recipe matching.
+        """
+        name = normalize_food_name(name)
+        if qty_used <= 0:
+            raise ValueError("Consumed quantity must be positive.")
+        items = self._items_named(name)
+        available = sum(float(row[1]) for row in items)
+        if match_aliases and available < qty_used:
+            aliases = self._alias_names(name)
+            if aliases:
+                items = list(items) + list(self._items_named(*aliases))
+                available = sum(float(row[1]) for row in items)
+        if not items:
+            raise ValueError(f"'{name}' is not in your fridge.")
+        if qty_used > available:
+            raise ValueError(
+                f"Cannot consume {qty_used}{items[0][2]} of {name}; only {available}{items[0][2]} available."
+            )
+        remaining = qty_used
+        for row in items:
+            if remaining <= 0:
+                break
+            take = min(remaining, float(row[1]))
+            self._take(row, take)
+            remaining -= take
+        return available - qty_used
+
+    def move(self, item_id: int, to_storage: str) -> bool:
+        """Same as move_items for one item. Returns False if it was already there."""
+        to_storage = normalize_str(to_storage)
+        if to_storage not in STORAGES:
+            raise ValueError(f"Unknown storage {to_storage!r} (use one of {STORAGES}).")
+        cur = self._execute(
+            "SELECT storage FROM food_items WHERE item_id = %s AND fridge_id = %s FOR UPDATE;",
+            (item_id, self.fridge_id))
+        row = cur.fetchone()
+        if row is None:
+            raise ValueError(f"No item with item_id={item_id}.")
+        if row[0] == to_storage:
+            return False
+        self._execute(_move_sql(to_storage, 1), (self.fridge_id, item_id))
+        self._events.append(("move", dict(fridge_id=self.fridge_id, item_ids=[item_id],
+                                          storage=to_storage)))
+        return True
+
+    def delete(self, item_id: int) -> int:
+        """Delete an item. Returns the number of rows removed (0 or 1)."""
+        cur = self._execute("""
+            SELECT t.name, i.quantity, i.unit, i.storage
+            FROM food_items i JOIN food_types t ON i.food_type_id = t.food_type_id
+            WHERE i.item_id = %s AND i.fridge_id = %s
+            FOR UPDATE;
+        """, (item_id, self.fridge_id))
+        row = cur.fetchone()
+        if row is None:
+            return 0
+        self._execute("DELETE FROM food_items WHERE item_id = %s;", (item_id,))
+        self._events.append(("delete", dict(fridge_id=self.fridge_id, item_id=item_id, food_name=row[0],
+                                            quantity=row[1], unit=row[2], storage=row[3])))
+        return 1
+
+
+def inventory_session(fridge_id: int | None = None) -> InventorySession:
+    """Unit of work for one fridge; use as a context manager (see InventorySession)."""
+    return InventorySession(fridge_id)
+
+
+def cook_recipe(ranked_recipe: Dict, quantities: Dict[str, float] | None = None,
+                fridge_id: int | None = None, match_aliases: bool = False) -> Dict[str, float]:
+    """
+    Consume every ingredient in ranked_recipe["ingredients_available"]
+    (from split_and_rank_recipes) in one transaction: all of them, or none
+    if any is short.
+
+    quantities maps ingredient -> amount in the item's unit (default 1 each);
+    amounts are taken from the soonest-expiring items stored under that
+    exact name. match_aliases=True lets an ingredient fall back to items
+    stored under an alias of it ("chicken breast" for "chicken"), the way
+    the recipe was matched. Returns {food_name: amount consumed}.
+    """
+    quantities = {normalize_ingredient(k): v for k, v in (quantities or {}).items()}
+    used: Dict[str, float] = {}
+    seen = set()
+    with inventory_session(fridge_id) as session:
+        for ingredient in ranked_recipe.get("ingredients_available", []):
+            key = normalize_ingredient(ingredient)
+            if key in seen:
+                continue
+            seen.add(key)
+            qty = quantities.get(key, 1)
+            session.consume_fefo(ingredient, qty, match_aliases=match_aliases)
+            used[normalize_food_name(ingredient)] = qty
+
+    _LOG.info("Cooked %s: %s", ranked_recipe.get("title") or "recipe",
+              ", ".join(f"{qty} {name}" for name, qty in used.items()),
+              extra=fields(op="cook_recipe", fridge_id=fridge_id, used=used))
+    return used
+
+
+def get_fridge_items_for_llm(user_id: int | None = None, fridge_id: int | None = None) -> List[Dict]:
     """
     Return ingredients in a simple format for the LLM:
 
@@ -465,29 +1315,47 @@ def get_fridge_items_for_llm(user_id: int | None = None) -> List[Dict]:
       as very long shelf-life (e.g. 365 days) so they are available but not urgent.
     - If multiple rows share the same food_name, we keep the *smallest*
       expires_in_days (most urgent one).
-    - Currently user_id is ignored because the schema is global; kept only
-      for future multi-user support.
+    - Reads one fridge: fridge_id if given, else the user's first fridge,
+      else DEFAULT_FRIDGE_ID (see resolve_fridge_id).
     """
+    fridge_id = resolve_fridge_id(user_id, fridge_id)
+    if fridge_id in _STORES:
+        return _STORES[fridge_id].get_fridge_items_for_llm()
+    return _read_through(("get_fridge_items_for_llm",), fridge_id,
+                         lambda: _load_fridge_items_for_llm(fridge_id))
+
+
+def _load_fridge_items_for_llm(fridge_id: int) -> List[Dict]:
     conn = get_connection()
     try:
         with conn.cursor(dictionary=True) as cur:
             cur.execute("""
                 SELECT food_name, expiration_date, storage, quantity
                 FROM item_status_view
-                WHERE quantity > 0
+                WHERE fridge_id = %s
+                  AND quantity > 0
                   AND storage IN ('fridge', 'freezer');
-            """)
+            """, (fridge_id,))
             rows = cur.fetchall()
     finally:
         conn.close()
 
+    return summarize_for_llm(rows)
+
+
+def summarize_for_llm(rows) -> List[Dict]:
+    """
+    Collapse item rows (food_name, expiration_date, storage, quantity) to
+    [{"name", "expires_in_days"}, ...], most urgent row per name.
+    """
     today = date.today()
     name_to_days: Dict[str, int] = {}
 
     for row in rows:
+        if row["quantity"] <= 0 or row["storage"] not in ("fridge", "freezer"):
+            continue
         food_name = row["food_name"]
         exp_date = row["expiration_date"]
-        storage = row["storage"]
 
         # If we have a real expiration_date, compute days left
         if exp_date is not None:
@@ -3,15 +3,40 @@ from tkinter import ttk, filedialog, messagebox
 from datetime import date
 
 # --- Smart Fridge imports ---
-from setup_db import ensure_schema
-from smart_fridge_db import (
-    add_item_simple,
-    add_item_by_image,
-    get_all_items,
-    consume,
-    clear_database
-)
-from recipe_service import get_recipe_suggestions_for_user
+import config
+
+if config.SMART_FRIDGE_SERVER_URL:
+    # Thin client: DB, classifier and LLM live in fridge_server.py
+    from fridge_client import (
+        ensure_schema,
+        add_item_simple,
+        add_item_by_image,
+        add_items_by_photo,
+        get_all_items,
+        consume,
+        move_items,
+        delete_item,
+        clear_database,
+        get_recipe_suggestions_for_user,
+    )
+else:
+    from setup_db import ensure_schema
+    from smart_fridge_db import (
+        add_item_simple,
+        add_item_by_image,
+        add_items_by_photo,
+        get_all_items,
+        consume,
+        move_items,
+        delete_item,
+        clear_database
+    )
+    from recipe_service import get_recipe_suggestions_for_user
+    from event_log import get_event_log, EventLogNotifier
+    from expiry_scheduler import get_scheduler, LogNotifier
+    from shelf_life_model import get_shelf_life_model
+
+from shopping_list import ShoppingList
 
 
 # ==============================
@@ -26,6 +51,14 @@ class SmartFridgeGUI(tk.Tk):
         self.geometry("1000x600")
 
         ensure_schema()
+        if not config.SMART_FRIDGE_SERVER_URL:
+            # Record add/consume/delete/expire history (the server does this in remote mode)
+            get_scheduler(notifier=EventLogNotifier(get_event_log(), LogNotifier()),
+                          fridge_id=config.FRIDGE_ID)
+            get_shelf_life_model()
+            if config.INVENTORY_STORE != "off":
+                from inventory_store import get_inventory_store
+                get_inventory_store(config.FRIDGE_ID)
 
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(fill="both", expand=True)
@@ -121,6 +154,12 @@ class InsertTab(ttk.Frame):
             command=self.add_by_image
         ).grid(row=6, column=1, pady=5)
 
+        ttk.Button(
+            img_frame,
+            text="Add All from Shelf Photo",
+            command=self.add_by_photo
+        ).grid(row=7, column=1, pady=5)
+
     def _row(self, frame, label, var, row):
         ttk.Label(frame, text=label).grid(row=row, column=0, sticky="w", padx=5, pady=2)
         ttk.Entry(frame, textvariable=var, width=30).grid(row=row, column=1, padx=5, pady=2)
@@ -173,6 +212,20 @@ class InsertTab(ttk.Frame):
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
+    def add_by_photo(self):
+        try:
+            item_ids = add_items_by_photo(
+                image_path=self.img_path.get(),
+                quantity=self.img_qty.get(),
+                unit=self.img_unit.get(),
+                storage=self.img_storage_var.get(),
+            )
+            self.food_tab.refresh()
+
+            messagebox.showinfo("Success", f"{len(item_ids)} items added from photo")
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+
 
 # ==============================
 # Suggestions Tab
@@ -182,14 +235,33 @@ class SuggestionTab(ttk.Frame):
     def __init__(self, parent):
         super().__init__(parent)
 
+        self.recipes = []
+        self.shopping = ShoppingList()
+
         ttk.Button(
             self,
             text="Generate Recipe Suggestions",
             command=self.generate
         ).pack(pady=10)
 
-        self.text = tk.Text(self, wrap="word")
-        self.text.pack(fill="both", expand=True, padx=10, pady=10)
+        body = ttk.Frame(self)
+        body.pack(fill="both", expand=True, padx=10, pady=10)
+
+        self.text = tk.Text(body, wrap="word")
+        self.text.pack(side="left", fill="both", expand=True)
+
+        side = ttk.Frame(body)
+        side.pack(side="left", fill="y", padx=(10, 0))
+
+        ttk.Label(side, text="Select recipes to shop for:").pack(anchor="w")
+        self.recipe_list = tk.Listbox(side, selectmode=tk.MULTIPLE, exportselection=False,
+                                      height=8, width=40)
+        self.recipe_list.pack(fill="x")
+        self.recipe_list.bind("<<ListboxSelect>>", self.update_shopping_list)
+
+        ttk.Label(side, text="Shopping list:").pack(anchor="w", pady=(10, 0))
+        self.shopping_text = tk.Text(side, wrap="word", width=40)
+        self.shopping_text.pack(fill="both", expand=True)
 
     def generate(self):
         self.text.delete("1.0", tk.END)
@@ -201,6 +273,14 @@ class SuggestionTab(ttk.Frame):
 
         self.text.delete("1.0", tk.END)
 
+        # Inventory is read once; (de)selecting recipes only updates the list
+        self.recipes = recipes
+        self.shopping = ShoppingList(get_all_items())
+        self.recipe_list.delete(0, tk.END)
+        for i, r in enumerate(recipes, start=1):
+            self.recipe_list.insert(tk.END, f"{i}. {r['title']}")
+        self.update_shopping_list()
+
         if not recipes:
             self.text.insert(tk.END, "No recipes available.\n")
             return
@@ -219,6 +299,20 @@ class SuggestionTab(ttk.Frame):
                 self.text.insert(tk.END, f"{idx}. {step}\n")
             self.text.insert(tk.END, "\n" + "=" * 50 + "\n\n")
 
+    def update_shopping_list(self, event=None):
+        self.shopping.set_selection([self.recipes[i] for i in self.recipe_list.curselection()])
+
+        self.shopping_text.delete("1.0", tk.END)
+        if not self.shopping.selected:
+            return
+        items = self.shopping.items()
+        if not items:
+            self.shopping_text.insert(tk.END, "Everything is in the fridge.\n")
+            return
+        for item in items:
+            unit = f" {item['unit']}" if item["unit"] else ""
+            self.shopping_text.insert(tk.END, f"  - {item['name']}: {item['buy']:g}{unit}\n")
+
 
 # ==============================
 # Food Tab
@@ -251,6 +345,24 @@ class FoodTab(ttk.Frame):
             command=self.refresh
         ).pack(side="left", padx=5)
 
+        ttk.Button(
+            btn_frame,
+            text="Move to Freezer",
+            command=lambda: self.move_selected("freezer")
+        ).pack(side="left", padx=5)
+
+        ttk.Button(
+            btn_frame,
+            text="Move to Fridge",
+            command=lambda: self.move_selected("fridge")
+        ).pack(side="left", padx=5)
+
+        ttk.Button(
+            btn_frame,
+            text="Discard (spoiled)",
+            command=self.discard_selected
+        ).pack(side="left", padx=5)
+
         ttk.Button(
             btn_frame,
             text="Clear All",
@@ -275,15 +387,37 @@ class FoodTab(ttk.Frame):
                 item["date_added"],
             ))
 
-    
+    def move_selected(self, to_storage):
+        item_ids = [self.tree.item(row, "values")[0] for row in self.tree.selection()]
+        if not item_ids:
+            messagebox.showwarning("No selection", "Select one or more items to move.")
+            return
+        try:
+            move_items([int(i) for i in item_ids], to_storage)
+            self.refresh()
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+
+    def discard_selected(self):
+        item_ids = [self.tree.item(row, "values")[0] for row in self.tree.selection()]
+        if not item_ids:
+            messagebox.showwarning("No selection", "Select the items that went off.")
+            return
+        try:
+            for item_id in item_ids:
+                delete_item(int(item_id), spoiled=True)
+            self.refresh()
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+
     def clear_all(self):
         confirm = messagebox.askyesno(
             "Confirm Clear",
-            "This will permanently delete ALL food items.\n\nAre you sure?"
+            "This will permanently delete ALL food items in this fridge.\n\nAre you sure?"
         )
 
         if confirm:
-            clear_database()
+            clear_database(config.FRIDGE_ID)
             self.refresh()
             messagebox.showinfo("Cleared", "All food items have been removed.")
 
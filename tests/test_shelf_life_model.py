@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+
+from shelf_life_model import ShelfLifeModel, static_shelf_life
+
+T0 = datetime(2026, 1, 5, 12, 0)
+
+
+def _fit(events):
+    """Refit a fresh model on (event_type, item_id, food, storage, remaining, days after T0) rows."""
+    rows = [(i + 1, kind, item_id, food, storage, remaining, T0 + timedelta(days=days))
+            for i, (kind, item_id, food, storage, remaining, days) in enumerate(events)]
+    model = ShelfLifeModel()
+    model._fetch_events = lambda after: [r for r in rows if r[0] > after]
+    model.refit()
+    return model
+
+
+def test_consume_only_history_never_lengthens_shelf_life():
+    prior = static_shelf_life("chicken")
+    events = []
+    for item_id in range(1, 51):
+        events.append(("add", item_id, "chicken", "fridge", None, item_id))
+        events.append(("consume", item_id, "chicken", "fridge", 0, item_id + prior * 3))
+    assert _fit(events).shelf_life_days("chicken") == prior
+
+
+def test_plain_delete_after_expiry_counts_as_spoiled():
+    prior = static_shelf_life("chicken")
+    events = []
+    for item_id in range(1, 11):
+        events.append(("add", item_id, "chicken", "fridge", None, 0))
+        events.append(("expire", item_id, "chicken", "fridge", None, 1))
+        events.append(("delete", item_id, "chicken", "fridge", None, 1))
+    assert _fit(events).shelf_life_days("chicken") < prior
+
+
+def test_estimate_may_exceed_prior_after_enough_discards():
+    prior = static_shelf_life("chicken")
+    events = []
+    for item_id in range(1, ShelfLifeModel.MIN_DISCARDS + 1):
+        events.append(("add", item_id, "chicken", "fridge", None, 0))
+        events.append(("discard", item_id, "chicken", "fridge", None, prior * 3))
+    assert _fit(events).shelf_life_days("chicken") > prior
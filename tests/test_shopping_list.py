@@ -0,0 +1,63 @@
+from shopping_list import ShoppingList, build_shopping_list, parse_amount
+
+
+def _lines(shopping):
+    return {(i["name"], i["unit"]): i["buy"] for i in shopping.items()}
+
+
+def test_parse_amount():
+    assert parse_amount("2 Eggs") == (2.0, None)
+    assert parse_amount("200g flour") == (200.0, "g")
+    assert parse_amount("1.5 l milk") == (1500.0, "ml")
+    assert parse_amount("1/2 onion") == (0.5, None)
+    assert parse_amount("2 cups rice") == (None, None)
+    assert parse_amount("flour") == (None, None)
+
+
+def test_amounts_in_the_ingredient_text_add_up():
+    recipes = [{"title": "Omelette", "ingredients": ["2 Eggs"]},
+               {"title": "Cake", "ingredients": ["egg", "200g flour"]},
+               {"title": "Bread", "ingredients": ["500 g flour"]}]
+    items = build_shopping_list(recipes, [])
+    assert {(i["name"], i["unit"]): i["buy"] for i in items} == {("eggs", None): 3.0, ("flour", "g"): 700.0}
+
+
+def test_select_deselect():
+    omelette = {"title": "Omelette", "ingredients": ["3 eggs", "milk"]}
+    other = {"title": "Omelette", "ingredients": ["2 eggs"]}
+    shopping = ShoppingList([{"food_name": "eggs", "quantity": 4, "unit": "pcs"}])
+
+    assert shopping.select(omelette)
+    assert not shopping.select(omelette)
+    assert _lines(shopping) == {("milk", None): 1.0}
+
+    # Same title, different recipe: both count
+    assert shopping.select(other)
+    assert shopping.selected == ["Omelette", "Omelette"]
+    assert _lines(shopping) == {("eggs", "pcs"): 1.0, ("milk", None): 1.0}
+
+    assert shopping.deselect(omelette)
+    assert not shopping.deselect(omelette)
+    assert _lines(shopping) == {}
+    assert len(shopping) == 0
+
+
+def test_set_inventory_updates_selection():
+    shopping = ShoppingList()
+    shopping.set_selection([{"title": "Pancakes", "ingredients": ["2 eggs", "300 ml milk"]}])
+    assert _lines(shopping) == {("eggs", None): 2.0, ("milk", "ml"): 300.0}
+
+    shopping.set_inventory([{"food_name": "egg", "quantity": 1, "unit": "pcs"},
+                            {"food_name": "milk", "quantity": 0.2, "unit": "l"},
+                            {"food_name": "milk", "quantity": 1, "unit": "l", "status": "expired"}])
+    assert _lines(shopping) == {("eggs", "pcs"): 1.0, ("milk", "ml"): 100.0}
+
+    shopping.set_inventory([{"food_name": "eggs", "quantity": 6, "unit": "pcs"},
+                            {"food_name": "milk", "quantity": 1, "unit": "l"}])
+    assert _lines(shopping) == {}
+
+
+def test_measured_stock_covers_a_portion():
+    items = build_shopping_list([{"title": "Stew", "ingredients": ["beef", "carrot"]}],
+                                [{"food_name": "beef", "quantity": 500, "unit": "g"}])
+    assert [i["name"] for i in items] == ["carrot"]